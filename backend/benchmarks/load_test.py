@@ -0,0 +1,353 @@
+"""
+End-to-end API load benchmark.
+
+Seeds a throwaway database, swaps the Razorpay client for an in-process fake,
+and drives the real FastAPI app over ASGI with a fixed concurrency. Reports
+p50/p95/p99 latency and throughput per route and writes them to JSON:
+
+    cd backend
+    python -m benchmarks.load_test --products 5000 --users 1000 --orders 20000 \\
+        --requests 2000 --concurrency 32 --output bench-results.json
+
+    # compare two runs
+    python -m benchmarks.load_test --compare old.json new.json
+
+Pass --database-url postgresql://... to benchmark against Postgres instead of
+the default temporary SQLite file. The database must be empty.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def configure_environment(database_url: str, workdir: str):
+    # Settings are read at import time, so this has to run before importing the app
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ["INVOICE_DIR"] = os.path.join(workdir, "invoices")
+    # Side effects are off the request path; keep the worker from competing for the DB
+    os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+    # Every simulated client shares one address; measure the app, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LOAD_SHEDDING_ENABLED", "false")
+
+
+class FakeRazorpay:
+    """Stands in for razorpay.Client with a small, fixed latency"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.order = self
+        self.payment = self
+
+    def create(self, data=None, **kwargs):
+        time.sleep(self.latency)
+        return {
+            "id": f"order_{random.getrandbits(48):x}",
+            "amount": data["amount"],
+            "currency": data["currency"],
+            "receipt": data["receipt"],
+            "status": "created",
+        }
+
+    def fetch(self, payment_id, data=None, **kwargs):
+        time.sleep(self.latency)
+        return {"id": payment_id, "status": "captured", "amount": 100000, "method": "upi", "currency": "INR"}
+
+
+BATCH = 5000
+PASSWORD = "benchmark-password"
+
+
+def _insert(db, table, rows):
+    for i in range(0, len(rows), BATCH):
+        db.execute(table.insert(), rows[i:i + BATCH])
+
+
+def seed(args, rng: random.Random) -> dict:
+    from core.database.database import SessionLocal
+    from core.models.models import (
+        Order, OrderItem, OrderStatus, Payment, PaymentStatus, Product, ProductCategory,
+        ProductVariant, Shipment, User, UserAddress,
+    )
+    from core.utils.utils import hash_password
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        _insert(db, ProductCategory.__table__, [{"id": i, "name": f"Category {i}"} for i in range(1, 11)])
+
+        words = ["Essential", "Urban", "Classic", "Relaxed", "Tailored", "Everyday", "Studio", "Heritage"]
+        kinds = ["Tee", "Shirt", "Hoodie", "Jacket", "Joggers", "Shorts", "Polo", "Dress"]
+        products = [{
+            "id": i,
+            "name": f"{rng.choice(words)} {rng.choice(kinds)} {i}",
+            "description": "Benchmark product",
+            "brand": rng.choice(["Nike", "Adidas", "Puma", "Uniqlo", "Zara"]),
+            "price": round(rng.uniform(399, 7999), 2),
+            "category_id": rng.randint(1, 10),
+            "image_url": None,
+        } for i in range(1, args.products + 1)]
+        _insert(db, Product.__table__, products)
+
+        variants = []
+        for product in products:
+            for _ in range(args.variants_per_product):
+                vid = len(variants) + 1
+                variants.append({
+                    "id": vid, "product_id": product["id"], "sku": f"BENCH-{vid:08d}",
+                    "size": rng.choice(["S", "M", "L", "XL"]), "color": rng.choice(["Black", "White", "Navy"]),
+                    "stock": rng.randint(0, 50), "price": product["price"],
+                })
+        _insert(db, ProductVariant.__table__, variants)
+
+        # bcrypt is deliberately slow; hash once and share it
+        password_hash = hash_password(PASSWORD)
+        _insert(db, User.__table__, [{
+            "id": i, "name": f"Bench User {i}", "email": f"bench{i}@example.com",
+            "password": password_hash, "phone": None, "role": "admin" if i == 1 else "user",
+        } for i in range(1, args.users + 1)])
+        _insert(db, UserAddress.__table__, [{
+            "id": i, "user_id": i, "address_line1": f"{i} Bench Street", "city": "Mumbai",
+            "state": "Maharashtra", "zip_code": 400001, "alias": "Home",
+        } for i in range(1, args.users + 1)])
+
+        now = datetime.datetime.utcnow()
+        orders, items, payments, shipments = [], [], [], []
+        for oid in range(1, args.orders + 1):
+            uid = rng.randint(1, args.users)
+            lines = [(rng.choice(variants), rng.randint(1, 3)) for _ in range(rng.randint(1, 4))]
+            total = sum(v["price"] * q for v, q in lines) + 20
+            created = now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            orders.append({
+                "id": oid, "user_id": uid, "shipping_address_id": uid, "total_amount": total,
+                "order_status": OrderStatus.pending, "payment_status": PaymentStatus.paid,
+                "created_at": created,
+            })
+            for v, q in lines:
+                items.append({"order_id": oid, "variant_id": v["id"], "quantity": q, "unit_price": v["price"]})
+            payments.append({
+                "order_id": oid, "payment_method": "upi", "status": "captured", "paid_at": created,
+                "description": "", "amount": total, "currency": "INR", "transaction_id": oid,
+            })
+            shipments.append({
+                "order_id": oid, "courier_name": "DTDC", "tracking_number": str(1000000000 + oid),
+                "shipped_at": created, "delivery_estimate": created + datetime.timedelta(days=5), "status": "pending",
+            })
+        for table, rows in ((Order, orders), (OrderItem, items), (Payment, payments), (Shipment, shipments)):
+            _insert(db, table.__table__, rows)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "variant_ids": [v["id"] for v in variants],
+        "orders_by_user": _orders_by_user(orders),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def _orders_by_user(orders):
+    by_user = {}
+    for order in orders:
+        by_user.setdefault(order["user_id"], []).append(order["id"])
+    return by_user
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, make_request, total: int, concurrency: int) -> dict:
+    """Issue ``total`` requests from ``concurrency`` workers; ``make_request(i)`` returns (method, url, kwargs)"""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, url, kwargs = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3) if v is not None else None  # noqa: E731
+    return {
+        "requests": total,
+        "errors": errors,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+    }
+
+
+async def run_benchmark(args, data: dict, rng: random.Random) -> dict:
+    import httpx
+    from main import app
+    from core.services.auth import create_access_token
+
+    # httpx logs every request at INFO; that floods the output and its cost would land in the latencies
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    user_ids = sorted(data["orders_by_user"])
+    tokens = {
+        uid: {"Authorization": "Bearer " + create_access_token({"sub": f"bench{uid}@example.com"})}
+        for uid in user_ids
+    }
+    order_pairs = [(uid, oid) for uid, oids in data["orders_by_user"].items() for oid in oids]
+    rng.shuffle(order_pairs)
+    search_terms = ["Tee", "Urban", "Shirt", "Classic", "Hood"]
+
+    def checkout(i):
+        uid = rng.choice(user_ids)
+        lines = [{"variant_id": rng.choice(data["variant_ids"]), "quantity": 1, "price": 999.0}
+                 for _ in range(rng.randint(1, 4))]
+        return "POST", "/api/orders", {"headers": tokens[uid], "json": {
+            "address_id": uid, "payment_order_id": f"order_{i}", "payment_id": f"pay_{i}",
+            "payment_signature": "benchmark", "order_lines": lines,
+        }}
+
+    def invoice(i):
+        uid, oid = order_pairs[i % len(order_pairs)]
+        return "GET", f"/api/orders/{oid}/invoice", {"headers": tokens[uid]}
+
+    n = args.requests
+    scenarios = {
+        "GET /products": lambda i: ("GET", "/api/products", {"params": {
+            "limit": 20, "offset": rng.randint(0, max(0, args.products - 20)),
+        }}),
+        "GET /products?search": lambda i: ("GET", "/api/products", {"params": {
+            "search": rng.choice(search_terms), "limit": 20,
+        }}),
+        "GET /products/{id}": lambda i: ("GET", f"/api/products/{rng.randint(1, args.products)}", {}),
+        "GET /products/suggestion": lambda i: ("GET", "/api/products/suggestion", {"params": {
+            "naming": rng.choice(search_terms),
+        }}),
+        "GET /orders": lambda i: ("GET", "/api/orders", {"headers": tokens[rng.choice(user_ids)]}),
+        "POST /auth/login": lambda i: ("POST", "/api/auth/login", {"json": {
+            "email": f"bench{rng.choice(user_ids)}@example.com", "password": PASSWORD,
+        }}),
+        "POST /payment/order": lambda i: ("POST", "/api/payment/order", {
+            "headers": tokens[rng.choice(user_ids)], "json": {"amount": 999.0},
+        }),
+        "POST /orders (checkout)": checkout,
+        # First pass renders every invoice, second pass serves them from the store
+        "GET /orders/{id}/invoice (cold)": invoice,
+        "GET /orders/{id}/invoice (warm)": invoice,
+    }
+    selected = [name for name in scenarios if not args.routes or any(r in name for r in args.routes)]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name in selected:
+            total = n if "invoice" not in name else min(n, len(order_pairs))
+            # Warm up connections, caches and lazy imports outside the measurement
+            if "invoice" not in name:
+                await run_scenario(client, scenarios[name], min(20, total), 1)
+            results[name] = await run_scenario(client, scenarios[name], total, args.concurrency)
+            r = results[name]
+            print(f"{name:36s} p50={r['p50_ms']:>9}ms p95={r['p95_ms']:>9}ms p99={r['p99_ms']:>9}ms "
+                  f"{r['throughput_rps']:>8} rps  errors={r['errors']}")
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path) as f:
+        old = json.load(f)["routes"]
+    with open(new_path) as f:
+        new = json.load(f)["routes"]
+    print(f"{'route':36s} {'p50 Δ%':>8} {'p95 Δ%':>8} {'p99 Δ%':>8} {'rps Δ%':>8}")
+    for name in new:
+        if name not in old:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            a, b = old[name].get(key), new[name].get(key)
+            deltas.append(f"{(b - a) / a * 100:+7.1f}%" if a and b is not None else f"{'n/a':>8}")
+        print(f"{name:36s} {' '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShopKart end-to-end API load benchmark")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--variants-per-product", type=int, default=3)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--razorpay-latency", type=float, default=0.05, help="fake Razorpay latency in seconds")
+    parser.add_argument("--routes", nargs="*", help="only run routes whose name contains one of these")
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="shopkart-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    configure_environment(database_url, workdir)
+
+    import core.services.razorpay as razorpay_service
+    razorpay_service.client = FakeRazorpay(args.razorpay_latency)
+
+    rng = random.Random(args.seed)
+    print(f"Seeding {args.products} products, {args.users} users, {args.orders} orders into {database_url}")
+    data = seed(args, rng)
+    print(f"Seeded in {data['seconds']}s")
+
+    routes = asyncio.run(run_benchmark(args, data, rng))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "params": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+            "seed_seconds": data["seconds"],
+        },
+        "routes": routes,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+"Frequently bought together" build benchmark.
+
+Times the vectorized co-occurrence build and top-k selection behind
+``scripts/recommendations.py`` on synthetic order history, without a
+database, and checks them against a plain-Python pair count:
+
+    cd backend
+    python -m benchmarks.recommendations --orders 1000000 --products 50000 --output recommendations.json
+
+Stages timed:
+
+* ``full build``: every order, in ``--chunk`` sized windows as the job reads them.
+* ``top-k``: neighbour lists for every product.
+* ``incremental``: fold ``--new-orders`` more orders into the saved matrix and
+  recompute only the rows they touch.
+* ``python baseline``: dict-of-Counter pair counting over ``--baseline-orders``
+  orders, extrapolated linearly to ``--orders``.
+"""
+import argparse
+import itertools
+import json
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from core.services.recommendations import cooccurrence, top_k
+
+
+def synthetic_orders(n_orders: int, n_products: int, seed: int):
+    """(order_ids, product_ids) with 1-6 lines per order and Zipf-like product popularity"""
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 7, size=n_orders)
+    order_ids = np.repeat(np.arange(1, n_orders + 1, dtype=np.int64), sizes)
+    # Popularity ~ 1/rank: a few products show up in many baskets, most rarely
+    weights = 1.0 / np.arange(1, n_products + 1)
+    product_ids = rng.choice(np.arange(1, n_products + 1), size=len(order_ids), p=weights / weights.sum())
+    return order_ids, product_ids
+
+
+def build(order_ids, product_ids, n: int, chunk: int):
+    matrix = None
+    boundaries = np.searchsorted(order_ids, np.arange(chunk, order_ids[-1] + chunk, chunk), side="right")
+    start = 0
+    for end in boundaries:
+        if end > start:
+            part = cooccurrence(order_ids[start:end], product_ids[start:end], n)
+            matrix = part if matrix is None else matrix + part
+        start = end
+    return matrix
+
+
+def python_pairs(order_ids, product_ids):
+    neighbours = defaultdict(Counter)
+    for _, group in itertools.groupby(zip(order_ids.tolist(), product_ids.tolist()), key=lambda row: row[0]):
+        basket = {product for _, product in group}
+        for a in basket:
+            for b in basket:
+                if a != b:
+                    neighbours[a][b] += 1
+    return neighbours
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShopKart recommendations build benchmark")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--new-orders", type=int, default=10000)
+    parser.add_argument("--baseline-orders", type=int, default=50000)
+    parser.add_argument("--chunk", type=int, default=200000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    n = args.products + 1
+    order_ids, product_ids = synthetic_orders(args.orders + args.new_orders, args.products, args.seed)
+    split = np.searchsorted(order_ids, args.orders, side="right")
+    old_orders, old_products = order_ids[:split], product_ids[:split]
+    new_orders, new_products = order_ids[split:], product_ids[split:]
+
+    matrix, build_s = timed(lambda: build(old_orders, old_products, n, args.chunk))
+    (rows, neighbours, _), topk_s = timed(lambda: top_k(matrix, args.top_k))
+
+    def incremental():
+        updated = matrix + cooccurrence(new_orders, new_products, n)
+        touched = np.unique(new_products)
+        return top_k(updated[touched], args.top_k), touched
+    (_, touched), incremental_s = timed(incremental)
+
+    # Correctness against plain Python on the baseline sample
+    sample_end = np.searchsorted(old_orders, args.baseline_orders, side="right")
+    expected, python_s = timed(lambda: python_pairs(old_orders[:sample_end], old_products[:sample_end]))
+    sample = build(old_orders[:sample_end], old_products[:sample_end], n, args.chunk)
+    assert sample.nnz == sum(len(c) for c in expected.values())
+    for a, counter in itertools.islice(expected.items(), 1000):
+        for b, count in counter.items():
+            assert sample[a, b] == count, (a, b)
+    python_extrapolated = python_s * args.orders / max(1, args.baseline_orders)
+
+    results = {
+        "orders": args.orders,
+        "order_lines": int(split),
+        "products": args.products,
+        "links": int(matrix.nnz),
+        "matrix_mb": round((matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2 ** 20, 1),
+        "lookup_rows": int(len(np.unique(rows))),
+        "full_build_s": round(build_s, 3),
+        "top_k_s": round(topk_s, 3),
+        "incremental_s": round(incremental_s, 3),
+        "incremental_orders": args.new_orders,
+        "incremental_products": int(len(touched)),
+        "python_baseline_s": round(python_extrapolated, 3),
+        "speedup": round(python_extrapolated / (build_s + topk_s), 1),
+    }
+    for key, value in results.items():
+        print(f"{key:<22} {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
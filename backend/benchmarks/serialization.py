@@ -0,0 +1,129 @@
+"""
+Response serialization micro-benchmark.
+
+Measures what it costs to turn ORM rows into a JSON body for the list
+endpoints, per 100 rows, without touching a database or the network:
+
+    cd backend
+    python -m benchmarks.serialization --rows 100 --repeat 200 --output serialization.json
+
+Strategies compared:
+
+* ``response_model + json``: FastAPI's default path. Validate against the
+  response model, dump to JSON-compatible Python objects, ``json.dumps``.
+* ``response_model + orjson``: the same, encoded with ``ORJSONResponse``.
+* ``fast path``: ``fast_json_response``, validate and dump to bytes in one step
+  inside pydantic-core.
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+
+from core.schemas.schemas import OrderWithTotalResponse, ProductResponse, ProductVariantCreate
+from core.utils.serialization import _adapter, fast_json_response
+
+
+def product_rows(n: int, rng: random.Random):
+    return [
+        SimpleNamespace(
+            id=i, name=f"Product {i}", brand=rng.choice(["Acme", "Globex", "Initech"]),
+            description="Lorem ipsum dolor sit amet " * 4, price=round(rng.uniform(99, 9999), 2),
+            category_id=rng.randint(1, 20), image_url=f"https://cdn.example.com/p/{i}.jpg",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def variant_rows(n: int, rng: random.Random):
+    return [
+        SimpleNamespace(
+            id=i, product_id=rng.randint(1, 1000), sku=f"SKU-{i:06d}", size=rng.choice("SMLX"),
+            color=rng.choice(["red", "blue", "black"]), stock=rng.randint(0, 500),
+            price=Decimal(f"{rng.uniform(99, 9999):.2f}"),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def order_page(n: int, rng: random.Random):
+    now = datetime.datetime.utcnow()
+    orders = [
+        SimpleNamespace(
+            id=i, user_id=rng.randint(1, 500), shipping_address_id=rng.randint(1, 500),
+            total_amount=Decimal(f"{rng.uniform(99, 99999):.2f}"), order_status="processing",
+            payment_status="paid", created_at=now - datetime.timedelta(minutes=i),
+        )
+        for i in range(1, n + 1)
+    ]
+    return {"total": n * 10, "orders": orders}
+
+
+def default_path(schema, data, dumps) -> bytes:
+    # Mirrors fastapi.routing.serialize_response followed by the response class's render()
+    adapter = _adapter(schema)
+    content = adapter.dump_python(adapter.validate_python(data, from_attributes=True), mode="json")
+    return dumps(content)
+
+
+def json_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(fn, repeat: int) -> List[float]:
+    fn()  # warm up adapters and caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShopKart response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = {
+        "products": (List[ProductResponse], product_rows(args.rows, rng)),
+        "variants": (List[ProductVariantCreate], variant_rows(args.rows, rng)),
+        "orders": (OrderWithTotalResponse, order_page(args.rows, rng)),
+    }
+    strategies = {
+        "response_model + json": lambda schema, data: default_path(schema, data, json_dumps),
+        "response_model + orjson": lambda schema, data: default_path(schema, data, orjson.dumps),
+        "fast path": lambda schema, data: fast_json_response(schema, data).body,
+    }
+
+    scale = 100 / args.rows
+    results = {}
+    print(f"{'payload':<10} {'strategy':<26} {'per 100 rows (ms)':>18} {'p95 (ms)':>10} {'speedup':>8}")
+    for payload, (schema, data) in payloads.items():
+        baseline = None
+        for strategy, fn in strategies.items():
+            timings = measure(lambda: fn(schema, data), args.repeat)
+            median = statistics.median(timings) * 1000 * scale
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1] * 1000 * scale
+            baseline = baseline or median
+            results.setdefault(payload, {})[strategy] = {"median_ms": round(median, 4), "p95_ms": round(p95, 4)}
+            print(f"{payload:<10} {strategy:<26} {median:>18.3f} {p95:>10.3f} {baseline / median:>7.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
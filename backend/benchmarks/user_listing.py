@@ -0,0 +1,149 @@
+"""
+Admin user listing benchmark.
+
+Seeds a throwaway database with ``--users`` users and times the admin
+``GET /api/auth/`` listing through the real app: the first page, a deep page,
+and email prefix, name prefix and role searches. For comparison it also times
+what the endpoint used to do, ``db.query(User).all()`` serialized as one list.
+
+    cd backend
+    python -m benchmarks.user_listing --users 1000000 --repeat 50 --output user-listing.json
+
+Pass --database-url postgresql://... to run against an empty Postgres database
+instead of a temporary SQLite file.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.load_test import configure_environment
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Diya", "Ananya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Arjun"]
+LAST_NAMES = ["Sharma", "Verma", "Iyer", "Reddy", "Gupta", "Nair", "Singh", "Patel", "Khan", "Das"]
+
+
+def seed_users(n: int, seed: int, batch_size: int = 20000):
+    from sqlalchemy import insert
+
+    from core.database.database import engine
+    from core.models.models import User
+
+    rng = random.Random(seed)
+    # Placeholder hash; nothing logs in as these users
+    password = "$2b$12$" + "x" * 53
+    with engine.begin() as conn:
+        for start in range(0, n, batch_size):
+            rows = []
+            for i in range(start, min(n, start + batch_size)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                rows.append({
+                    "name": f"{first} {last}",
+                    "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+                    "phone": f"9{rng.randrange(10 ** 9):09d}",
+                    "password": password,
+                    "role": "admin" if i % 1000 == 0 else "user",
+                })
+            conn.execute(insert(User), rows)
+
+
+def measure(fn, repeat: int):
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShopKart admin user listing benchmark")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--legacy-repeat", type=int, default=3,
+                        help="runs of the old load-everything listing (0 skips it; it needs GBs of RAM at 1M users)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="shopkart-users-")
+    configure_environment(args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}", workdir)
+
+    from typing import List
+
+    from fastapi.testclient import TestClient
+
+    import main as app_module
+    from core.database.database import SessionLocal
+    from core.models.models import User
+    from core.schemas.schemas import UserOut
+    from core.services.auth import create_access_token
+    from core.utils.serialization import fast_json_response
+
+    started = time.perf_counter()
+    seed_users(args.users, args.seed)
+    print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+    client = TestClient(app_module.app)
+    db = SessionLocal()
+    admin = db.query(User).filter(User.role == "admin").first()
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": admin.email})}
+    deep_cursor = db.query(User.id).order_by(User.id.desc()).offset(100).limit(1).scalar()
+    db.close()
+
+    def get(query):
+        response = client.get(f"/api/auth/?{query}", headers=headers)
+        assert response.status_code == 200, response.text
+        return response
+
+    cases = {
+        "first page (50)": "limit=50",
+        "deep page (50)": f"limit=50&after={deep_cursor}",
+        "email prefix": "email=kavya.nair12",
+        "email prefix, broad": "email=di",
+        "name prefix": "name=saanvi%20k",
+        "role": "role=admin",
+        "role + name": "role=admin&name=ro",
+    }
+    results = {}
+    print(f"{'case':<22} {'p50 (ms)':>10} {'p95 (ms)':>10} {'rows':>6}")
+    for case, query in cases.items():
+        stats = measure(lambda: get(query), args.repeat)
+        stats["rows"] = len(get(query).json()["items"])
+        results[case] = stats
+        print(f"{case:<22} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['rows']:>6}")
+
+    def legacy():
+        session = SessionLocal()
+        try:
+            return fast_json_response(List[UserOut], session.query(User).all()).body
+        finally:
+            session.close()
+
+    if args.legacy_repeat:
+        tracemalloc.start()
+        legacy()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats = measure(legacy, args.legacy_repeat)
+        stats["peak_mb"] = round(peak / 2 ** 20, 1)
+        results["legacy .all()"] = stats
+        print(f"{'legacy .all()':<22} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {args.users:>6}  peak {stats['peak_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"users": args.users, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,142 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int
     database_url: str
 
+    # Rendered invoice PDFs (content-addressed)
+    invoice_dir: str = "storage/invoices"
+    # "process" renders invoices in a process pool, "inline" in the calling thread
+    invoice_render_backend: str = "process"
+    invoice_render_workers: int = 0  # 0 = one per CPU core; under server_mode=production, the cores per web worker
+    invoice_render_max_in_flight: int = 16
+
+    # Razorpay client: per-request timeouts and circuit breaker
+    razorpay_connect_timeout: float = 3.0
+    razorpay_read_timeout: float = 10.0
+    razorpay_max_concurrent: int = 20
+    razorpay_failure_threshold: int = 5
+    razorpay_recovery_timeout: float = 30.0
+
+    # Transactional outbox worker (post-order side effects)
+    outbox_worker_enabled: bool = True
+    outbox_poll_interval: float = 1.0
+    outbox_batch_size: int = 50
+    outbox_max_attempts: int = 8
+    outbox_lease_seconds: int = 300
+
+    # Seconds between real DB round trips made by /health
+    health_probe_interval: float = 15.0
+
+    # SQL instrumentation
+    slow_query_ms: float = 200.0
+    slow_query_param_sample_rate: float = 0.1
+    n_plus_one_mode: str = "off"  # off | warn | raise; use warn/raise in dev and test
+    n_plus_one_threshold: int = 10
+
+    # Logging
+    log_level: str = "INFO"
+    log_levels: Dict[str, str] = {}  # per-logger overrides, e.g. LOG_LEVELS='{"core.routers.product": "DEBUG"}'
+    log_format: str = "json"  # json | text
+    log_queue_size: int = 10000
+
+    # HTTP caching for public catalog GETs, keyed by route template
+    http_cache_policies: Dict[str, str] = {
+        "/api/products": "public, max-age=60, stale-while-revalidate=300",
+        "/api/products/{product_id}": "public, max-age=60, stale-while-revalidate=300",
+        "/api/products/suggestion": "public, max-age=300, stale-while-revalidate=3600",
+        "/api/product/categories": "public, max-age=3600, stale-while-revalidate=86400",
+        "/api/pincodes/{pincode}": "public, max-age=86400",
+        "/api/shipping/quote": "public, max-age=600",
+    }
+    compression_min_size: int = 1024  # bytes; smaller bodies are sent as-is
+    gzip_level: int = 6
+
+    # Server started by `python main.py`; dev keeps uvicorn's autoreload
+    server_mode: str = "dev"  # dev | production
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = one per available core
+    server_backlog: int = 2048
+    server_keepalive: int = 75  # longer than nginx's upstream keepalive_timeout, so nginx closes first
+    server_timeout: int = 60  # a worker silent for this long is killed and replaced
+    server_graceful_timeout: int = 30  # time in-flight requests get to finish after SIGTERM
+    server_max_requests: int = 10000  # recycle a worker after this many requests; 0 disables
+    server_max_requests_jitter: int = 1000
+
+    # Rate limiting: token buckets of "<requests>/<seconds>" per client (user if authenticated, else IP)
+    rate_limit_enabled: bool = True
+    rate_limit_default: str = "100/10"  # per client across all routes
+    rate_limit_routes: Dict[str, str] = {  # per client per route, keyed "METHOD /route/template"
+        "POST /api/auth/login": "10/60",
+        "POST /api/auth/register": "5/60",
+        "GET /api/products/suggestion": "30/10",
+        "GET /api/exports/{dataset}": "5/60",  # each download holds a DB connection throughout
+    }
+    rate_limit_max_clients: int = 100000  # least recently seen buckets are dropped beyond this
+    # Reverse proxies (addresses or CIDRs) whose X-Forwarded-For is believed when keying anonymous clients
+    trusted_proxies: List[str] = ["127.0.0.1", "::1"]
+
+    # Load shedding: 503 + Retry-After while the DB pool or the event loop is saturated
+    load_shedding_enabled: bool = True
+    shed_pool_wait_ms: float = 100.0  # recent average pool checkout wait
+    shed_loop_lag_ms: float = 200.0  # recent event loop lag
+    shed_critical_factor: float = 4.0  # critical routes are shed only at this multiple of the thresholds
+    shed_retry_after: int = 5
+    critical_routes: List[str] = [  # checkout traffic, served ahead of browsing
+        "POST /api/orders",
+        "POST /api/payment/order",
+        "POST /api/auth/login",
+    ]
+
+    # Request profiling (opt-in): admins send "X-Profile: 1", or a sampled fraction of requests is captured
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # adjustable at runtime through PUT /api/system/profiles/sampling
+    profiling_interval: float = 0.005  # seconds between stack samples
+    profiling_dir: str = "storage/profiles"
+    profiling_max_captures: int = 100  # oldest captures are deleted beyond this
+
+    # Cart write-behind: quantity changes are buffered in memory and added onto cart_items in batches
+    cart_max_quantity: int = 10  # per line
+    cart_flush_interval: float = 1.0  # seconds; unflushed changes are lost if the process dies
+    cart_flush_batch: int = 500  # flush early once this many lines are waiting
+
+    # Product view tracking: views are buffered in memory and written in bulk
+    view_buffer_size: int = 100000  # ring buffer; the oldest unflushed views are dropped beyond this
+    view_flush_interval_ms: int = 500
+    view_flush_rows: int = 1000  # flush early once this many views are waiting
+    view_store_raw: bool = True  # also keep one product_views row per view
+    view_bucket_minutes: int = 60  # granularity of the per-product counters
+    trending_window_hours: int = 24
+    trending_cache_seconds: int = 60
+
+    # "Frequently bought together": co-occurrence batch job (python -m scripts.recommendations)
+    recommendations_top_k: int = 10
+    recommendations_min_support: int = 1  # orders two products must share before they are linked
+    recommendations_chunk_orders: int = 200000  # orders read and multiplied per step
+    recommendations_settle_seconds: int = 30  # orders younger than this wait for the next run (late commits)
+    recommendations_state_path: str = "storage/recommendations/cooccurrence.npz"  # matrix + watermark for incremental runs
+
+    # Sales rollups: orders folded into per-day totals in the background, read by /api/analytics/sales
+    rollup_worker_enabled: bool = True
+    rollup_interval: float = 60.0  # seconds between catch-up runs
+    rollup_settle_seconds: int = 30  # orders younger than this wait for the next run (late commits)
+    rollup_batch_orders: int = 5000  # orders folded per transaction
+
+    # Offline PIN -> district/state index, built by `python -m scripts.pincodes`
+    pincode_index_dir: str = "storage/pincodes"
+
+    # Shipping quotes: zone x courier rate card in core/services/shipping.py
+    shipping_origin_pincode: int = 560001  # warehouse; zones are relative to it
+    shipping_courier_preference: str = "cheapest"  # cheapest | fastest, used when assigning shipments
+    shipping_quote_max_destinations: int = 100
+
+    # Live order updates: GET /api/orders/events (server-sent events)
+    order_stream_poll_interval: float = 1.0  # seconds between change feed reads; commits in this process wake it at once
+    order_stream_heartbeat: float = 15.0  # comment frame on idle streams, well inside proxy read timeouts
+    order_stream_max_seconds: int = 900  # streams end after this and the browser reconnects, spreading them over workers
+    order_stream_queue_size: int = 100  # undelivered events per stream before a slow client is cut off
+    order_stream_max_connections: int = 10000  # per worker process
+    order_stream_retention_hours: int = 24  # change feed rows kept for Last-Event-ID replay
+    order_stream_token_seconds: int = 60  # lifetime of the ?access_token= EventSource connects with
+
     class Config:
         env_file = ".env"
 
@@ -3,10 +3,16 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from typing import Generator
 from core.config.settings import settings
+from core.database.instrumentation import instrument
+from core.services.load_shedding import track_checkout_wait
 
 DATABASE_URL = settings.database_url
 # Establish a connection to the PostgreSQL database
 engine = create_engine(DATABASE_URL)
+# Per-request query count/DB time, slow query log and N+1 detection
+instrument(engine)
+# Checkout wait feeds load shedding
+track_checkout_wait(engine)
 
 # Create database tables based on the defined SQLAlchemy models (subclasses of the Base class)
 Base = declarative_base()
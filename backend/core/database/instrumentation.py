@@ -0,0 +1,95 @@
+import contextvars
+import logging
+import random
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(Exception):
+    """Raised in ``raise`` mode when a request repeats one statement shape too often"""
+
+
+class RequestQueryStats:
+    """SQL activity of one request: query count, total DB time and statement shapes"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.flagged = set()
+
+
+# Set per request by SQLTimingMiddleware; worker threads inherit it through the context copy
+current_stats: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar(
+    "current_query_stats", default=None
+)
+
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+")
+_PARAM_LIST = re.compile(r"\?(\s*,\s*\?)+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize placeholders so 'IN (?, ?)' and 'IN (?, ?, ?)' count as the same statement"""
+    return _PARAM_LIST.sub("?", _NAMED_PARAM.sub("?", statement))
+
+
+def _sample_parameters(parameters) -> str:
+    if random.random() >= settings.slow_query_param_sample_rate:
+        return "<not sampled>"
+    return repr(parameters)[:500]
+
+
+def _check_n_plus_one(stats: RequestQueryStats, statement: str):
+    shape = statement_shape(statement)
+    stats.shapes[shape] += 1
+    if stats.shapes[shape] > settings.n_plus_one_threshold and shape not in stats.flagged:
+        stats.flagged.add(shape)
+        message = f"Possible N+1: statement ran {stats.shapes[shape]} times in one request: {shape[:300]}"
+        if settings.n_plus_one_mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats.get()
+    # Only reads: batched INSERTs legitimately repeat one statement per row
+    if stats is not None and settings.n_plus_one_mode != "off" and statement.lstrip()[:6].upper() == "SELECT":
+        _check_n_plus_one(stats, statement)
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+    if elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms): %s | params=%s",
+            elapsed * 1000, statement[:1000], _sample_parameters(parameters),
+        )
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
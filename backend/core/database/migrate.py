@@ -0,0 +1,133 @@
+"""
+Schema changes ``create_all`` can't make: indexes declared on tables that
+already exist. A unique index is only created after the duplicate rows it
+would reject have been folded together. Run once per deploy, before the
+workers start; ``server.serve`` and the dev entry point in ``main.py`` do:
+
+    cd backend
+    python -m scripts.migrate
+"""
+import logging
+from functools import partial
+
+from sqlalchemy import delete, func, inspect, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from core.config.settings import settings
+from core.database.database import Base, engine
+from core.models.models import Cart, CartItem, ProductReview, Shipment
+from core.services.reviews import apply_rating_change
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def _duplicates(db: Session, *columns) -> list:
+    return db.query(*columns)\
+        .filter(*(column.isnot(None) for column in columns))\
+        .group_by(*columns)\
+        .having(func.count() > 1)\
+        .all()
+
+
+def _drop_extra_shipments(db: Session) -> int:
+    # The first shipment is the one whose tracking number went out to the customer
+    dropped = 0
+    for (order_id,) in _duplicates(db, Shipment.order_id):
+        ids = [id for id, in db.query(Shipment.id).filter(Shipment.order_id == order_id).order_by(Shipment.id)]
+        dropped += db.execute(delete(Shipment).where(Shipment.id.in_(ids[1:]))).rowcount
+    return dropped
+
+
+def _merge_carts(db: Session, column) -> int:
+    # Lines move to the oldest cart, adding onto (capped) a line it already has for the variant
+    dropped = 0
+    for (owner,) in _duplicates(db, column):
+        keep, *extra = [id for id, in db.query(Cart.id).filter(column == owner).order_by(Cart.id)]
+        kept = {item.variant_id: item for item in db.query(CartItem).filter(CartItem.cart_id == keep)}
+        for item in db.query(CartItem).filter(CartItem.cart_id.in_(extra)).order_by(CartItem.id):
+            line = kept.get(item.variant_id)
+            if line is None:
+                item.cart_id = keep
+                kept[item.variant_id] = item
+            else:
+                line.quantity = min(settings.cart_max_quantity, (line.quantity or 0) + (item.quantity or 0))
+                db.delete(item)
+        db.flush()
+        dropped += db.execute(delete(Cart).where(Cart.id.in_(extra))).rowcount
+    return dropped
+
+
+def _merge_cart_items(db: Session) -> int:
+    dropped = 0
+    for cart_id, variant_id in _duplicates(db, CartItem.cart_id, CartItem.variant_id):
+        rows = db.query(CartItem.id, CartItem.quantity)\
+            .filter(CartItem.cart_id == cart_id, CartItem.variant_id == variant_id)\
+            .order_by(CartItem.id)\
+            .all()
+        quantity = min(settings.cart_max_quantity, sum(row.quantity or 0 for row in rows))
+        db.execute(update(CartItem).where(CartItem.id == rows[0].id).values(quantity=quantity))
+        dropped += db.execute(delete(CartItem).where(CartItem.id.in_([row.id for row in rows[1:]]))).rowcount
+    return dropped
+
+
+def _drop_older_reviews(db: Session) -> int:
+    # The latest review stands; the others come out of the rating summary too
+    dropped = 0
+    for product_id, user_id in _duplicates(db, ProductReview.product_id, ProductReview.user_id):
+        latest, *older = db.query(ProductReview.id, ProductReview.rating)\
+            .filter(ProductReview.product_id == product_id, ProductReview.user_id == user_id)\
+            .order_by(ProductReview.id.desc())\
+            .all()
+        for review in older:
+            apply_rating_change(db, product_id, review.rating, None)
+        dropped += db.execute(delete(ProductReview).where(ProductReview.id.in_([r.id for r in older]))).rowcount
+    return dropped
+
+
+def _index_names(conn: Connection, table: str) -> set:
+    if conn.dialect.name == "sqlite":
+        # The SQLite inspector leaves out expression indexes (lower(email))
+        return set(conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                                {"table": table}))
+    return {index["name"] for index in inspect(conn).get_indexes(table)}
+
+
+# Unique index -> clean-up that makes it creatable on existing data
+DEDUPE = {
+    "ux_shipments_order_id": _drop_extra_shipments,
+    "ux_carts_user_id": partial(_merge_carts, column=Cart.user_id),
+    "ux_carts_session_id": partial(_merge_carts, column=Cart.session_id),
+    "ux_cart_items_cart_id_variant_id": _merge_cart_items,
+    "ux_product_reviews_product_id_user_id": _drop_older_reviews,
+}
+
+
+def migrate(bind: Engine = engine) -> int:
+    """Create every declared index that is missing, in one transaction; returns how many were created"""
+    with Session(bind=bind) as db, db.begin():
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            existing = _index_names(db.connection(), table.name)
+            missing.extend(index for index in table.indexes if index.name not in existing)
+
+        for index in missing:
+            dedupe = DEDUPE.get(index.name)
+            if dedupe is not None:
+                dropped = dedupe(db)
+                if dropped:
+                    logger.warning("Removed %d duplicate rows from %s before creating %s",
+                                   dropped, index.table.name, index.name)
+            try:
+                db.execute(CreateIndex(index, if_not_exists=True))
+            except Exception as exc:
+                logger.error("Could not create index %s on %s; fix the rows it rejects and rerun "
+                             "python -m scripts.migrate: %s", index.name, index.table.name, exc)
+                raise MigrationError(f"Could not create index {index.name}") from exc
+            logger.info("Created index %s on %s", index.name, index.table.name)
+    return len(missing)
@@ -0,0 +1,41 @@
+from typing import List, Sequence
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert_increment(db: Session, model, keys: Sequence[str], increments: Sequence[str], rows: List[dict]):
+    """
+    Add each row's ``increments`` columns onto the existing row with the same
+    ``keys`` (which must carry a unique constraint), inserting it if missing.
+    One ``INSERT ... ON CONFLICT DO UPDATE`` on PostgreSQL and SQLite;
+    read-modify-write on other backends. Runs in the caller's transaction.
+    """
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in increments},
+        )
+        db.execute(stmt, rows)
+        return
+
+    key_of = lambda values: tuple(values[k] for k in keys)
+    existing = {
+        key_of(vars(obj)): obj
+        for obj in db.query(model).filter(or_(*(
+            and_(*(getattr(model, k) == row[k] for k in keys)) for row in rows
+        )))
+    }
+    for row in rows:
+        obj = existing.get(key_of(row))
+        if obj is None:
+            db.add(model(**row))
+        else:
+            for column in increments:
+                setattr(obj, column, getattr(obj, column) + row[column])
@@ -0,0 +1,145 @@
+import gzip
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from core.config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse ``Accept-Encoding`` into {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = _accepted_encodings(header)
+    for coding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on both sides
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class HTTPCacheMiddleware:
+    """
+    Makes the public catalog cacheable by browsers and the nginx front.
+
+    For GET requests whose route template has a policy in ``settings.http_cache_policies``
+    and that return 200, the body is buffered to:
+
+    * add the configured ``Cache-Control`` (``max-age`` + ``stale-while-revalidate``),
+    * add a weak ETag over the uncompressed body and answer a matching
+      ``If-None-Match`` with 304 and no body,
+    * compress with brotli (when installed) or gzip once the body reaches
+      ``settings.compression_min_size``.
+
+    The ETag is weak because the compressed and plain representations differ
+    byte-for-byte but are semantically identical. Every other request passes
+    straight through.
+    """
+
+    def __init__(self, app, policies: Dict[str, str] = None, min_size: int = None):
+        self.app = app
+        self.policies = policies if policies is not None else settings.http_cache_policies
+        self.min_size = settings.compression_min_size if min_size is None else min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        start_message = None
+        policy = None
+        body_parts: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, policy, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                # Routing has run by now, so the matched route is in the shared scope
+                route = scope.get("route")
+                policy = self.policies.get(getattr(route, "path", None))
+                if policy is None or message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_cached(start_message, policy, b"".join(body_parts), request_headers, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_cached(self, start_message, policy: str, body: bytes, request_headers, send):
+        headers: List[Tuple[bytes, bytes]] = [
+            (k, v) for k, v in start_message.get("headers", [])
+            if k.lower() not in (b"content-length", b"etag", b"vary")
+        ]
+        vary = [v for k, v in start_message.get("headers", []) if k.lower() == b"vary"]
+        vary.append(b"Accept-Encoding")
+
+        etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        cache_headers = [(b"etag", etag.encode("latin-1")), (b"vary", b", ".join(vary))]
+        if not any(k.lower() == b"cache-control" for k, _ in headers):
+            cache_headers.append((b"cache-control", policy.encode("latin-1")))
+
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match.decode("latin-1"), etag):
+            not_modified = [(k, v) for k, v in headers if k.lower() != b"content-type"] + cache_headers
+            await send({"type": "http.response.start", "status": 304, "headers": not_modified})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        already_encoded = any(k.lower() == b"content-encoding" for k, _ in headers)
+        encoding = None
+        if len(body) >= self.min_size and not already_encoded:
+            encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding == "br":
+            body = brotli.compress(body, quality=5)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=settings.gzip_level)
+        if encoding is not None:
+            cache_headers.append((b"content-encoding", encoding.encode("latin-1")))
+
+        cache_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": 200, "headers": headers + cache_headers})
+        await send({"type": "http.response.body", "body": body})
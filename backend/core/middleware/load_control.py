@@ -0,0 +1,138 @@
+import ipaddress
+import math
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+from core.config.settings import settings
+from core.services.auth import ALGORITHM, SECRET_KEY
+from core.services.load_shedding import load_monitor
+from core.services.metrics import http_requests_rejected_total
+from core.services.rate_limit import RateLimiter
+
+# Probes and scrapes must keep working while the API is shedding
+EXEMPT_ROUTES = {"/health", "/metrics"}
+# (method, path) -> route template; bounded since paths carry ids
+ROUTE_CACHE_SIZE = 10000
+
+
+class LoadControlMiddleware:
+    """
+    Protects the threadpool and DB pool from any single client and from overload.
+
+    1. Load shedding: while the recent DB pool checkout wait or event loop lag is
+       over its threshold, browsing requests get 503 with ``Retry-After``. Checkout
+       routes (``settings.critical_routes``) are only shed at
+       ``shed_critical_factor`` times the thresholds, so they keep the capacity.
+    2. Rate limiting: token buckets per client (the user from the bearer token,
+       else the IP) across all routes, plus per-route buckets from
+       ``settings.rate_limit_routes``. Over the limit gets 429 with ``Retry-After``.
+
+    Both run before the request reaches a handler, so a refused request costs no
+    thread and no connection. Routes are matched here because the router has not
+    run yet; ``router`` is the app's router. The IP of an anonymous client is
+    read from X-Forwarded-For only when the connection comes from one of
+    ``settings.trusted_proxies``; behind nginx the peer is always nginx.
+    """
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+        self.limiter = RateLimiter(settings.rate_limit_max_clients)
+        self.trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.trusted_proxies]
+        self._templates: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+
+    def _route_template(self, scope) -> Optional[str]:
+        key = (scope["method"], scope["path"])
+        if key in self._templates:
+            self._templates.move_to_end(key)
+            return self._templates[key]
+        template = None
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        self._templates[key] = template
+        if len(self._templates) > ROUTE_CACHE_SIZE:
+            self._templates.popitem(last=False)
+        return template
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _remote_address(self, scope) -> str:
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        if not self._trusted(address):
+            return address
+        hops = []
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                hops.extend(hop.strip() for hop in value.decode("latin-1").split(","))
+        # Each proxy appends the peer it saw; the first hop from the right that isn't ours is the client
+        for hop in reversed([hop for hop in hops if hop]):
+            address = hop
+            if not self._trusted(hop):
+                break
+        return address
+
+    def _client(self, scope) -> Tuple[str, str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        # Signature and expiry are verified; the user row is not looked up
+                        subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+                    except JWTError:
+                        subject = None
+                    if subject:
+                        return "user", subject
+                break
+        return "ip", self._remote_address(scope)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        template = self._route_template(scope)
+        if template in EXEMPT_ROUTES:
+            await self.app(scope, receive, send)
+            return
+        route_key = f"{scope['method']} {template or 'unmatched'}"
+
+        if load_monitor.should_shed(critical=route_key in settings.critical_routes):
+            await self._reject(scope, receive, send, 503, "Server is busy, please retry shortly",
+                               settings.shed_retry_after, "shed", route_key)
+            return
+
+        if settings.rate_limit_enabled:
+            client = self._client(scope)
+            retry_after = self.limiter.hit(client, settings.rate_limit_default)
+            route_rate = settings.rate_limit_routes.get(route_key)
+            if not retry_after and route_rate:
+                retry_after = self.limiter.hit((route_key, client), route_rate)
+            if retry_after:
+                await self._reject(scope, receive, send, 429, "Too many requests",
+                                   math.ceil(retry_after), "rate_limited", route_key)
+                return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: int, reason: str,
+                      route_key: str):
+        http_requests_rejected_total.inc(reason, route_key)
+        response = JSONResponse(
+            status_code=status_code, content={"detail": detail}, headers={"Retry-After": str(retry_after)}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,41 @@
+import time
+
+from core.services.metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status counts and in-flight requests.
+
+    Requests are labelled with the matched route template (``/api/products/{product_id}``),
+    not the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the (shared) scope dict
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(scope["method"], route_path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, scope["method"], route_path)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import random
+import time
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.services.auth import get_current_admin, get_current_user
+from core.services.profiling import (
+    RequestSampler, capture_metadata, current_capture, profile_store, profiling_state,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _is_admin(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        get_current_admin(get_current_user(token=token, db=db))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (``settings.profiling_enabled``) per-request profiling.
+
+    A request is captured when an admin sends ``X-Profile: 1`` (checked with
+    ``get_current_admin``; anyone else's header is ignored), or at random with
+    probability ``profiling_state.sample_rate``. Header-triggered responses carry
+    ``X-Profile-ID``; captures are listed and downloaded under ``/api/system/profiles``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def _trigger(self, scope):
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile", b"").lower() in (b"1", b"true", b"yes"):
+            scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token and await run_in_threadpool(_is_admin, token):
+                return "header"
+            return None
+        if profiling_state.sample_rate and random.random() < profiling_state.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        capture = RequestSampler(asyncio.current_task(), settings.profiling_interval)
+        token = current_capture.set(capture)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trigger == "header":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", capture.id.encode())]
+            await send(message)
+
+        capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            capture.stop()
+            current_capture.reset(token)
+            meta = capture_metadata(capture, scope, status_code, started, trigger)
+            try:
+                await run_in_threadpool(profile_store.save, capture, meta)
+            except OSError:
+                logger.exception("Could not store profile %s", capture.id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, DECIMAL, ARRAY
+from sqlalchemy import func, Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Enum, DECIMAL, ARRAY, Index, UniqueConstraint
 import enum
 import datetime
 from sqlalchemy.orm import relationship
@@ -27,6 +27,12 @@ class PaymentStatus(str, enum.Enum):
     paid = "paid"
     failed = "failed"
 
+class OutboxStatus(str, enum.Enum):
+    pending = "pending"
+    processing = "processing"
+    done = "done"
+    failed = "failed"
+
 class CourierPartners(str, enum.Enum):
     DTDC = "DTDC"
     BlueDart = "BlueDart"
@@ -46,10 +52,17 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+# Admin user search (core/services/user_search.py): case-insensitive prefix ranges on lower(email) / lower(name),
+# compared bytewise. PostgreSQL needs the "C" collation for that; SQLite's default collation already is.
+for _column in (User.email, User.name):
+    _expression = func.lower(_column)
+    Index(f"ix_users_{_column.key}_lower", _expression.collate("C") if engine.dialect.name == "postgresql" else _expression)
+Index("ix_users_role_id", User.role, User.id)
+
 class UserAddress(Base):
     __tablename__ = "user_addresses"
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     address_line1 = Column(String)
     city = Column(String)
     state = Column(String)
@@ -74,6 +87,9 @@ class Product(Base):
     category_id = Column(Integer, ForeignKey("product_categories.id"))
     image_url = Column(Text)
     category = relationship("ProductCategory")
+    # Joined into every product query, so listings carry ratings without another round trip
+    rating_summary = relationship("ProductRatingSummary", uselist=False, lazy="joined")
+    recommendation = relationship("ProductRecommendation", uselist=False)
 
 class ProductVariant(Base):
     __tablename__ = "product_variants"
@@ -95,6 +111,11 @@ class Order(Base):
     order_status = Column(Enum(OrderStatus))
     payment_status = Column(Enum(PaymentStatus))
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    user = relationship("User")
+    shipping_address = relationship("UserAddress")
+    items = relationship("OrderItem", order_by="OrderItem.id")
+    payment = relationship("Payment", uselist=False)
+    shipment = relationship("Shipment", uselist=False)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -126,12 +147,19 @@ class Shipment(Base):
     shipped_at = Column(DateTime)
     delivery_estimate = Column(DateTime)
     status = Column(String)
+    # One shipment per order, even when two deliveries of the outbox event race
+    __table_args__ = (Index("ux_shipments_order_id", "order_id", unique=True),)
 
 class Cart(Base):
     __tablename__ = "carts"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     session_id = Column(String)
+    # One cart per user and per guest session; concurrent first adds race on these
+    __table_args__ = (
+        Index("ux_carts_user_id", "user_id", unique=True),
+        Index("ux_carts_session_id", "session_id", unique=True),
+    )
 
 class CartItem(Base):
     __tablename__ = "cart_items"
@@ -139,6 +167,8 @@ class CartItem(Base):
     cart_id = Column(Integer, ForeignKey("carts.id"))
     variant_id = Column(Integer, ForeignKey("product_variants.id"))
     quantity = Column(Integer)
+    # One line per variant, the conflict target of the cart's upserts
+    __table_args__ = (Index("ux_cart_items_cart_id_variant_id", "cart_id", "variant_id", unique=True),)
 
 class ProductView(Base):
     __tablename__ = "product_views"
@@ -147,8 +177,23 @@ class ProductView(Base):
     product_id = Column(Integer, ForeignKey("products.id"))
     viewed_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+# Views per product per time bucket, maintained by the view tracker's flushes
+class ProductViewCount(Base):
+    __tablename__ = "product_view_counts"
+    __table_args__ = (UniqueConstraint("product_id", "bucket_start"),)
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    views = Column(Integer, nullable=False, default=0)
+
 class ProductReview(Base):
     __tablename__ = "product_reviews"
+    __table_args__ = (
+        # Keyset pagination walks a product's reviews by id
+        Index("ix_product_reviews_product_id_id", "product_id", "id"),
+        # One review per user per product, also when two submissions race
+        Index("ux_product_reviews_product_id_user_id", "product_id", "user_id", unique=True),
+    )
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey("products.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -159,5 +204,74 @@ class ProductReview(Base):
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     is_verified = Column(Boolean)
 
+# Top co-purchased products, written by the recommendations batch job (scripts/recommendations.py)
+class ProductRecommendation(Base):
+    __tablename__ = "product_recommendations"
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    neighbour_ids = Column(Text, nullable=False)  # comma-separated, strongest first
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+# Running totals of a product's reviews, adjusted in the same transaction as every review write
+class ProductRatingSummary(Base):
+    __tablename__ = "product_rating_summaries"
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+
+    @property
+    def histogram(self):
+        return [self.stars_1, self.stars_2, self.stars_3, self.stars_4, self.stars_5]
+
+# Sales totals per day and dimension ("total", "category", "brand", "payment_status"), kept by the rollup job
+class SalesRollup(Base):
+    __tablename__ = "sales_rollups"
+    __table_args__ = (UniqueConstraint("day", "dimension", "key"),)
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    dimension = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    revenue = Column(DECIMAL, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+
+# Last order id folded into the rollups; advanced in the same transaction as the rollup rows
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+    name = Column(String, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    id = Column(Integer, primary_key=True)
+    topic = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    claimed_at = Column(DateTime)
+    processed_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class OrderStatusEvent(Base):
+    """Change feed of order and shipment statuses, read by the live order updates stream"""
+    __tablename__ = "order_status_events"
+    __table_args__ = (Index("ix_order_status_events_user_id_id", "user_id", "id"),)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    kind = Column(String, nullable=False)  # order | shipment
+    status = Column(String, nullable=False)
+    data = Column(Text)  # JSON extras, e.g. courier and tracking number
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    order = relationship("Order")
+
 
 Base.metadata.create_all(bind=engine)
+# create_all skips tables that already exist; indexes declared on them since come from core/database/migrate.py
@@ -6,10 +6,26 @@ from typing import List
 from core.models.models import UserAddress, User
 
 from core.services.auth import get_current_user
+from core.services.pincodes import address_fingerprint, canonical_state, pincode_index
 
 router = APIRouter(tags=["Account Address"], prefix="/account/addresses")
 
 
+def normalize(values: dict) -> dict:
+    """Tidy free-text fields; the state comes from the PIN when the index knows it"""
+    for key in ("address_line1", "city"):
+        if values.get(key) is not None:
+            values[key] = " ".join(values[key].split())
+    if values.get("state") is not None:
+        values["state"] = canonical_state(values["state"])
+    place = pincode_index.lookup(values["zip_code"]) if values.get("zip_code") is not None else None
+    if place:
+        values["state"] = place["state"]
+        if not values.get("city"):
+            values["city"] = place["city"]
+    return values
+
+
 @router.get("", response_model=List[UserAddressResponse])
 def get_all(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     addresses = db.query(UserAddress).filter(UserAddress.user_id == current_user.id).all()
@@ -24,17 +40,16 @@ def get_address(id: int, current_user: User = Depends(get_current_user), db: Ses
 
 @router.post("", response_model=UserAddressResponse)
 def create(address: UserAddressCreate, _: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    new_address = UserAddress(**address.model_dump())
+    new_address = UserAddress(**normalize(address.model_dump()))
     new_address.user_id = _.id
-    existing_address = db.query(UserAddress).filter(
-        UserAddress.user_id == new_address.user_id,
-        UserAddress.address_line1 == new_address.address_line1,
-        UserAddress.city == new_address.city,
-        UserAddress.zip_code == new_address.zip_code
-    ).first()
-    if existing_address:
+    # "12, MG Rd." and "12 mg road" at the same PIN are one address
+    fingerprint = address_fingerprint(new_address.address_line1, new_address.zip_code)
+    saved = db.query(UserAddress.address_line1, UserAddress.zip_code)\
+        .filter(UserAddress.user_id == new_address.user_id)\
+        .all()
+    if any(address_fingerprint(line1 or "", zip_code or 0) == fingerprint for line1, zip_code in saved):
         raise HTTPException(status_code=400, detail="Address already exists")
-    
+
     db.add(new_address)
     db.commit()
     db.refresh(new_address)
@@ -45,7 +60,7 @@ def update_address(id: int, updated: UserAddressUpdate, db: Session = Depends(ge
     address = db.query(UserAddress).get(id)
     if not address:
         raise HTTPException(status_code=404, detail="Address not found")
-    for key, value in updated.model_dump(exclude_unset=True).items():
+    for key, value in normalize(updated.model_dump(exclude_unset=True)).items():
         setattr(address, key, value)
     db.commit()
     db.refresh(address)
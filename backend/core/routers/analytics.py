@@ -0,0 +1,66 @@
+import datetime
+from decimal import Decimal
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.database.database import get_db
+from core.models.models import ProductCategory, RollupWatermark, SalesRollup, User
+from core.schemas.schemas import SalesReport
+
+from core.services.auth import get_current_admin
+from core.services.sales_rollup import WATERMARK
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+MAX_RANGE_DAYS = 366
+
+
+# Admin-only route: revenue, units and orders from the pre-aggregated rollups
+@router.get("/sales", response_model=SalesReport)
+def sales(
+    dimension: Literal["day", "category", "brand", "payment_status"] = Query("day"),
+    start_date: Optional[datetime.date] = Query(None, description="Defaults to 30 days before end_date"),
+    end_date: Optional[datetime.date] = Query(None, description="Defaults to today (UTC)"),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_admin)
+):
+    """
+    Reads only `sales_rollups` rows in the date range (one per day per key), so the cost does not
+    grow with order history. Orders appear once the rollup job has folded them in; see `last_order_id`.
+    """
+    end_date = end_date or datetime.datetime.utcnow().date()
+    start_date = start_date or end_date - datetime.timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RANGE_DAYS} days per request")
+
+    stored = "total" if dimension == "day" else dimension
+    key = SalesRollup.day if dimension == "day" else SalesRollup.key
+    rows = db.query(
+        key,
+        func.sum(SalesRollup.revenue),
+        func.sum(SalesRollup.units),
+        func.sum(SalesRollup.orders),
+    )\
+        .filter(SalesRollup.dimension == stored, SalesRollup.day >= start_date, SalesRollup.day <= end_date)\
+        .group_by(key)\
+        .order_by(key if dimension == "day" else func.sum(SalesRollup.revenue).desc())\
+        .all()
+
+    labels = {}
+    if dimension == "category":
+        labels = {str(c.id): c.name for c in db.query(ProductCategory.id, ProductCategory.name)}
+
+    watermark = db.get(RollupWatermark, WATERMARK)
+    return {
+        "dimension": dimension,
+        "start_date": start_date,
+        "end_date": end_date,
+        "rows": [
+            {"key": str(k), "label": labels.get(str(k)), "revenue": Decimal(str(revenue or 0)).quantize(Decimal("0.01")), "units": units or 0, "orders": orders or 0}
+            for k, revenue, units, orders in rows
+        ],
+        "last_order_id": watermark.last_order_id if watermark else 0,
+    }
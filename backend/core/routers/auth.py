@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from core.database.database import get_db
-from core.schemas.schemas import UserOut, UserCreate, Token, UserLogin
+from core.schemas.schemas import UserOut, UserCreate, UserPage, Token, UserLogin
 from core.utils.utils import hash_password, verify_password
 
-from core.models.models import User
+from core.models.models import User, UserRole
 from core.services.auth import create_access_token, get_current_user, get_current_admin
+from core.services.cart import cart_service
+from core.services.user_search import search_users
+from core.utils.serialization import fast_json_response
 
 router = APIRouter(tags=["Auth"], prefix="/auth")
 
@@ -36,7 +40,10 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
     if not db_user or not verify_password(user.password, db_user.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    
+
+    if user.session_id:
+        cart_service.merge_guest(db, user.session_id, db_user.id)
+
     access_token = create_access_token(data={"sub": db_user.email, "name": db_user.name, "id": db_user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -45,7 +52,16 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 def get(current_user: User = Depends(get_current_user)):
     return current_user
 
-# Admin-only route: Get all users
-@router.get("/", response_model=list[UserOut])
-def get_all(db: Session = Depends(get_db), _: User = Depends(get_current_admin)):
-    return db.query(User).all()
+# Admin-only route: page through users, optionally searching by email/name prefix and role
+@router.get("/", response_model=UserPage)
+def get_all(
+    after: Optional[int] = Query(None, gt=0, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    email: Optional[str] = Query(None, min_length=1, max_length=255, description="Email prefix, case-insensitive"),
+    name: Optional[str] = Query(None, min_length=1, max_length=255, description="Name prefix, case-insensitive"),
+    role: Optional[UserRole] = Query(None),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_admin)
+):
+    page = search_users(db, after, limit, email=email, name=name, role=role)
+    return fast_json_response(UserPage, page)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from core.config.settings import settings
+from core.database.database import get_db
+from core.schemas.schemas import CartItemAdd, CartItemUpdate, CartResponse, CartShippingQuote, QuotePin
+from core.models.models import User, UserAddress
+
+from core.services.auth import get_optional_user
+from core.services.cart import cart_service, hydrate_cart
+from core.services.shipping import quote
+
+router = APIRouter(tags=["Cart"], prefix="/cart")
+
+
+# Signed-in users get their own cart; guests are identified by a client-generated session id
+def cart_key(current_user: Optional[User] = Depends(get_optional_user),
+             x_cart_session: Optional[str] = Header(default=None, max_length=255)):
+    if current_user is not None:
+        return ("user", current_user.id)
+    if x_cart_session:
+        return ("session", x_cart_session)
+    raise HTTPException(status_code=400, detail="Sign in or send an X-Cart-Session header")
+
+
+@router.get("", response_model=CartResponse)
+def get_cart(key=Depends(cart_key), db: Session = Depends(get_db)):
+    return hydrate_cart(db, key)
+
+@router.post("/items", response_model=CartResponse)
+def add_item(item: CartItemAdd, key=Depends(cart_key), db: Session = Depends(get_db)):
+    cart_service.add(db, key, item.variant_id, item.quantity)
+    return hydrate_cart(db, key)
+
+@router.put("/items/{variant_id}", response_model=CartResponse)
+def update_item(variant_id: int, item: CartItemUpdate, key=Depends(cart_key), db: Session = Depends(get_db)):
+    cart_service.update(db, key, variant_id, item.quantity)
+    return hydrate_cart(db, key)
+
+@router.delete("/items/{variant_id}", response_model=CartResponse)
+def remove_item(variant_id: int, key=Depends(cart_key), db: Session = Depends(get_db)):
+    cart_service.remove(db, key, variant_id)
+    return hydrate_cart(db, key)
+
+# Shipping for the whole cart to the given PINs, or to every saved address of a signed-in user
+@router.get("/shipping", response_model=CartShippingQuote)
+def get_shipping_quote(zip_code: Optional[List[QuotePin]] = Query(None), key=Depends(cart_key), db: Session = Depends(get_db)):
+    units = sum(cart_service.lines(db, key).values())
+    if zip_code:
+        destinations = [(pin, None) for pin in zip_code]
+    elif key[0] == "user":
+        destinations = db.query(UserAddress.zip_code, UserAddress.id)\
+            .filter(UserAddress.user_id == key[1], UserAddress.zip_code.isnot(None))\
+            .order_by(UserAddress.id)\
+            .all()
+    else:
+        raise HTTPException(status_code=400, detail="Pass zip_code or sign in to quote saved addresses")
+    if len(destinations) > settings.shipping_quote_max_destinations:
+        raise HTTPException(status_code=400, detail=f"At most {settings.shipping_quote_max_destinations} destinations per quote")
+
+    quotes = quote([pin for pin, _ in destinations], units)
+    for row, (_, address_id) in zip(quotes, destinations):
+        row["address_id"] = address_id
+    return {"item_count": units, "quotes": quotes}
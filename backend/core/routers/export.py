@@ -0,0 +1,32 @@
+import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from core.models.models import User
+
+from core.services.auth import get_current_admin
+from core.services.data_export import stream_export
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+# Admin-only route: full dataset download, streamed from a server-side cursor
+@router.get("/{dataset}")
+def export(
+    dataset: Literal["orders", "payments", "products", "users"],
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    start_date: Optional[datetime.date] = Query(None, description="Orders, users created / payments made on or after this date"),
+    end_date: Optional[datetime.date] = Query(None, description="Orders, users created / payments made on or before this date"),
+    _: User = Depends(get_current_admin),
+):
+    start = datetime.datetime.combine(start_date, datetime.time.min) if start_date else None
+    end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min) if end_date else None
+
+    filename = f"{dataset}-{start_date or 'all'}-{end_date or 'all'}.{format}"
+    return StreamingResponse(
+        stream_export(dataset, format, start, end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from core.services.health import database_health
+from core.services.metrics import registry
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/health")
+def health():
+    database = database_health.check()
+    status_code = 200 if database["ok"] else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ok" if database["ok"] else "unavailable", "database": database},
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
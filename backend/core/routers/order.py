@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from core.services.razorpay import client
+from core.services.razorpay import UNAVAILABLE_DETAIL, fetch_payment
 import datetime
+import logging
 from typing import List, Optional
 
-from core.database.database import get_db
-from core.models.models import CourierPartners, Order, OrderItem, OrderStatus, Payment, PaymentStatus, Shipment, User, UserAddress
-from core.schemas.schemas import OrderCreateRequest, OrderResponse, OrderWithTotalResponse
-from core.services.auth import get_current_user
-from core.services.pdf_service import InvoicePDFService
-import random
+from core.config.settings import settings
+from core.database.database import SessionLocal, get_db
+from core.middleware.http_cache import etag_matches
+from core.models.models import Order, OrderItem, OrderStatus, Payment, PaymentStatus, User
+from core.schemas.schemas import (
+    OrderCreateRequest, OrderDetailResponse, OrderResponse, OrderWithTotalResponse, StreamTokenResponse,
+)
+from core.services.auth import (
+    create_scoped_token, get_current_admin, get_current_user, optional_oauth2_scheme, verify_scoped_token,
+)
+from core.services.invoice_export import stream_invoice_zip
+from core.services.invoice_store import get_or_render_invoice
+from core.services.order_events import enqueue_order_created
+from core.services.order_loader import load_order_aggregate
+from core.services.order_stream import order_stream
+from core.services.outbox import outbox_worker
+from core.utils.serialization import fast_json_response
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
+logger = logging.getLogger(__name__)
+
+STREAM_SCOPE = "order_events"
 
 @router.get("", response_model=OrderWithTotalResponse)
 def get_orders(
@@ -27,77 +42,127 @@ def get_orders(
     results = query.order_by(Order.created_at.desc()).offset(offset).limit(limit).all()
 
     # Optionally return metadata
-    return { "total": total, "orders": results }
+    return fast_json_response(OrderWithTotalResponse, { "total": total, "orders": results })
+
+# EventSource can't set headers, so the stream also takes ?access_token=. That ends up in access logs and
+# browser history, so it only accepts a short-lived token from POST /orders/events/token, never a login token.
+# The session is closed before streaming starts; an open stream holds no DB connection.
+def stream_user(token: Optional[str] = Depends(optional_oauth2_scheme),
+                access_token: Optional[str] = Query(None)) -> int:
+    if access_token:
+        return verify_scoped_token(access_token, STREAM_SCOPE)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    db = SessionLocal()
+    try:
+        return get_current_user(token=token, db=db).id
+    finally:
+        db.close()
+
+# Token for opening (or, once the stream ends, reopening) GET /orders/events from EventSource
+@router.post("/events/token", response_model=StreamTokenResponse)
+def order_status_events_token(user: User = Depends(get_current_user)):
+    expires_in = settings.order_stream_token_seconds
+    token = create_scoped_token(user, STREAM_SCOPE, datetime.timedelta(seconds=expires_in))
+    return {"access_token": token, "expires_in": expires_in}
+
+# Live order and shipment status changes for the signed-in user, as server-sent events
+@router.get("/events")
+async def order_status_events(user_id: int = Depends(stream_user),
+                              last_event_id: Optional[int] = Header(None)):
+    if order_stream.full:
+        raise HTTPException(status_code=503, detail="Too many open update streams, please retry shortly",
+                            headers={"Retry-After": "5"})
+    return StreamingResponse(
+        order_stream.stream(user_id, last_event_id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold events back in its proxy buffer
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Admin-only route: bulk export of invoices as a streamed ZIP
+@router.get("/invoices/export")
+def export_invoices(
+    start_date: Optional[datetime.date] = Query(None, description="Orders created on or after this date"),
+    end_date: Optional[datetime.date] = Query(None, description="Orders created on or before this date"),
+    user_id: Optional[int] = Query(None, gt=0),
+    _: User = Depends(get_current_admin),
+):
+    filters = []
+    if start_date:
+        filters.append(Order.created_at >= datetime.datetime.combine(start_date, datetime.time.min))
+    if end_date:
+        filters.append(Order.created_at < datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min))
+    if user_id:
+        filters.append(Order.user_id == user_id)
+
+    filename = f"invoices-{start_date or 'all'}-{end_date or 'all'}.zip"
+    return StreamingResponse(
+        stream_invoice_zip(filters),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/{order_id}", response_model=OrderDetailResponse)
+def get_order(
+    order_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get an order with its items, address, payment and shipment"""
+    order = load_order_aggregate(db, order_id, user_id=current_user.id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
 
 @router.get("/{order_id}/invoice")
 def download_invoice(
     order_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Download invoice PDF for a specific order"""
+    order = load_order_aggregate(db, order_id, user_id=current_user.id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
     try:
-        # Get the order with all related data
-        order = db.query(Order).filter(
-            Order.id == order_id,
-            Order.user_id == current_user.id
-        ).first()
-        
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        
-        # Get order items with product and variant information
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
-        
-        if not order_items:
-            raise HTTPException(status_code=404, detail="No items found for this order")
-        
-        # Get user information
-        user = db.query(User).filter(User.id == order.user_id).first()
-        
-        # Get shipping address
-        shipping_address = db.query(UserAddress).filter(UserAddress.id == order.shipping_address_id).first()
-        
-        if not shipping_address:
-            raise HTTPException(status_code=404, detail="Shipping address not found")
-        
-        # Get payment information
-        payment = db.query(Payment).filter(Payment.order_id == order_id).first()
-        
-        if not payment:
-            raise HTTPException(status_code=404, detail="Payment information not found")
-        
-        # Generate PDF
-        pdf_service = InvoicePDFService()
-        pdf_buffer = pdf_service.generate_invoice_pdf(
-            order=order,
-            order_items=order_items,
-            user=user,
-            shipping_address=shipping_address,
-            payment=payment
-        )
-        
-        # Return the PDF as a streaming response
-        return StreamingResponse(
-            iter([pdf_buffer.getvalue()]),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=invoice-{order_id:06d}.pdf"
-            }
-        )
-        
+        # Served from the on-disk store; rendered only on the first download or after a status change
+        path, digest = get_or_render_invoice(order)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate invoice: {str(e)}")
 
+    etag = f'"{digest}"'
+    headers = {"etag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse streams from disk and answers Range requests
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"invoice-{order_id:06d}.pdf",
+        headers=headers
+    )
+
 @router.post("", response_model=OrderResponse)
 async def create_order(
     payload: OrderCreateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    try:
+        # Runs in a worker thread with backoff; fails fast while the circuit is open
+        payment_data = await fetch_payment(payload.payment_id)
+    except Exception:
+        raise HTTPException(status_code=424, detail=UNAVAILABLE_DETAIL)
+
     try:
         total_amount = sum(line.quantity * line.price for line in payload.order_lines)
-        payment_data = client.payment.fetch(payload.payment_id)
 
         order = Order(
             user_id=current_user.id,
@@ -135,20 +200,14 @@ async def create_order(
             else PaymentStatus.failed
         )
 
-        courier_name = random.choice([c.value for c in CourierPartners])
-        db.add(Shipment(
-            order_id=order.id,
-            courier_name=courier_name,
-            tracking_number=str(random.randint(1000000000, 9999999999)),
-            shipped_at=datetime.datetime.utcnow(),
-            delivery_estimate=datetime.datetime.utcnow() + datetime.timedelta(days=random.randint(3, 7)),
-            status="pending"
-        ))
+        # Courier assignment, invoice rendering and notifications run from the outbox worker
+        enqueue_order_created(db, order)
 
         db.commit()  # 🔥 commit everything
+        outbox_worker.notify()
         db.refresh(order)  # optional, if you want updated values
         order.description = payment.description
-        print(order)
+        logger.info("Order %s created for user %s", order.id, current_user.id)
         return order
 
     except Exception as e:
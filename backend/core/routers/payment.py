@@ -5,7 +5,7 @@ from core.database.database import get_db
 from core.schemas.schemas import CreatePaymentOrderRequest, CreatePaymentOrderResponse
 from core.models.models import User
 
-from core.services.razorpay import client
+from core.services.razorpay import UNAVAILABLE_DETAIL, create_order
 from core.services.auth import get_current_user
 
 router = APIRouter(tags=["Payment"], prefix="/payment")
@@ -22,7 +22,8 @@ def create_razorpay_order(order: CreatePaymentOrderRequest, db: Session = Depend
             "payment_capture": 1,
         }
 
-        razorpay_order = client.order.create(data=order_payload)
+        # Retries, timeouts and the circuit breaker live in the razorpay service
+        razorpay_order = create_order(order_payload)
 
         return {
             "order_id": razorpay_order["id"],
@@ -33,4 +34,4 @@ def create_razorpay_order(order: CreatePaymentOrderRequest, db: Session = Depend
         }
 
     except Exception as e:
-        raise HTTPException(status_code=424, detail=f"Razorpay cannot process your request right now! Please try again later")
+        raise HTTPException(status_code=424, detail=UNAVAILABLE_DETAIL)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Path
+from core.schemas.schemas import PincodeResponse
+
+from core.services.pincodes import pincode_index
+
+router = APIRouter(tags=["Pincodes"], prefix="/pincodes")
+
+
+# Address form autofill: city and state for a PIN, answered from the local index
+@router.get("/{pincode}", response_model=PincodeResponse)
+def get_pincode(pincode: int = Path(..., ge=100000, le=999999)):
+    place = pincode_index.lookup(pincode)
+    if not place:
+        raise HTTPException(status_code=404, detail="Pincode not found")
+    return place
@@ -1,14 +1,20 @@
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from core.config.settings import settings
 from core.database.database import get_db
 from core.models.models import User, ProductCategory, Product, ProductVariant
-from core.schemas.schemas import ProductBulkRequest, ProductResponse, ProductByIdResponse
+from core.schemas.schemas import ProductBulkRequest, ProductResponse, ProductByIdResponse, TrendingProductResponse
 
-from core.services.auth import get_current_admin
+from core.services.auth import get_current_admin, get_optional_user
+from core.services.product_views import trending_products, view_tracker
+from core.utils.log import sampled
+from core.utils.serialization import fast_json_response
 
 router = APIRouter(prefix="/products", tags=["Products"])
+logger = logging.getLogger(__name__)
 
 @router.get("", response_model=List[ProductResponse])
 def get_with_query(
@@ -27,10 +33,8 @@ def get_with_query(
     if search:
         filters.append(Product.name.ilike(f"%{search}%"))
     if min_price is not None:
-        print(min_price)
         filters.append(Product.price >= min_price)
     if max_price is not None:
-        print(max_price)
         filters.append(Product.price <= max_price)
     if brand:
         filters.append(Product.brand.ilike(f"%{brand}%"))
@@ -42,8 +46,9 @@ def get_with_query(
         .offset(offset)\
         .all()
 
-    print(products)
-    return products
+    # Lazy %-formatting: nothing is built unless DEBUG is on for this logger
+    logger.debug("Product listing returned %d rows (%d filters)", len(products), len(filters))
+    return fast_json_response(List[ProductResponse], products)
  
 
 # Example name suggestion endpoint
@@ -54,11 +59,30 @@ def suggest_names(naming: str = Query(..., min_length=1), limit: int = 11, db: S
     """
     # Query the User table for names starting with the provided 'naming'
     suggestions = db.query(Product.name).filter(Product.name.ilike(f"%{naming}%")).limit(limit).all()
-    print(suggestions)
+    logger.debug("Suggestions for %r: %d matches", naming, len(suggestions), extra=sampled(0.01))
     
     # Extract names from the query result
     return [suggestion[0] for suggestion in suggestions]
 
+@router.get("/trending", response_model=List[TrendingProductResponse])
+def trending(
+    hours: int = Query(settings.trending_window_hours, ge=1, le=24 * 30),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Most viewed products over the last `hours`, from the pre-aggregated view counters.
+    """
+    return trending_products(db, hours, limit)
+
+@router.post("/{product_id}/views", status_code=202)
+def track_view(product_id: int, current_user: Optional[User] = Depends(get_optional_user)):
+    """
+    Record a product page view. Buffered in memory and written in bulk, so this never waits on the database.
+    """
+    view_tracker.record(product_id, current_user.id if current_user else None)
+    return {"message": "View recorded"}
+
 @router.get("/{product_id}", response_model=ProductByIdResponse)
 def get_product_variants(
     product_id: int,
@@ -67,12 +91,23 @@ def get_product_variants(
     """
     Get all variants for a specific product by product_id.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # The precomputed recommendation row is a primary key join, not a separate lookup
+    product = db.query(Product)\
+        .options(joinedload(Product.recommendation))\
+        .filter(Product.id == product_id)\
+        .first()
     if not product:
         raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
 
     variants = db.query(ProductVariant).filter(ProductVariant.product_id == product_id).all()
     product.variants= variants  # Attach variants to the product object
+
+    related = []
+    if product.recommendation:
+        ids = [int(i) for i in product.recommendation.neighbour_ids.split(",")]
+        by_id = {p.id: p for p in db.query(Product).filter(Product.id.in_(ids))}
+        related = [by_id[i] for i in ids if i in by_id]
+    product.frequently_bought_together = related
     return product
 
 @router.post("", status_code=201)
@@ -8,6 +8,7 @@ from core.schemas.schemas import BulkProductVariantRequest, ProductVariantCreate
 from typing import List
 
 from core.services.auth import get_current_admin, get_current_user
+from core.utils.serialization import fast_json_response
 
 router = APIRouter(prefix="/product/variants", tags=["Product Variants"])
 
@@ -23,21 +24,25 @@ def add(
     existing_skus = db.query(ProductVariant.sku).filter(ProductVariant.sku.in_(incoming_skus)).all()
     existing_sku_set = {sku for (sku,) in existing_skus}
 
+    # Step 2: Validate every referenced product in one query instead of one per variant
+    incoming_product_ids = {v.product_id for v in payload.variants}
+    existing_products = db.query(Product.id).filter(Product.id.in_(incoming_product_ids)).all()
+    existing_product_ids = {product_id for (product_id,) in existing_products}
+
     created_variants = []
     skipped = []
 
     for item in payload.variants:
         if item.sku in existing_sku_set:
             skipped.append({
-                "data": item.dict(),
+                "data": item.model_dump(),
                 "reason": f"SKU '{item.sku}' already exists"
             })
             continue
 
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
+        if item.product_id not in existing_product_ids:
             skipped.append({
-                "data": item.dict(),
+                "data": item.model_dump(),
                 "reason": f"Product with ID {item.product_id} not found"
             })
             continue
@@ -51,7 +56,7 @@ def add(
             price=item.price
         )
         db.add(variant)
-        created_variants.append(item.dict())
+        created_variants.append(item.model_dump())
 
     db.commit()
 
@@ -76,4 +81,4 @@ def get_variants_by_ids(ids: VariantIDListRequest, db: Session = Depends(get_db)
     if not variants:
         raise HTTPException(status_code=404, detail="No variants found for the given IDs")
 
-    return variants
\ No newline at end of file
+    return fast_json_response(List[ProductVariantCreate], variants)
\ No newline at end of file
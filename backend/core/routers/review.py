@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional
+from core.database.database import get_db
+from core.models.models import Product, ProductReview, User
+from core.schemas.schemas import ReviewCreate, ReviewPage, ReviewResponse, ReviewUpdate
+
+from core.services.auth import get_current_user
+from core.services.reviews import apply_rating_change, has_purchased
+
+router = APIRouter(prefix="/products/{product_id}/reviews", tags=["Reviews"])
+
+
+def _get_review(db: Session, product_id: int, review_id: int) -> ProductReview:
+    review = db.query(ProductReview).filter(ProductReview.id == review_id, ProductReview.product_id == product_id).first()
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review
+
+
+@router.get("", response_model=ReviewPage)
+def get_reviews(
+    product_id: int,
+    before: Optional[int] = Query(None, gt=0, description="next_cursor from the previous page"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Newest reviews first. Keyset pagination on (product_id, id), so deep pages cost the same as the first.
+    """
+    query = db.query(ProductReview).filter(ProductReview.product_id == product_id)
+    if before is not None:
+        query = query.filter(ProductReview.id < before)
+    # One extra row tells whether another page exists
+    reviews = query.order_by(ProductReview.id.desc()).limit(limit + 1).all()
+    next_cursor = reviews[limit - 1].id if len(reviews) > limit else None
+    return {"items": reviews[:limit], "next_cursor": next_cursor}
+
+@router.post("", response_model=ReviewResponse, status_code=201)
+def create(product_id: int, payload: ReviewCreate, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if not db.query(Product.id).filter(Product.id == product_id).first():
+        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    existing = db.query(ProductReview.id)\
+        .filter(ProductReview.product_id == product_id, ProductReview.user_id == user.id)\
+        .first()
+    if existing:
+        raise HTTPException(status_code=400, detail="You have already reviewed this product")
+
+    review = ProductReview(
+        product_id=product_id,
+        user_id=user.id,
+        is_verified=has_purchased(db, user.id, product_id),
+        **payload.model_dump()
+    )
+    try:
+        with db.begin_nested():
+            db.add(review)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="You have already reviewed this product")
+    apply_rating_change(db, product_id, None, review.rating)
+    db.commit()
+    db.refresh(review)
+    return review
+
+@router.put("/{review_id}", response_model=ReviewResponse)
+def update(product_id: int, review_id: int, payload: ReviewUpdate, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    review = _get_review(db, product_id, review_id)
+    if review.user_id != user.id:
+        raise HTTPException(status_code=403, detail="You can only edit your own review")
+
+    old_rating = review.rating
+    for key, value in payload.model_dump(exclude_unset=True).items():
+        if key == "rating" and value is None:
+            continue
+        setattr(review, key, value)
+    apply_rating_change(db, product_id, old_rating, review.rating)
+    db.commit()
+    db.refresh(review)
+    return review
+
+@router.delete("/{review_id}", status_code=204)
+def delete(product_id: int, review_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    review = _get_review(db, product_id, review_id)
+    # Authors remove their own reviews; admins moderate
+    if review.user_id != user.id and user.role != "admin":
+        raise HTTPException(status_code=403, detail="You can only delete your own review")
+
+    db.delete(review)
+    apply_rating_change(db, product_id, review.rating, None)
+    db.commit()
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+from core.config.settings import settings
+from core.schemas.schemas import QuotePin, ShippingQuote
+
+from core.services.shipping import quote
+
+router = APIRouter(tags=["Shipping"], prefix="/shipping")
+
+
+# Courier options for one or more PINs, e.g. the delivery estimate on a product page
+@router.get("/quote", response_model=List[ShippingQuote])
+def get_quote(
+    zip_code: List[QuotePin] = Query(..., description="Repeat for several destinations"),
+    units: int = Query(1, ge=1, le=1000),
+):
+    if len(zip_code) > settings.shipping_quote_max_destinations:
+        raise HTTPException(status_code=400, detail=f"At most {settings.shipping_quote_max_destinations} destinations per quote")
+    return quote(zip_code, units)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from core.models.models import User
+from core.services.auth import get_current_admin
+from core.services.profiling import profile_store, profiling_state
+from core.utils.resilience import dependencies
+
+router = APIRouter(tags=["System"], prefix="/system")
+
+
+# Admin-only route: latency, failure and circuit state per external dependency
+@router.get("/dependencies")
+def get_dependencies(_: User = Depends(get_current_admin)):
+    return {name: dependency.snapshot() for name, dependency in dependencies.items()}
+
+
+# Admin-only route: stored request profiles, newest first
+@router.get("/profiles")
+def list_profiles(_: User = Depends(get_current_admin)):
+    return {"sample_rate": profiling_state.sample_rate, "profiles": profile_store.list()}
+
+
+# Admin-only route: change this process's sampled profiling rate at runtime
+@router.put("/profiles/sampling")
+def set_profile_sampling(
+    rate: float = Query(..., ge=0, le=1),
+    _: User = Depends(get_current_admin)
+):
+    profiling_state.sample_rate = rate
+    return {"sample_rate": rate}
+
+
+# Admin-only route: collapsed stacks, ready for flamegraph.pl, speedscope or inferno
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, _: User = Depends(get_current_admin)):
+    path = profile_store.folded_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -1,8 +1,8 @@
 import datetime
 from decimal import Decimal
-from pydantic import BaseModel, EmailStr, Field
-from typing import List
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, computed_field
+from typing import Annotated, List
+from typing import Optional, Union
 
 
 # ------ User shcemas ------
@@ -15,6 +15,8 @@ class UserCreate(BaseModel):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+    # Guest cart to merge into the user's cart
+    session_id: Optional[str] = None
 
 class UserOut(BaseModel):
     id: int
@@ -23,8 +25,11 @@ class UserOut(BaseModel):
     phone: Optional[str] = None
     role: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class UserPage(BaseModel):
+    items: List[UserOut]
+    next_cursor: Optional[int]  # pass as ``after`` for the next page; None on the last page
 
 class Token(BaseModel):
     access_token: str
@@ -41,8 +46,7 @@ class CategoryResponse(BaseModel):
     id: int
     name: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # ----- Product Schemas --------
 class ProductCreate(BaseModel):
@@ -56,6 +60,18 @@ class ProductCreate(BaseModel):
 class ProductBulkRequest(BaseModel):
     products: List[ProductCreate]
 
+class RatingSummaryResponse(BaseModel):
+    count: int
+    sum: int
+    histogram: List[int]  # number of 1..5 star reviews
+
+    @computed_field
+    @property
+    def average(self) -> Optional[float]:
+        return round(self.sum / self.count, 2) if self.count else None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class ProductResponse(BaseModel):
     id: int
     name: str
@@ -64,9 +80,12 @@ class ProductResponse(BaseModel):
     price: float
     category_id: int
     image_url: Optional[str]
+    rating_summary: Optional[RatingSummaryResponse] = None  # None until the first review
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TrendingProductResponse(ProductResponse):
+    views: int  # in the trending window
 
 
 # ------- Product Varianst Schema ----- 
@@ -89,9 +108,9 @@ class ProductByIdResponse(ProductResponse):
     variants: List[
         ProductVariantCreate
     ]
+    frequently_bought_together: List[ProductResponse] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ------ User Address Schemas ------
@@ -105,8 +124,7 @@ class UserAddressBase(BaseModel):
 class UserAddressResponse(UserAddressBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserAddressUpdate(UserAddressBase):
     pass
@@ -114,6 +132,33 @@ class UserAddressUpdate(UserAddressBase):
 class UserAddressCreate(UserAddressBase):
     pass
 
+class PincodeResponse(BaseModel):
+    pincode: str
+    city: str
+    district: str
+    state: str
+
+# Six digits at most: larger values would overflow the quoting arrays, negative ones are never a PIN
+QuotePin = Annotated[int, Field(ge=0, le=999999)]
+
+class CourierQuote(BaseModel):
+    courier: str
+    cost: Decimal
+    transit_days: int
+    delivery_estimate: datetime.date
+
+class ShippingQuote(BaseModel):
+    zip_code: int
+    address_id: Optional[int] = None
+    zone: Optional[str] = None
+    serviceable: bool
+    recommended: Optional[CourierQuote] = None
+    options: List[CourierQuote]
+
+class CartShippingQuote(BaseModel):
+    item_count: int
+    quotes: List[ShippingQuote]
+
 
 # ----- Payment Schemas -----
 class CreatePaymentOrderRequest(BaseModel):
@@ -149,8 +194,7 @@ class OrderResponse(BaseModel):
     payment_status: str
     created_at: datetime.datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class OrderWithTotalResponse(BaseModel):
     total: int
@@ -158,5 +202,134 @@ class OrderWithTotalResponse(BaseModel):
         OrderResponse
     ]
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderItemProduct(BaseModel):
+    id: int
+    name: str
+    brand: Optional[str] = None
+    image_url: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderItemVariant(BaseModel):
+    id: int
+    sku: Optional[str] = None
+    size: Optional[str] = None
+    color: Optional[str] = None
+    product: OrderItemProduct
+
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderItemDetail(BaseModel):
+    id: int
+    quantity: int
+    unit_price: Decimal
+    variant: OrderItemVariant
+
+    model_config = ConfigDict(from_attributes=True)
+
+class PaymentDetail(BaseModel):
+    payment_method: Optional[str] = None
+    status: Optional[str] = None
+    amount: Optional[Decimal] = None
+    currency: Optional[str] = None
+    transaction_id: Optional[Union[int, str]] = None
+    paid_at: Optional[datetime.datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ShipmentDetail(BaseModel):
+    courier_name: Optional[str] = None
+    tracking_number: Optional[str] = None
+    shipped_at: Optional[datetime.datetime] = None
+    delivery_estimate: Optional[datetime.datetime] = None
+    status: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderDetailResponse(OrderResponse):
+    items: List[OrderItemDetail]
+    shipping_address: Optional[UserAddressResponse] = None
+    payment: Optional[PaymentDetail] = None
+    shipment: Optional[ShipmentDetail] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StreamTokenResponse(BaseModel):
+    access_token: str  # pass as ?access_token= to GET /api/orders/events
+    expires_in: int  # seconds; fetch a new one to reconnect after this
+
+
+# ----- Cart Schemas -----
+class CartItemAdd(BaseModel):
+    variant_id: int
+    quantity: int = Field(default=1, ge=1)
+
+class CartItemUpdate(BaseModel):
+    quantity: int = Field(..., ge=0)
+
+class CartLine(BaseModel):
+    variant_id: int
+    product_id: int
+    name: str
+    brand: Optional[str] = None
+    image_url: Optional[str] = None
+    sku: str
+    size: Optional[str] = None
+    color: Optional[str] = None
+    unit_price: Decimal
+    quantity: int
+    stock: int
+    in_stock: bool
+    line_total: Decimal
+
+class CartResponse(BaseModel):
+    lines: List[CartLine]
+    item_count: int
+    subtotal: Decimal
+
+
+# ----- Review Schemas -----
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    title: Optional[str] = Field(default=None, max_length=200)
+    comment: Optional[str] = Field(default=None, max_length=5000)
+
+class ReviewUpdate(BaseModel):
+    rating: Optional[int] = Field(default=None, ge=1, le=5)
+    title: Optional[str] = Field(default=None, max_length=200)
+    comment: Optional[str] = Field(default=None, max_length=5000)
+
+class ReviewResponse(BaseModel):
+    id: int
+    product_id: int
+    user_id: int
+    rating: int
+    title: Optional[str]
+    comment: Optional[str]
+    is_verified: Optional[bool]
+    created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ReviewPage(BaseModel):
+    items: List[ReviewResponse]
+    next_cursor: Optional[int]  # pass as ``before`` for the next page; None on the last page
+
+
+# ----- Analytics Schemas -----
+class SalesRow(BaseModel):
+    key: str  # ISO day, category id, brand or payment status, depending on the dimension
+    label: Optional[str] = None  # category name for the category dimension
+    revenue: Decimal
+    units: int
+    orders: int
+
+class SalesReport(BaseModel):
+    dimension: str
+    start_date: datetime.date
+    end_date: datetime.date
+    rows: List[SalesRow]
+    last_order_id: int  # orders up to this id are included
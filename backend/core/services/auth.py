@@ -13,6 +13,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
+# Same scheme for routes that also serve anonymous callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login", auto_error=False)
 
 # Generate JWT token
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -21,6 +23,20 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Short-lived token good for one purpose only, for clients that have to put it in a URL
+def create_scoped_token(user: User, scope: str, expires_delta: timedelta) -> str:
+    return create_access_token(data={"sub": user.email, "id": user.id, "scope": scope}, expires_delta=expires_delta)
+
+# User id from a scoped token; login tokens and other scopes are refused
+def verify_scoped_token(token: str, scope: str) -> int:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        payload = {}
+    if payload.get("scope") != scope or payload.get("id") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token or credentials")
+    return payload["id"]
+
 # Dependency: get current user
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
@@ -31,7 +47,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        # Scoped tokens only work where their scope is checked
+        if email is None or payload.get("scope") is not None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
@@ -41,6 +58,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
     return user
 
+# Dependency: current user if a token was sent, None for anonymous callers
+def get_optional_user(token: str = Depends(optional_oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    if token is None:
+        return None
+    return get_current_user(token=token, db=db)
+
 # Dependency: check if current user is admin
 def get_current_admin(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
@@ -0,0 +1,374 @@
+import logging
+import threading
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.database.upsert import upsert_increment
+from core.models.models import Cart, CartItem, Product, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+# ("user", user_id) or ("session", session_id)
+CartKey = Tuple[str, object]
+LINE_KEYS = ("cart_id", "variant_id")
+
+
+class CartService:
+    """
+    Write-behind cart store.
+
+    An edit is kept in memory as a change to one line's quantity (+2, -1) and
+    the request returns without writing; a background thread folds every
+    buffered change into ``cart_items`` every ``cart_flush_interval`` (or
+    sooner once ``cart_flush_batch`` lines are waiting) with one upsert per
+    flush. Changes are relative, so flushes from several workers add up
+    instead of overwriting each other and no sticky routing is needed.
+
+    Reads return the stored lines plus this process's changes not yet written,
+    so a client sees its own edit in the response; edits made through another
+    worker show up once that worker flushes. A crash loses at most one flush
+    interval. Limits are checked when the edit is made and enforced again by
+    the flush, which trims lines that edits from several workers together
+    pushed past ``cart_max_quantity`` or the stock.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, flush_batch: int = 500):
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        # cart key -> variant_id -> quantity change not yet written
+        self._pending: Dict[CartKey, Dict[int, int]] = {}
+        # Taken by the flush running now; still counted by reads until it commits
+        self._in_flight: Dict[CartKey, Dict[int, int]] = {}
+        # Guest carts merged into a user's cart, deleted on the next flush
+        self._discarded: Set[str] = set()
+        self._discarding: Set[str] = set()
+        self._waiting = 0
+        # Bumped when a flush commits: a read that straddles it is retried
+        self._version = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _owner(key: CartKey):
+        kind, owner = key
+        return Cart.user_id == owner if kind == "user" else Cart.session_id == owner
+
+    # ----- in-memory changes (called with self._lock held) -----
+
+    def _changes(self, key: CartKey) -> Dict[int, int]:
+        # In-flight changes of a guest cart merged since were moved with it
+        changes = {} if key[0] == "session" and key[1] in self._discarded else dict(self._in_flight.get(key, {}))
+        for variant_id, delta in self._pending.get(key, {}).items():
+            changes[variant_id] = changes.get(variant_id, 0) + delta
+        return changes
+
+    def _merged_away(self, key: CartKey) -> bool:
+        # The stored lines of a guest cart merged at login no longer count
+        kind, owner = key
+        return kind == "session" and (owner in self._discarded or owner in self._discarding)
+
+    def _change(self, key: CartKey, variant_id: int, delta: int):
+        lines = self._pending.setdefault(key, {})
+        if variant_id not in lines:
+            self._waiting += 1
+            if self._waiting >= self.flush_batch:
+                self._wakeup.set()
+        lines[variant_id] = lines.get(variant_id, 0) + delta
+
+    @staticmethod
+    def _apply(stored: Dict[int, int], changes: Dict[int, int]) -> Dict[int, int]:
+        lines = dict(stored)
+        for variant_id, delta in changes.items():
+            quantity = lines.get(variant_id, 0) + delta
+            if quantity > 0:
+                lines[variant_id] = quantity
+            else:
+                lines.pop(variant_id, None)
+        return lines
+
+    def _read(self, key: CartKey, query: Callable[[Set[int]], list], then: Callable,
+              unstored: Callable[[list], list] = lambda rows: []):
+        """
+        Run ``query`` (given the variants this process has changes for) and
+        hand its rows to ``then`` together with those changes, under the lock.
+        Retried if a flush committed meanwhile, since the rows may or may not
+        already include the changes it wrote. ``unstored`` strips the stored
+        quantities from the rows of a merged guest cart.
+        """
+        while True:
+            with self._lock:
+                version = self._version
+                changed = set(self._changes(key))
+            rows = query(changed)
+            with self._lock:
+                if self._version == version:
+                    return then(unstored(rows) if self._merged_away(key) else rows, self._changes(key))
+
+    # ----- reads -----
+
+    def lines(self, db: Session, key: CartKey) -> Dict[int, int]:
+        query = lambda _: db.query(CartItem.variant_id, CartItem.quantity)\
+            .join(Cart, Cart.id == CartItem.cart_id)\
+            .filter(self._owner(key))\
+            .all()
+        return self._read(key, query, lambda rows, changes: self._apply(dict(rows), changes))
+
+    def _line(self, db: Session, key: CartKey, variant_id: int, then: Callable):
+        query = lambda _: db.query(CartItem.variant_id, CartItem.quantity)\
+            .join(Cart, Cart.id == CartItem.cart_id)\
+            .filter(self._owner(key), CartItem.variant_id == variant_id)\
+            .all()
+        return self._read(key, query, lambda rows, changes: then(
+            self._apply(dict(rows), {variant_id: changes.get(variant_id, 0)}).get(variant_id)))
+
+    def hydrate(self, db: Session, key: CartKey) -> dict:
+        """The cart with current price, stock and product details, in one statement"""
+        stored = select(CartItem.variant_id, CartItem.quantity)\
+            .join(Cart, Cart.id == CartItem.cart_id)\
+            .where(self._owner(key))\
+            .subquery()
+
+        def query(changed: Set[int]):
+            rows = db.query(ProductVariant, Product, stored.c.quantity)\
+                .join(Product, ProductVariant.product_id == Product.id)
+            if not changed:
+                return rows.join(stored, stored.c.variant_id == ProductVariant.id).all()
+            # Lines added here but not flushed yet have no cart_items row to join from
+            owned = select(CartItem.variant_id).join(Cart, Cart.id == CartItem.cart_id).where(self._owner(key))
+            wanted = owned.union(select(ProductVariant.id).where(ProductVariant.id.in_(changed)))
+            return rows.outerjoin(stored, stored.c.variant_id == ProductVariant.id)\
+                .filter(ProductVariant.id.in_(wanted))\
+                .all()
+
+        def build(rows, changes):
+            result, subtotal = [], Decimal("0")
+            for variant, product, quantity in sorted(rows, key=lambda r: r[0].id):
+                quantity = (quantity or 0) + changes.get(variant.id, 0)
+                if quantity <= 0:
+                    continue
+                unit_price = Decimal(str(variant.price)).quantize(Decimal("0.01"))
+                line_total = unit_price * quantity
+                subtotal += line_total
+                result.append({
+                    "variant_id": variant.id,
+                    "product_id": product.id,
+                    "name": product.name,
+                    "brand": product.brand,
+                    "image_url": product.image_url,
+                    "sku": variant.sku,
+                    "size": variant.size,
+                    "color": variant.color,
+                    "unit_price": unit_price,
+                    "quantity": quantity,
+                    "stock": variant.stock or 0,
+                    "in_stock": (variant.stock or 0) >= quantity,
+                    "line_total": line_total,
+                })
+            return {"lines": result, "item_count": sum(line["quantity"] for line in result), "subtotal": subtotal}
+
+        # A merged guest cart keeps the variant details its new changes need
+        return self._read(key, query, build, unstored=lambda rows: [(v, p, None) for v, p, _ in rows])
+
+    # ----- writes -----
+
+    @staticmethod
+    def _variant(db: Session, variant_id: int) -> Optional[ProductVariant]:
+        return db.get(ProductVariant, variant_id)
+
+    @staticmethod
+    def _check_quantity(variant: Optional[ProductVariant], variant_id: int, quantity: int):
+        if variant is None:
+            raise HTTPException(status_code=404, detail=f"Variant {variant_id} not found")
+        if quantity > settings.cart_max_quantity:
+            raise HTTPException(status_code=400, detail=f"At most {settings.cart_max_quantity} per item")
+        if quantity > (variant.stock or 0):
+            raise HTTPException(status_code=409, detail=f"Only {variant.stock or 0} left in stock")
+
+    def add(self, db: Session, key: CartKey, variant_id: int, quantity: int):
+        variant = self._variant(db, variant_id)
+
+        # Checked and recorded under one lock, so two adds here can't both pass the limit
+        def record(current):
+            self._check_quantity(variant, variant_id, (current or 0) + quantity)
+            self._change(key, variant_id, quantity)
+
+        self._line(db, key, variant_id, record)
+
+    def update(self, db: Session, key: CartKey, variant_id: int, quantity: int):
+        if quantity == 0:
+            self.remove(db, key, variant_id)
+            return
+        variant = self._variant(db, variant_id)
+
+        def record(current):
+            if current is None:
+                raise HTTPException(status_code=404, detail=f"Variant {variant_id} is not in the cart")
+            self._check_quantity(variant, variant_id, quantity)
+            self._change(key, variant_id, quantity - current)
+
+        self._line(db, key, variant_id, record)
+
+    def remove(self, db: Session, key: CartKey, variant_id: int):
+        def record(current):
+            if current is None:
+                raise HTTPException(status_code=404, detail=f"Variant {variant_id} is not in the cart")
+            self._change(key, variant_id, -current)
+
+        self._line(db, key, variant_id, record)
+
+    def merge_guest(self, db: Session, session_id: str, user_id: int):
+        """Move a guest cart's lines into the user's cart (quantities add up, capped by the flush)"""
+        guest_key, user_key = ("session", session_id), ("user", user_id)
+
+        def move(guest_lines):
+            for variant_id, quantity in guest_lines.items():
+                self._change(user_key, variant_id, quantity)
+            self._waiting -= len(self._pending.pop(guest_key, {}))
+            self._discarded.add(session_id)
+
+        query = lambda _: db.query(CartItem.variant_id, CartItem.quantity)\
+            .join(Cart, Cart.id == CartItem.cart_id)\
+            .filter(self._owner(guest_key))\
+            .all()
+        self._read(guest_key, query, lambda rows, changes: move(self._apply(dict(rows), changes)))
+
+    # ----- persistence -----
+
+    def _cart_ids(self, db: Session, keys: List[CartKey]) -> Dict[CartKey, int]:
+        found = {}
+        for kind, column in (("user", Cart.user_id), ("session", Cart.session_id)):
+            owners = [owner for k, owner in keys if k == kind]
+            if owners:
+                found.update({(kind, owner): cart_id
+                              for cart_id, owner in db.query(Cart.id, column).filter(column.in_(owners))})
+        for key in keys:
+            if key not in found:
+                found[key] = self._create_cart(db, key)
+        return found
+
+    def _create_cart(self, db: Session, key: CartKey) -> int:
+        kind, owner = key
+        try:
+            with db.begin_nested():
+                cart = Cart(user_id=owner if kind == "user" else None, session_id=owner if kind == "session" else None)
+                db.add(cart)
+            return cart.id
+        except IntegrityError:
+            # Another worker's flush created it
+            return db.query(Cart.id).filter(self._owner(key)).scalar()
+
+    @staticmethod
+    def _settle(db: Session, rows: List[dict]):
+        """Delete lines that reached zero and trim raised ones that edits from several workers pushed past the limits"""
+        raised = {(row["cart_id"], row["variant_id"]): row["quantity"] > 0 for row in rows}
+        stored = db.query(CartItem.id, CartItem.cart_id, CartItem.variant_id, CartItem.quantity, ProductVariant.stock)\
+            .outerjoin(ProductVariant, ProductVariant.id == CartItem.variant_id)\
+            .filter(CartItem.cart_id.in_({cart_id for cart_id, _ in raised}))\
+            .all()
+        emptied, trimmed = [], []
+        for row in stored:
+            touched = raised.get((row.cart_id, row.variant_id))
+            if touched is None:
+                continue
+            if row.quantity <= 0:
+                emptied.append(row.id)
+                continue
+            # A variant that sold out since keeps its line; the cart shows it as out of stock
+            limit = min(settings.cart_max_quantity, row.stock) if row.stock else settings.cart_max_quantity
+            if touched and row.quantity > limit:
+                trimmed.append({"id": row.id, "quantity": limit})
+        if emptied:
+            db.execute(delete(CartItem).where(CartItem.id.in_(emptied)))
+        if trimmed:
+            db.execute(update(CartItem), trimmed)
+
+    def flush(self) -> int:
+        """Write every buffered change in one transaction; returns how many lines were touched"""
+        with self._flush_lock:
+            with self._lock:
+                changes, self._pending = self._pending, {}
+                discarded, self._discarded = self._discarded, set()
+                self._waiting = 0
+                self._in_flight, self._discarding = changes, discarded
+            if not changes and not discarded:
+                return 0
+
+            db = SessionLocal()
+            try:
+                if discarded:
+                    guest_carts = select(Cart.id).where(Cart.session_id.in_(discarded))
+                    db.execute(delete(CartItem).where(CartItem.cart_id.in_(guest_carts)))
+                    db.execute(delete(Cart).where(Cart.session_id.in_(discarded)))
+                keys = [key for key, lines in changes.items() if any(lines.values())]
+                cart_ids = self._cart_ids(db, keys)
+                rows = [
+                    {"cart_id": cart_ids[key], "variant_id": variant_id, "quantity": delta}
+                    for key in keys
+                    for variant_id, delta in changes[key].items()
+                    if delta
+                ]
+                if rows:
+                    upsert_increment(db, CartItem, LINE_KEYS, ("quantity",), rows)
+                    self._settle(db, rows)
+                # Committed under the lock so no read sees these changes both stored and in flight
+                with self._lock:
+                    db.commit()
+                    self._in_flight, self._discarding = {}, set()
+                    self._version += 1
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    for key, lines in changes.items():
+                        for variant_id, delta in lines.items():
+                            self._change(key, variant_id, delta)
+                    self._discarded |= discarded
+                    self._in_flight, self._discarding = {}, set()
+                raise
+            finally:
+                db.close()
+            return len(rows)
+
+    def run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Cart flush failed; will retry")
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="cart-write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Whatever is still in memory goes out before the process exits
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final cart flush failed; unsaved cart edits are lost")
+
+
+cart_service = CartService(settings.cart_flush_interval, settings.cart_flush_batch)
+
+
+def hydrate_cart(db: Session, key: CartKey) -> dict:
+    """Current price, stock and product details for every line of the cart"""
+    return cart_service.hydrate(db, key)
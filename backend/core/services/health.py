@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from core.config.settings import settings
+from core.database.database import engine
+from core.services.metrics import Gauge, registry
+
+
+def pool_status() -> dict:
+    """Connection pool counters; reading them takes no connection and runs no SQL"""
+    pool = engine.pool
+    status = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            status[name] = fn()
+    return status
+
+
+class DatabaseHealth:
+    """
+    Cheap database health check for container probes.
+
+    Every probe reports pool counters. A real round trip (``SELECT 1``) runs at
+    most once per ``probe_interval`` seconds and its result is reused in between,
+    so frequent health checks do not add DB load.
+    """
+
+    def __init__(self, probe_interval: float):
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._last_probe = 0.0
+        self._last_ok = True
+        self._last_error = None
+
+    def _probe(self):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self._last_ok, self._last_error = True, None
+        except Exception as e:
+            self._last_ok, self._last_error = False, str(e)
+
+    def check(self) -> dict:
+        now = time.monotonic()
+        # Only one caller probes; concurrent probes reuse the previous result
+        if now - self._last_probe >= self.probe_interval and self._lock.acquire(blocking=False):
+            try:
+                self._probe()
+                self._last_probe = time.monotonic()
+            finally:
+                self._lock.release()
+        return {
+            "ok": self._last_ok,
+            "error": self._last_error,
+            "checked_seconds_ago": round(time.monotonic() - self._last_probe, 1),
+            "pool": pool_status(),
+        }
+
+
+database_health = DatabaseHealth(settings.health_probe_interval)
+
+
+@registry.collector
+def _pool_metrics() -> List[str]:
+    gauge = Gauge("shopkart_db_pool_connections", "Database pool connections by state", ("state",))
+    for state, value in pool_status().items():
+        gauge.set(state, value=value)
+    return gauge.render()
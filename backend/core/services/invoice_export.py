@@ -0,0 +1,118 @@
+import logging
+import zipfile
+from collections import deque
+from typing import Iterator
+
+from core.database.database import SessionLocal
+from core.models.models import Order
+from core.services.invoice_renderer import invoice_renderer, snapshot_invoice
+from core.services.invoice_store import invoice_fingerprint, invoice_store
+from core.services.order_loader import order_aggregate_options
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipSink:
+    """Write-only, unseekable file object; zipfile falls back to data descriptors and we drain it per entry"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _filename(order_id: int) -> str:
+    return f"invoice-{order_id:06d}.pdf"
+
+
+def stream_invoice_zip(filters: list, window: int = 8) -> Iterator[bytes]:
+    """
+    Yield a ZIP of invoices for every order matching ``filters`` as it is built.
+
+    Orders are walked by keyset on ``Order.id`` in batches, stored invoices are
+    copied from disk in chunks, and misses are rendered through the invoice
+    renderer with at most ``window`` renders outstanding. Memory therefore stays
+    bounded by the batch and window size, not by the number of invoices.
+    """
+    db = SessionLocal()
+    sink = _ZipSink()
+    skipped = []
+    try:
+        # PDF page streams are already compressed, so store rather than deflate
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+            pending = deque()
+
+            def write_entry(order_id, source, fingerprint):
+                if isinstance(source, str):
+                    with open(source, "rb") as f, zf.open(_filename(order_id), "w") as out:
+                        while chunk := f.read(FILE_CHUNK_SIZE):
+                            out.write(chunk)
+                            yield sink.drain()
+                    return
+                try:
+                    pdf_bytes = source.result()
+                except Exception:
+                    logger.exception("Failed to render invoice for order %s", order_id)
+                    skipped.append(f"{order_id}: render failed")
+                    return
+                invoice_store.put(order_id, fingerprint, pdf_bytes)
+                zf.writestr(_filename(order_id), pdf_bytes)
+                yield sink.drain()
+
+            last_id = 0
+            while True:
+                order_ids = [
+                    order_id for (order_id,) in db.query(Order.id)
+                    .filter(*filters, Order.id > last_id)
+                    .order_by(Order.id)
+                    .limit(BATCH_SIZE)
+                ]
+                if not order_ids:
+                    break
+                last_id = order_ids[-1]
+
+                orders = db.query(Order)\
+                    .options(*order_aggregate_options())\
+                    .filter(Order.id.in_(order_ids))\
+                    .order_by(Order.id)\
+                    .all()
+                for order in orders:
+                    if not (order.items and order.user and order.shipping_address and order.payment):
+                        skipped.append(f"{order.id}: incomplete order data")
+                        continue
+                    fingerprint = invoice_fingerprint(order, order.payment)
+                    cached = invoice_store.get(order.id, fingerprint)
+                    if cached:
+                        source = cached[0]
+                    else:
+                        source = invoice_renderer.submit(snapshot_invoice(
+                            order, order.items, order.user, order.shipping_address, order.payment
+                        ))
+                    pending.append((order.id, source, fingerprint))
+                    while len(pending) > window:
+                        yield from write_entry(*pending.popleft())
+
+                # Drop the batch's ORM instances before loading the next one
+                db.expunge_all()
+
+            while pending:
+                yield from write_entry(*pending.popleft())
+
+            if skipped:
+                zf.writestr("SKIPPED.txt", "\n".join(skipped) + "\n")
+        yield sink.drain()
+    finally:
+        db.close()
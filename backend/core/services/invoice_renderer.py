@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+from core.config.settings import settings
+from core.services.pdf_service import get_invoice_styles, render_invoice_bytes
+
+
+def snapshot_invoice(order, order_items, user, shipping_address, payment) -> dict:
+    """
+    Copy the fields the invoice template reads into plain objects.
+
+    ORM instances are bound to a session and lazy-load relationships, so they
+    cannot be shipped to a pool worker; the snapshot pickles cheaply.
+    """
+    items = []
+    for item in order_items:
+        variant = item.variant
+        items.append(SimpleNamespace(
+            id=item.id,
+            quantity=item.quantity,
+            unit_price=item.unit_price,
+            variant=SimpleNamespace(
+                size=variant.size,
+                color=variant.color,
+                product=SimpleNamespace(name=variant.product.name),
+            ),
+        ))
+
+    return {
+        "order": SimpleNamespace(
+            id=order.id,
+            created_at=order.created_at,
+            order_status=order.order_status,
+        ),
+        "order_items": items,
+        "user": SimpleNamespace(name=user.name, email=user.email, phone=user.phone),
+        "shipping_address": SimpleNamespace(
+            alias=shipping_address.alias,
+            address_line1=shipping_address.address_line1,
+            city=shipping_address.city,
+            state=shipping_address.state,
+            zip_code=shipping_address.zip_code,
+        ),
+        "payment": SimpleNamespace(
+            payment_method=payment.payment_method,
+            transaction_id=payment.transaction_id,
+            status=payment.status,
+            paid_at=payment.paid_at,
+            amount=payment.amount,
+            currency=payment.currency,
+        ),
+    }
+
+
+class InvoiceRenderer:
+    """
+    Runs invoice renders either inline or on a process pool.
+
+    Reportlab is pure Python and holds the GIL, so the process backend is what
+    lets renders use more than one core. ``max_in_flight`` caps queued plus
+    running renders; callers block in ``submit`` once the cap is reached.
+    """
+
+    def __init__(self, backend: str = "inline", workers: int = 0, max_in_flight: int = 16):
+        if backend not in ("inline", "process"):
+            raise ValueError(f"Unknown invoice render backend: {backend}")
+        self.backend = backend
+        self.explicit_workers = bool(workers)
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def size_for_server(self, server_workers: int, cores: int):
+        """
+        Called by the production server before it forks its web workers.
+
+        Each web worker would otherwise start a pool as large as the machine,
+        so ``server_workers`` processes each spawning ``cores`` renderers. An
+        unset ``invoice_render_workers`` gets the cores left per web worker;
+        with the default of one web worker per core that is none, and renders
+        run inline, in parallel across the web worker processes.
+        """
+        if self.backend != "process" or self.explicit_workers:
+            return
+        per_worker = cores // max(1, server_workers)
+        if per_worker <= 1:
+            self.backend = "inline"
+        else:
+            self.workers = per_worker
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app never forks
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn, not fork: the web process has threads and open DB connections
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=get_invoice_styles,
+                )
+            return self._pool
+
+    def submit(self, invoice_data: dict) -> Future:
+        """Start rendering a snapshot from ``snapshot_invoice``; the future resolves to PDF bytes"""
+        self._slots.acquire()
+        try:
+            if self.backend == "process":
+                try:
+                    future = self._get_pool().submit(render_invoice_bytes, invoice_data)
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); start a fresh pool rather than failing forever
+                    self._discard_pool()
+                    future = self._get_pool().submit(render_invoice_bytes, invoice_data)
+            else:
+                future = Future()
+                try:
+                    future.set_result(render_invoice_bytes(invoice_data))
+                except Exception as e:
+                    future.set_exception(e)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(self, invoice_data: dict) -> bytes:
+        return self.submit(invoice_data).result()
+
+    def _discard_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+invoice_renderer = InvoiceRenderer(
+    backend=settings.invoice_render_backend,
+    workers=settings.invoice_render_workers,
+    max_in_flight=settings.invoice_render_max_in_flight,
+)
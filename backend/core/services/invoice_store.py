@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+from core.config.settings import settings
+from core.models.models import Order, Payment
+from core.services.invoice_renderer import invoice_renderer, snapshot_invoice
+
+logger = logging.getLogger(__name__)
+
+# Bump when the invoice layout changes so previously stored PDFs are re-rendered
+RENDER_VERSION = "1"
+
+
+class InvoiceStore:
+    """
+    Content-addressed on-disk store for rendered invoice PDFs.
+
+    PDFs are written once to ``objects/<aa>/<sha256>.pdf``. ``refs/<order_id>``
+    points an order at the blob rendered for its current fingerprint, so a
+    status or payment change renders a fresh invoice instead of serving a stale one.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.refs_dir = os.path.join(root, "refs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.pdf")
+
+    def get(self, order_id: int, fingerprint: str) -> Optional[Tuple[str, str]]:
+        """Return (path, digest) of the stored invoice, or None on a miss"""
+        try:
+            with open(os.path.join(self.refs_dir, str(order_id))) as f:
+                stored_fingerprint, digest = f.read().split()
+        except (FileNotFoundError, ValueError):
+            return None
+
+        path = self.blob_path(digest)
+        if stored_fingerprint != fingerprint or not os.path.exists(path):
+            return None
+        return path, digest
+
+    def put(self, order_id: int, fingerprint: str, pdf_bytes: bytes) -> Tuple[str, str]:
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._atomic_write(path, pdf_bytes)
+        self._atomic_write(os.path.join(self.refs_dir, str(order_id)), f"{fingerprint} {digest}".encode())
+        return path, digest
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        # Write to a temp file in the same directory and rename, so concurrent
+        # readers never see a half-written PDF or ref
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+invoice_store = InvoiceStore(settings.invoice_dir)
+
+
+def invoice_fingerprint(order: Order, payment: Payment) -> str:
+    """
+    Hash of every field the invoice prints that can change after creation:
+    statuses and payment, but also the customer, the shipping address (both
+    editable from the account pages) and product names on the line items.
+
+    ``order`` must have its user, address and items loaded (``load_order_aggregate``).
+    """
+    user, address = order.user, order.shipping_address
+    parts = [
+        RENDER_VERSION,
+        order.id,
+        order.order_status.value if order.order_status else None,
+        order.payment_status.value if order.payment_status else None,
+        payment.status,
+        payment.paid_at,
+        payment.amount,
+        payment.payment_method,
+        payment.transaction_id,
+        payment.currency,
+        user.name if user else None,
+        user.email if user else None,
+        user.phone if user else None,
+    ]
+    if address:
+        parts += [address.alias, address.address_line1, address.city, address.state, address.zip_code]
+    for item in order.items:
+        variant = item.variant
+        parts += [item.id, item.quantity, item.unit_price]
+        if variant:
+            parts += [variant.size, variant.color, variant.product.name if variant.product else None]
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def get_or_render_invoice(order: Order) -> Tuple[str, str]:
+    """
+    Return (path, digest) of the invoice PDF for an order, rendering and storing it on a miss.
+
+    ``order`` must come from ``load_order_aggregate`` so no lazy loads happen here.
+    """
+    payment = order.payment
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment information not found")
+
+    fingerprint = invoice_fingerprint(order, payment)
+    cached = invoice_store.get(order.id, fingerprint)
+    if cached:
+        return cached
+
+    if not order.items:
+        raise HTTPException(status_code=404, detail="No items found for this order")
+
+    if not order.shipping_address:
+        raise HTTPException(status_code=404, detail="Shipping address not found")
+
+    pdf_bytes = invoice_renderer.render(snapshot_invoice(
+        order=order,
+        order_items=order.items,
+        user=order.user,
+        shipping_address=order.shipping_address,
+        payment=payment
+    ))
+    return invoice_store.put(order.id, fingerprint, pdf_bytes)
+
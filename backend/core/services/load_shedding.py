@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from core.config.settings import settings
+
+
+class DecayingAverage:
+    """
+    Exponentially weighted average whose weight also fades with time, so a
+    signal that stops being observed (an idle pool) drifts back towards zero
+    instead of freezing at its last value.
+    """
+
+    def __init__(self, half_life: float = 2.0):
+        self.half_life = half_life
+        self._value = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def observe(self, value: float):
+        with self._lock:
+            now = time.monotonic()
+            self._value = 0.8 * self._decayed(now) + 0.2 * value
+            self._updated = now
+
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+
+class LoadMonitor:
+    """
+    Tracks the two signals that show the process is saturated: time spent waiting
+    for a pooled DB connection (fed by ``track_checkout_wait``) and event loop
+    lag (measured by ``probe_loop_lag``, started from the app lifespan).
+    """
+
+    def __init__(self):
+        self.pool_wait = DecayingAverage()
+        self.loop_lag = DecayingAverage()
+
+    def pressure(self) -> float:
+        """Worst signal as a multiple of its threshold; 1.0 or more means overloaded"""
+        return max(
+            self.pool_wait.value() * 1000 / settings.shed_pool_wait_ms,
+            self.loop_lag.value() * 1000 / settings.shed_loop_lag_ms,
+        )
+
+    def should_shed(self, critical: bool) -> bool:
+        if not settings.load_shedding_enabled:
+            return False
+        limit = settings.shed_critical_factor if critical else 1.0
+        return self.pressure() >= limit
+
+    async def probe_loop_lag(self, interval: float = 0.1):
+        # A sleep that overshoots means the loop was busy running something else
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(0.0, time.monotonic() - started - interval))
+
+
+load_monitor = LoadMonitor()
+
+
+def track_checkout_wait(engine, monitor: Optional[LoadMonitor] = None):
+    """
+    Time every connection checkout (queueing for a free connection, or opening one).
+    Wraps the engine rather than its pool, which ``engine.dispose()`` replaces.
+    """
+    monitor = monitor or load_monitor
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            monitor.pool_wait.observe(time.perf_counter() - started)
+
+    engine.raw_connection = timed_raw_connection
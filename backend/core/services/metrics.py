@@ -0,0 +1,172 @@
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, (*labels, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Minimal in-process metrics registry with Prometheus text exposition.
+
+    Values are per process: with several workers each one reports its own.
+    Collectors are callables returning exposition lines, for values that are
+    cheaper to read on scrape than to track (pool sizes, dependency stats).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], List[str]]):
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            lines.extend(fn())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "shopkart_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "shopkart_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "shopkart_http_requests_in_flight", "HTTP requests currently being served"
+))
+http_requests_rejected_total = registry.register(Counter(
+    "shopkart_http_requests_rejected_total", "Requests refused by rate limiting or load shedding",
+    ("reason", "route")
+))
+
+product_views_dropped_total = registry.register(Counter(
+    "shopkart_product_views_dropped_total", "Product views lost because the view buffer was full"
+))
+order_stream_connections = registry.register(Gauge(
+    "shopkart_order_stream_connections", "Open live order update streams in this process"
+))
+order_stream_dropped_total = registry.register(Counter(
+    "shopkart_order_stream_dropped_total", "Order update streams closed because the client fell behind"
+))
+
+
+@registry.collector
+def _dependency_metrics() -> List[str]:
+    from core.utils.resilience import LATENCY_BUCKETS, dependencies
+
+    calls = Counter("shopkart_dependency_calls_total", "External dependency calls by outcome", ("dependency", "outcome"))
+    latency = Histogram("shopkart_dependency_latency_seconds", "External dependency call latency", ("dependency",),
+                        buckets=LATENCY_BUCKETS)
+    circuit = Gauge("shopkart_dependency_circuit_open", "1 while the dependency's circuit breaker is not closed",
+                    ("dependency",))
+    for name, dependency in dependencies.items():
+        m = dependency.metrics
+        with m._lock:
+            for outcome in ("successes", "failures", "retries", "short_circuited", "rejected"):
+                calls.inc(name, outcome, amount=getattr(m, outcome))
+            latency._values[(name,)] = [list(m.latency_buckets), m.latency_sum]
+        circuit.set(name, value=0 if dependency.breaker.state == "closed" else 1)
+    return calls.render() + latency.render() + circuit.render()
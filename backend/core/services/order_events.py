@@ -0,0 +1,68 @@
+import datetime
+import logging
+import random
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.models.models import Order, OrderItem, Shipment, UserAddress
+from core.services.invoice_store import get_or_render_invoice
+from core.services.order_loader import load_order_aggregate
+from core.services.outbox import enqueue, handler
+from core.services.shipping import assign_courier
+
+logger = logging.getLogger(__name__)
+
+SHIPMENT_ASSIGN = "shipment.assign"
+INVOICE_RENDER = "invoice.render"
+ORDER_NOTIFY = "order.notify"
+
+
+def enqueue_order_created(db: Session, order: Order):
+    """Queue post-checkout side effects in the order's own transaction"""
+    for topic in (SHIPMENT_ASSIGN, INVOICE_RENDER, ORDER_NOTIFY):
+        enqueue(db, topic, {"order_id": order.id})
+
+
+@handler(SHIPMENT_ASSIGN)
+def assign_shipment(db: Session, payload: dict):
+    order_id = payload["order_id"]
+    if db.query(Shipment.id).filter(Shipment.order_id == order_id).first():
+        return  # already assigned by an earlier delivery of this event
+
+    zip_code, units = db.query(UserAddress.zip_code, func.coalesce(func.sum(OrderItem.quantity), 0))\
+        .select_from(Order)\
+        .outerjoin(UserAddress, UserAddress.id == Order.shipping_address_id)\
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)\
+        .filter(Order.id == order_id)\
+        .group_by(UserAddress.zip_code)\
+        .one()
+    courier_name, transit_days = assign_courier(zip_code, units)
+    try:
+        with db.begin_nested():
+            db.add(Shipment(
+                order_id=order_id,
+                courier_name=courier_name,
+                tracking_number=str(random.randint(1000000000, 9999999999)),
+                shipped_at=datetime.datetime.utcnow(),
+                delivery_estimate=datetime.datetime.utcnow() + datetime.timedelta(days=transit_days),
+                status="pending"
+            ))
+    except IntegrityError:
+        pass  # a concurrent delivery of this event got there first
+
+
+@handler(INVOICE_RENDER)
+def render_invoice(db: Session, payload: dict):
+    order = load_order_aggregate(db, payload["order_id"])
+    if order:
+        get_or_render_invoice(order)
+
+
+@handler(ORDER_NOTIFY)
+def notify_order_created(db: Session, payload: dict):
+    # No mail/SMS provider is wired up yet; this is the hook for one
+    order = db.query(Order).filter(Order.id == payload["order_id"]).first()
+    if order:
+        logger.info("Order %s placed by user %s (%s)", order.id, order.user_id, order.payment_status.value)
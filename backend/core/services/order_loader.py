@@ -0,0 +1,32 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from core.models.models import Order, OrderItem, ProductVariant
+
+
+def order_aggregate_options():
+    """
+    Loader options that fetch an order with everything hanging off it.
+
+    The to-one rows (user, address, payment, shipment) are joined into the order
+    query; items are fetched with their variant and product in one extra
+    SELECT ... IN query. Two queries in total, whatever the number of items.
+    """
+    return (
+        joinedload(Order.user),
+        joinedload(Order.shipping_address),
+        joinedload(Order.payment),
+        joinedload(Order.shipment),
+        selectinload(Order.items)
+            .joinedload(OrderItem.variant)
+            .joinedload(ProductVariant.product),
+    )
+
+
+def load_order_aggregate(db: Session, order_id: int, user_id: Optional[int] = None) -> Optional[Order]:
+    """Load a single order aggregate, optionally scoped to its owner"""
+    query = db.query(Order).options(*order_aggregate_options()).filter(Order.id == order_id)
+    if user_id is not None:
+        query = query.filter(Order.user_id == user_id)
+    return query.first()
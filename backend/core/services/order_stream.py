@@ -0,0 +1,331 @@
+import asyncio
+import datetime
+import logging
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session, attributes
+from starlette.concurrency import run_in_threadpool
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.models.models import Order, OrderStatusEvent, Shipment
+from core.services.metrics import order_stream_connections, order_stream_dropped_total
+
+logger = logging.getLogger(__name__)
+
+POLL_BATCH = 1000
+REPLAY_LIMIT = 100
+RECONNECT_MS = 3000
+# An id skipped by the feed is re-read this long, in case its transaction commits late
+GAP_WAIT_SECONDS = 30
+MAX_TRACKED_GAPS = 1000
+PRUNE_INTERVAL = 600
+
+_NOTIFY_KEY = "order_stream_notify"
+PING = object()
+CLOSE = object()
+
+
+# ----- recording: status changes become change feed rows in the same transaction -----
+
+@event.listens_for(Session, "before_flush")
+def _record_status_changes(session: Session, flush_context, instances):
+    recorded = False
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Order):
+            is_new = obj in session.new
+            if obj.order_status is None or obj.user_id is None:
+                continue
+            if not is_new and not attributes.get_history(obj, "order_status").has_changes():
+                continue
+            # order= rather than order_id, which a new order doesn't have until this flush inserts it
+            session.add(OrderStatusEvent(
+                order=obj, user_id=obj.user_id, kind="order", status=getattr(obj.order_status, "value", obj.order_status)
+            ))
+            recorded = True
+        elif isinstance(obj, Shipment):
+            if obj.status is None or obj.order_id is None:
+                continue
+            if obj not in session.new and not attributes.get_history(obj, "status").has_changes():
+                continue
+            session.add(OrderStatusEvent(
+                order_id=obj.order_id,
+                user_id=select(Order.user_id).where(Order.id == obj.order_id).scalar_subquery(),
+                kind="shipment",
+                status=obj.status,
+                data=orjson.dumps({
+                    "courier_name": obj.courier_name,
+                    "tracking_number": obj.tracking_number,
+                    "delivery_estimate": obj.delivery_estimate.isoformat() if obj.delivery_estimate else None,
+                }).decode(),
+            ))
+            recorded = True
+    if recorded:
+        session.info[_NOTIFY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session):
+    if session.info.pop(_NOTIFY_KEY, False):
+        order_stream.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session):
+    session.info.pop(_NOTIFY_KEY, None)
+
+
+def _event(row: OrderStatusEvent) -> dict:
+    data = {
+        "id": row.id,
+        "user_id": row.user_id,
+        "order_id": row.order_id,
+        "type": row.kind,
+        "status": row.status,
+        "at": row.created_at.isoformat() if row.created_at else None,
+    }
+    if row.data:
+        data.update(orjson.loads(row.data))
+    return data
+
+
+def history(user_id: int, after_id: int) -> List[dict]:
+    """A user's events after ``after_id`` still in the feed, for Last-Event-ID replay"""
+    db = SessionLocal()
+    try:
+        rows = db.query(OrderStatusEvent)\
+            .filter(OrderStatusEvent.user_id == user_id, OrderStatusEvent.id > after_id)\
+            .order_by(OrderStatusEvent.id)\
+            .limit(REPLAY_LIMIT)\
+            .all()
+        return [_event(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _frame(event: dict) -> str:
+    payload = {key: value for key, value in event.items() if key != "user_id"}
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {orjson.dumps(payload).decode()}\n\n"
+
+
+# ----- delivery: one feed reader per process, fanned out to every open stream -----
+
+class _Subscription(asyncio.Queue):
+    def __init__(self, user_id: int, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.user_id = user_id
+
+
+class OrderStream:
+    """
+    Pushes order and shipment status changes to open server-sent event streams.
+
+    Changes reach ``order_status_events`` from whichever process commits them
+    (an API worker, or worker.py running the outbox). In each API process one
+    thread reads new rows, straight away after a commit in this process and
+    otherwise every ``poll_interval``. It hands them to the event loop, which
+    puts each on the queues of that user's streams. An idle stream is just a
+    queue and a suspended generator: no thread, no DB connection and no timer
+    of its own. One loop-wide task sends the heartbeats.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._subscribers: Dict[int, Set[_Subscription]] = {}
+        self._connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat = None
+        self._last_id: Optional[int] = None
+        self._gaps: Dict[int, float] = {}
+        self._last_prune = 0.0
+        self._draining = False
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def connections(self) -> int:
+        return self._connections
+
+    @property
+    def full(self) -> bool:
+        return self._connections >= settings.order_stream_max_connections
+
+    def notify(self):
+        self._wakeup.set()
+
+    # ----- change feed (background thread) -----
+
+    def _read(self, db: Session) -> List[dict]:
+        if self._last_id is None:
+            self._last_id = db.query(func.max(OrderStatusEvent.id)).scalar() or 0
+        condition = OrderStatusEvent.id > self._last_id
+        if self._gaps:
+            condition = or_(condition, OrderStatusEvent.id.in_(list(self._gaps)))
+        rows = db.query(OrderStatusEvent).filter(condition).order_by(OrderStatusEvent.id).limit(POLL_BATCH).all()
+
+        now = time.monotonic()
+        ids = {row.id for row in rows}
+        for row_id in ids:
+            self._gaps.pop(row_id, None)
+        newest = max(ids, default=self._last_id)
+        if newest > self._last_id:
+            # Ids below the newest one that aren't visible yet may belong to a transaction still committing
+            start = max(self._last_id + 1, newest - MAX_TRACKED_GAPS)
+            for row_id in (i for i in range(start, newest) if i not in ids):
+                self._gaps[row_id] = now
+            self._last_id = newest
+        for row_id, seen in list(self._gaps.items()):
+            if now - seen > GAP_WAIT_SECONDS:
+                del self._gaps[row_id]
+        return [_event(row) for row in rows]
+
+    def _prune(self, db: Session):
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=settings.order_stream_retention_hours)
+        db.query(OrderStatusEvent).filter(OrderStatusEvent.created_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        self._last_prune = time.monotonic()
+
+    def poll(self) -> int:
+        db = SessionLocal()
+        try:
+            events = self._read(db)
+            if events and self._loop is not None:
+                self._loop.call_soon_threadsafe(self._fan_out, events)
+            if time.monotonic() - self._last_prune > PRUNE_INTERVAL:
+                self._prune(db)
+            return len(events)
+        finally:
+            db.close()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                read = self.poll()
+            except Exception:
+                logger.exception("Order stream poll failed")
+                read = 0
+            if read < POLL_BATCH:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    # ----- fan-out (event loop) -----
+
+    def _deliver(self, queue: _Subscription, item):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # The client stopped reading; end its stream so it reconnects and replays by Last-Event-ID
+            order_stream_dropped_total.inc()
+            self._close(queue)
+
+    def _close(self, queue: _Subscription):
+        self._unsubscribe(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(CLOSE)
+
+    def _fan_out(self, events: List[dict]):
+        for event in events:
+            for queue in list(self._subscribers.get(event["user_id"], ())):
+                self._deliver(queue, event)
+
+    async def _send_heartbeats(self):
+        while True:
+            await asyncio.sleep(settings.order_stream_heartbeat)
+            for queues in list(self._subscribers.values()):
+                for queue in list(queues):
+                    self._deliver(queue, PING)
+
+    def _subscribe(self, user_id: int) -> _Subscription:
+        queue = _Subscription(user_id, settings.order_stream_queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        self._connections += 1
+        order_stream_connections.inc()
+        return queue
+
+    def _unsubscribe(self, queue: _Subscription):
+        queues = self._subscribers.get(queue.user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[queue.user_id]
+        self._connections -= 1
+        order_stream_connections.dec()
+
+    async def stream(self, user_id: int, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Server-sent events for one user until the client goes away, falls
+        behind, or ``order_stream_max_seconds`` pass. Browsers reconnect on
+        their own, sending Last-Event-ID, and get what they missed replayed
+        from the feed.
+        """
+        queue = self._subscribe(user_id)
+        if self._draining:
+            self._close(queue)
+        loop = asyncio.get_running_loop()
+        # Jittered, so streams opened together (e.g. after a deploy) don't all reconnect together
+        deadline = loop.time() + settings.order_stream_max_seconds * random.uniform(0.9, 1.1)
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n"
+            replayed = set()
+            if last_event_id is not None:
+                for event in await run_in_threadpool(history, user_id, last_event_id):
+                    replayed.add(event["id"])
+                    yield _frame(event)
+            while True:
+                item = await queue.get()
+                if item is CLOSE:
+                    break
+                if item is PING:
+                    if loop.time() >= deadline:
+                        break
+                    yield ": ping\n\n"
+                elif item["id"] not in replayed:
+                    yield _frame(item)
+        finally:
+            self._unsubscribe(queue)
+
+    # ----- lifecycle -----
+
+    def close_streams(self):
+        """
+        End every open stream, and any opened from now on; clients reconnect
+        after ``retry`` and land on another worker. Call from the event loop as
+        soon as the server starts shutting down: streams never finish on their
+        own, so otherwise it waits out its whole graceful timeout on them.
+        """
+        self._draining = True
+        for queues in list(self._subscribers.values()):
+            for queue in list(queues):
+                self._close(queue)
+
+    def start(self):
+        """Call from the running event loop (the app lifespan)"""
+        if self._thread is None:
+            self._draining = False
+            self._loop = asyncio.get_running_loop()
+            self._heartbeat = self._loop.create_task(self._send_heartbeats())
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="order-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self.close_streams()
+
+
+order_stream = OrderStream(settings.order_stream_poll_interval)
@@ -0,0 +1,139 @@
+import datetime
+import json
+import logging
+import random
+import threading
+from typing import Callable, Dict
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.models.models import OutboxEvent, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+# topic -> handler(db, payload). Handlers must be idempotent: delivery is at-least-once.
+handlers: Dict[str, Callable[[Session, dict], None]] = {}
+
+
+def handler(topic: str):
+    def register(fn):
+        handlers[topic] = fn
+        return fn
+    return register
+
+
+def enqueue(db: Session, topic: str, payload: dict):
+    """
+    Add an event to the caller's session. It is committed, or rolled back,
+    together with the business rows that produced it.
+    """
+    db.add(OutboxEvent(topic=topic, payload=json.dumps(payload), status=OutboxStatus.pending))
+
+
+def _retry_delay(attempts: int) -> datetime.timedelta:
+    return datetime.timedelta(seconds=min(600, 2 ** attempts) * random.uniform(0.5, 1.0))
+
+
+def claim_batch(db: Session, batch_size: int, lease_seconds: int):
+    """
+    Lease up to ``batch_size`` due events. Events stuck in ``processing`` past
+    the lease (a worker died mid-batch) are claimed again.
+    """
+    now = datetime.datetime.utcnow()
+    events = db.query(OutboxEvent)\
+        .filter(or_(
+            and_(OutboxEvent.status == OutboxStatus.pending, OutboxEvent.available_at <= now),
+            and_(
+                OutboxEvent.status == OutboxStatus.processing,
+                OutboxEvent.claimed_at < now - datetime.timedelta(seconds=lease_seconds)
+            ),
+        ))\
+        .order_by(OutboxEvent.id)\
+        .limit(batch_size)\
+        .with_for_update(skip_locked=True)\
+        .all()
+    for event in events:
+        event.status = OutboxStatus.processing
+        event.claimed_at = now
+    db.commit()
+    return events
+
+
+def process_batch(batch_size: int = None) -> int:
+    """Claim and run one batch of events; returns how many were claimed"""
+    db = SessionLocal()
+    try:
+        events = claim_batch(db, batch_size or settings.outbox_batch_size, settings.outbox_lease_seconds)
+        for event in events:
+            attempts = event.attempts + 1
+            try:
+                fn = handlers.get(event.topic)
+                if fn is None:
+                    raise LookupError(f"No outbox handler for topic '{event.topic}'")
+                fn(db, json.loads(event.payload))
+            except Exception as e:
+                # Discard the handler's partial writes, then record the failure
+                db.rollback()
+                logger.exception("Outbox event %s (%s) failed", event.id, event.topic)
+                event.attempts = attempts
+                event.last_error = str(e)[:2000]
+                if attempts >= settings.outbox_max_attempts:
+                    event.status = OutboxStatus.failed
+                else:
+                    event.status = OutboxStatus.pending
+                    event.available_at = datetime.datetime.utcnow() + _retry_delay(event.attempts)
+            else:
+                event.attempts = attempts
+                event.status = OutboxStatus.done
+                event.processed_at = datetime.datetime.utcnow()
+                event.last_error = None
+            # The handler's writes and the event's new status commit together
+            db.commit()
+        return len(events)
+    finally:
+        db.close()
+
+
+class OutboxWorker:
+    """Background thread that drains the outbox; ``notify`` wakes it right after a commit"""
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = process_batch()
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+                claimed = 0
+            # A full batch probably means more is waiting, so go again straight away
+            if claimed < settings.outbox_batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="outbox-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+outbox_worker = OutboxWorker(settings.outbox_poll_interval)
+
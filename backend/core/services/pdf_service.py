@@ -7,81 +7,91 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 from io import BytesIO
+from functools import lru_cache
 import datetime
 from decimal import Decimal
 
+
+@lru_cache(maxsize=None)
+def get_invoice_styles():
+    """Build the invoice stylesheet once per process; renders only read from it"""
+    styles = getSampleStyleSheet()
+    _setup_custom_styles(styles)
+    return styles
+
+
+def _setup_custom_styles(styles):
+    """Setup custom styles for the invoice"""
+    # Main title style
+    styles.add(ParagraphStyle(
+        name='MainTitle',
+        parent=styles['Heading1'],
+        fontSize=28,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#1f2937'),
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Company info style
+    styles.add(ParagraphStyle(
+        name='CompanyInfo',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=3,
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#6b7280'),
+        fontName='Helvetica'
+    ))
+    
+    # Section title style
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=colors.HexColor('#1f2937'),
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Invoice info style
+    styles.add(ParagraphStyle(
+        name='InvoiceInfo',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        alignment=TA_RIGHT,
+        textColor=colors.HexColor('#374151'),
+        fontName='Helvetica'
+    ))
+    
+    # Customer info style
+    styles.add(ParagraphStyle(
+        name='CustomerInfo',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=4,
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#374151'),
+        fontName='Helvetica'
+    ))
+    
+    # Terms style
+    styles.add(ParagraphStyle(
+        name='Terms',
+        parent=styles['Normal'],
+        fontSize=9,
+        spaceAfter=4,
+        alignment=TA_JUSTIFY,
+        textColor=colors.HexColor('#6b7280'),
+        fontName='Helvetica'
+    ))
+
+
 class InvoicePDFService:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom styles for the invoice"""
-        # Main title style
-        self.styles.add(ParagraphStyle(
-            name='MainTitle',
-            parent=self.styles['Heading1'],
-            fontSize=28,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#1f2937'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Company info style
-        self.styles.add(ParagraphStyle(
-            name='CompanyInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=3,
-            alignment=TA_LEFT,
-            textColor=colors.HexColor('#6b7280'),
-            fontName='Helvetica'
-        ))
-        
-        # Section title style
-        self.styles.add(ParagraphStyle(
-            name='SectionTitle',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            spaceBefore=20,
-            textColor=colors.HexColor('#1f2937'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Invoice info style
-        self.styles.add(ParagraphStyle(
-            name='InvoiceInfo',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            alignment=TA_RIGHT,
-            textColor=colors.HexColor('#374151'),
-            fontName='Helvetica'
-        ))
-        
-        # Customer info style
-        self.styles.add(ParagraphStyle(
-            name='CustomerInfo',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=4,
-            alignment=TA_LEFT,
-            textColor=colors.HexColor('#374151'),
-            fontName='Helvetica'
-        ))
-        
-        # Terms style
-        self.styles.add(ParagraphStyle(
-            name='Terms',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            spaceAfter=4,
-            alignment=TA_JUSTIFY,
-            textColor=colors.HexColor('#6b7280'),
-            fontName='Helvetica'
-        ))
+        self.styles = get_invoice_styles()
 
     def generate_invoice_pdf(self, order, order_items, user, shipping_address, payment):
         """Generate professional invoice PDF for an order"""
@@ -421,4 +431,9 @@ class InvoicePDFService:
         
         elements.append(Paragraph(footer_text, self.styles['Normal']))
         
-        return elements 
\ No newline at end of file
+        return elements 
+
+
+def render_invoice_bytes(invoice_data):
+    """Render an invoice from plain keyword data; module-level so process pool workers can run it"""
+    return InvoicePDFService().generate_invoice_pdf(**invoice_data).getvalue()
@@ -0,0 +1,201 @@
+import collections
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Indian PINs are six digits, so a PIN is its own array index
+PINCODE_SPACE = 1000000
+INDEX_FILE = "pincodes.npy"
+PLACES_FILE = "places.json"
+
+STATES = [
+    "Andaman and Nicobar Islands", "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chandigarh",
+    "Chhattisgarh", "Dadra and Nagar Haveli and Daman and Diu", "Delhi", "Goa", "Gujarat", "Haryana",
+    "Himachal Pradesh", "Jammu and Kashmir", "Jharkhand", "Karnataka", "Kerala", "Ladakh", "Lakshadweep",
+    "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Puducherry",
+    "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand",
+    "West Bengal",
+]
+STATE_ALIASES = {
+    "andaman nicobar": "Andaman and Nicobar Islands", "andaman and nicobar": "Andaman and Nicobar Islands",
+    "ap": "Andhra Pradesh", "as": "Assam", "br": "Bihar", "cg": "Chhattisgarh", "chattisgarh": "Chhattisgarh",
+    "dadra and nagar haveli": "Dadra and Nagar Haveli and Daman and Diu",
+    "daman and diu": "Dadra and Nagar Haveli and Daman and Diu", "dl": "Delhi", "new delhi": "Delhi",
+    "nct of delhi": "Delhi", "ga": "Goa", "gj": "Gujarat", "hr": "Haryana", "hp": "Himachal Pradesh",
+    "jk": "Jammu and Kashmir", "j and k": "Jammu and Kashmir", "jh": "Jharkhand", "ka": "Karnataka", "kl": "Kerala",
+    "mp": "Madhya Pradesh", "mh": "Maharashtra", "orissa": "Odisha", "od": "Odisha", "pondicherry": "Puducherry",
+    "py": "Puducherry", "pb": "Punjab", "rj": "Rajasthan", "tn": "Tamil Nadu", "ts": "Telangana",
+    "tg": "Telangana", "up": "Uttar Pradesh", "uk": "Uttarakhand", "uttaranchal": "Uttarakhand",
+    "wb": "West Bengal",
+}
+
+# Token spellings folded together before hashing an address line
+ABBREVIATIONS = {
+    "rd": "road", "st": "street", "ln": "lane", "apt": "apartment", "apts": "apartments", "bldg": "building",
+    "flr": "floor", "fl": "floor", "opp": "opposite", "nr": "near", "sec": "sector", "sect": "sector",
+    "ngr": "nagar", "no": "number", "num": "number", "hno": "house number", "blk": "block", "cly": "colony",
+    "extn": "extension", "ext": "extension", "mkt": "market", "stn": "station", "jn": "junction",
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_INITIALS = re.compile(r"(?<=[a-z])\.(?=[a-z])")  # "m.g. road" -> "mg. road"
+
+
+def _tokens(text: str) -> List[str]:
+    text = _INITIALS.sub("", unicodedata.normalize("NFKC", text or "").casefold())
+    return _NON_ALNUM.sub(" ", text).split()
+
+
+def canonical_state(state: str) -> str:
+    """Canonical state/UT name for common spellings and codes; unknown input comes back tidied"""
+    key = " ".join(_tokens(state.replace("&", " and ")))
+    if key in STATE_ALIASES:
+        return STATE_ALIASES[key]
+    # Spacing is the commonest variation ("Tamilnadu", "West  Bengal")
+    squashed = key.replace(" ", "")
+    for name in STATES:
+        if squashed == name.lower().replace(" ", ""):
+            return name
+    return " ".join(state.split()).title()
+
+
+def normalize_line(line: str) -> str:
+    return " ".join(ABBREVIATIONS.get(token, token) for token in _tokens(line))
+
+
+def address_fingerprint(address_line1: str, zip_code: int) -> str:
+    """
+    Identity of an address for duplicate detection: the normalized street
+    line plus the PIN. City and state are left out on purpose; the PIN already
+    pins them down, and their free-text spellings ("Bangalore", "Bengaluru")
+    are exactly what shouldn't make two addresses differ.
+    """
+    key = f"{normalize_line(address_line1)}|{int(zip_code):06d}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class PincodeIndex:
+    """
+    PIN -> (district, state), fully offline.
+
+    ``pincodes.npy`` is a flat uint16 array with one slot per possible PIN
+    (2 MB); a slot holds 1 + the row of ``places.json``, or 0 for unknown PINs.
+    It is memory-mapped, so a lookup is one array read, nothing is parsed at
+    startup, and every worker process shares the same pages. Build the files
+    with ``python -m scripts.pincodes``.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._slots = None
+        self._places: List[Tuple[str, str]] = []
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        # Requests in the threadpool race to the first lookup; the others wait instead of seeing a half-loaded index
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            index_path = os.path.join(self.directory, INDEX_FILE)
+            if os.path.exists(index_path):
+                slots = np.load(index_path, mmap_mode="r")
+                with open(os.path.join(self.directory, PLACES_FILE)) as f:
+                    self._places = [tuple(place) for place in json.load(f)]
+                self._slots = slots
+            else:
+                logger.warning("No pincode index at %s; PIN lookups will miss", index_path)
+            # Only once both are in place
+            self._loaded = True
+
+    @property
+    def available(self) -> bool:
+        self._load()
+        return self._slots is not None
+
+    def lookup(self, pincode: int) -> Optional[Dict[str, str]]:
+        self._load()
+        if self._slots is None or not 0 <= pincode < PINCODE_SPACE:
+            return None
+        slot = int(self._slots[pincode])
+        if not slot:
+            return None
+        district, state = self._places[slot - 1]
+        return {"pincode": f"{pincode:06d}", "city": district, "district": district, "state": state}
+
+    def known(self, pincodes: np.ndarray) -> np.ndarray:
+        """Mask of PINs in the index; every in-range PIN counts as known when there is no index"""
+        in_range = (pincodes >= 0) & (pincodes < PINCODE_SPACE)
+        if not self.available:
+            return in_range
+        return in_range & (self._slots[np.where(in_range, pincodes, 0)] > 0)
+
+
+pincode_index = PincodeIndex(settings.pincode_index_dir)
+
+
+def _column(row: Dict[str, str], *names: str) -> str:
+    for name in names:
+        if row.get(name):
+            return row[name].strip()
+    return ""
+
+
+def build_index(csv_paths: List[str], directory: str) -> dict:
+    """
+    Compile post office CSVs (India Post's "All India Pincode Directory"
+    layout: pincode, districtname/district, statename/state columns, any case)
+    into the index files. A PIN served by offices in several districts takes
+    its most common one.
+    """
+    counts: Dict[int, collections.Counter] = collections.defaultdict(collections.Counter)
+    for path in csv_paths:
+        with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            reader = csv.DictReader(f)
+            reader.fieldnames = [name.strip().lower().replace(" ", "") for name in reader.fieldnames or []]
+            for row in reader:
+                digits = re.sub(r"\D", "", _column(row, "pincode", "pin"))
+                district = _column(row, "districtname", "district")
+                state = _column(row, "statename", "state")
+                if len(digits) != 6 or not district or not state:
+                    continue
+                counts[int(digits)][(" ".join(district.split()).title(), canonical_state(state))] += 1
+
+    places: Dict[Tuple[str, str], int] = {}
+    slots = np.zeros(PINCODE_SPACE, dtype=np.uint16)
+    for pincode, candidates in counts.items():
+        place = candidates.most_common(1)[0][0]
+        slots[pincode] = places.setdefault(place, len(places)) + 1
+    if len(places) >= np.iinfo(np.uint16).max:
+        raise ValueError(f"{len(places)} distinct places do not fit a uint16 index")
+
+    os.makedirs(directory, exist_ok=True)
+    # Write next to the target and rename, so a running API never maps a half-written file
+    for name, write in (
+        (PLACES_FILE, lambda f: f.write(json.dumps([list(p) for p in places]).encode())),
+        (INDEX_FILE, lambda f: np.save(f, slots)),
+    ):
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, os.path.join(directory, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return {"pincodes": len(counts), "places": len(places)}
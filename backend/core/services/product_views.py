@@ -0,0 +1,169 @@
+import datetime
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.database.upsert import upsert_increment
+from core.models.models import Product, ProductView, ProductViewCount
+from core.services.metrics import product_views_dropped_total
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def bucket_start(at: datetime.datetime, minutes: int) -> datetime.datetime:
+    """Start of the ``minutes``-wide bucket containing ``at`` (naive UTC, like every timestamp here)"""
+    epoch_minutes = int((at - _EPOCH).total_seconds() // 60)
+    return _EPOCH + datetime.timedelta(minutes=epoch_minutes - epoch_minutes % minutes)
+
+
+class ViewTracker:
+    """
+    Buffers product views in memory and writes them in bulk.
+
+    ``record`` only appends to a bounded ring buffer, so a page view never waits
+    on the database. A background thread drains the buffer every
+    ``view_flush_interval_ms`` (sooner once ``view_flush_rows`` are waiting) and,
+    in one transaction, inserts the raw ``product_views`` rows and adds the
+    batch onto per-product, per-bucket ``product_view_counts``. Trending reads
+    only those counters.
+
+    Views still in the buffer are lost if the process dies, and under sustained
+    overload the oldest unflushed views are dropped; both are acceptable for
+    analytics and are visible in ``shopkart_product_views_dropped_total``.
+    """
+
+    def __init__(self, buffer_size: int, flush_interval: float, flush_rows: int):
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def record(self, product_id: int, user_id: Optional[int] = None):
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                product_views_dropped_total.inc()
+            self._buffer.append((product_id, user_id, datetime.datetime.utcnow()))
+            waiting = len(self._buffer)
+        if waiting >= self.flush_rows:
+            self._wakeup.set()
+
+    def _drain(self) -> List[Tuple[int, Optional[int], datetime.datetime]]:
+        with self._lock:
+            views = list(self._buffer)
+            self._buffer.clear()
+        return views
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns how many views were written"""
+        views = self._drain()
+        if not views:
+            return 0
+
+        db = SessionLocal()
+        try:
+            # Unknown product ids would fail the whole batch on the foreign key
+            known = {pid for (pid,) in db.query(Product.id).filter(Product.id.in_({v[0] for v in views}))}
+            views = [v for v in views if v[0] in known]
+            if not views:
+                return 0
+
+            if settings.view_store_raw:
+                db.execute(insert(ProductView), [
+                    {"product_id": product_id, "user_id": user_id, "viewed_at": viewed_at}
+                    for product_id, user_id, viewed_at in views
+                ])
+            counts = Counter(
+                (product_id, bucket_start(viewed_at, settings.view_bucket_minutes))
+                for product_id, _, viewed_at in views
+            )
+            upsert_increment(db, ProductViewCount, ("product_id", "bucket_start"), ("views",), [
+                {"product_id": product_id, "bucket_start": bucket, "views": n}
+                for (product_id, bucket), n in counts.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the batch back (older than anything recorded since) for the next attempt
+            with self._lock:
+                room = self._buffer.maxlen - len(self._buffer)
+                if room > 0:
+                    self._buffer.extendleft(reversed(views[-room:]))
+            raise
+        finally:
+            db.close()
+        return len(views)
+
+    def run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Product view flush failed; will retry")
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="product-view-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final product view flush failed")
+
+
+view_tracker = ViewTracker(settings.view_buffer_size, settings.view_flush_interval_ms / 1000, settings.view_flush_rows)
+
+# (hours, limit) -> (expires_at, rows)
+_trending_cache = {}
+
+
+def trending_products(db: Session, hours: int, limit: int) -> List[dict]:
+    """Most viewed products over the last ``hours``, summed from the bucketed counters"""
+    cached = _trending_cache.get((hours, limit))
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    since = bucket_start(datetime.datetime.utcnow() - datetime.timedelta(hours=hours), settings.view_bucket_minutes)
+    views = func.sum(ProductViewCount.views).label("views")
+    top = db.query(ProductViewCount.product_id, views)\
+        .filter(ProductViewCount.bucket_start >= since)\
+        .group_by(ProductViewCount.product_id)\
+        .order_by(views.desc(), ProductViewCount.product_id)\
+        .limit(limit)\
+        .subquery()
+    rows = db.query(Product, top.c.views)\
+        .join(top, top.c.product_id == Product.id)\
+        .order_by(top.c.views.desc(), Product.id)\
+        .all()
+
+    result = [
+        {
+            "id": p.id, "name": p.name, "brand": p.brand, "description": p.description,
+            "price": p.price, "category_id": p.category_id, "image_url": p.image_url,
+            "rating_summary": p.rating_summary, "views": views,
+        }
+        for p, views in rows
+    ]
+    _trending_cache[(hours, limit)] = (time.monotonic() + settings.trending_cache_seconds, result)
+    return result
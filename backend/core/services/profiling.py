@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import List, Optional
+
+from core.config.settings import settings
+
+# The capture profiling the current request; worker threads inherit it through the context copy
+current_capture: contextvars.ContextVar[Optional["RequestSampler"]] = contextvars.ContextVar(
+    "current_profile_capture", default=None
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _coroutine_frames(task: asyncio.Task) -> List:
+    """Frames of a task's coroutine chain, outermost first, whether it is running or suspended"""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+def _thread_frames(frame) -> List:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class RequestSampler:
+    """
+    Wall-clock sampling profiler for one request.
+
+    Every ``interval`` a background thread records where the request is: the
+    coroutine chain of its asyncio task (so time spent awaiting Razorpay or a
+    stream shows up), followed by the stack of any threadpool thread currently
+    running on the request's behalf (sync routes and dependencies). Threads are
+    attributed by the ``contextvars.Context`` that anyio's worker is running,
+    which carries ``current_capture``; concurrent requests don't leak in.
+
+    Samples are aggregated into collapsed stacks ("a;b;c 12"), the input format
+    of flamegraph.pl, speedscope and inferno.
+
+    cProfile is not used: it only sees the thread that enabled it, which for a
+    sync route is the event loop rather than the worker running the handler.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.id = uuid.uuid4().hex[:16]
+        self.task = task
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True)
+
+    def _request_threads(self, frames_by_thread) -> List:
+        stacks = []
+        for thread_id, frame in frames_by_thread.items():
+            if thread_id == threading.get_ident():
+                continue
+            frames = _thread_frames(frame)
+            for i, f in enumerate(frames):
+                # anyio's WorkerThread.run holds the Context it is running the call in
+                if f.f_code.co_name == "run" and "anyio" in f.f_code.co_filename:
+                    context = f.f_locals.get("context")
+                    if isinstance(context, contextvars.Context) and context.get(current_capture) is self:
+                        # Drop the thread bootstrap and worker loop, keep the call itself
+                        stacks.append(frames[i + 1:])
+                    break
+        return stacks
+
+    def sample(self):
+        labels = [_frame_label(f) for f in _coroutine_frames(self.task)]
+        thread_stacks = self._request_threads(sys._current_frames())
+        if thread_stacks:
+            for frames in thread_stacks:
+                self.stacks[";".join(labels + [_frame_label(f) for f in frames])] += 1
+        elif labels:
+            self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Frames can vanish mid-walk; a lost sample is fine
+                pass
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring of captures: ``<id>.folded`` (collapsed stacks) plus
+    ``<id>.json`` (request metadata). Once there are more than ``max_captures``
+    the oldest are deleted.
+    """
+
+    def __init__(self, root: str, max_captures: int):
+        self.root = root
+        self.max_captures = max_captures
+
+    def _path(self, capture_id: str, ext: str) -> str:
+        return os.path.join(self.root, f"{capture_id}.{ext}")
+
+    def save(self, capture: RequestSampler, meta: dict):
+        os.makedirs(self.root, exist_ok=True)
+        self._atomic_write(self._path(capture.id, "folded"), capture.collapsed().encode())
+        self._atomic_write(self._path(capture.id, "json"), json.dumps(meta).encode())
+        self._prune()
+
+    def _prune(self):
+        metas = sorted(
+            (entry for entry in os.scandir(self.root) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in metas[:max(0, len(metas) - self.max_captures)]:
+            capture_id = entry.name[:-len(".json")]
+            for ext in ("json", "folded"):
+                try:
+                    os.unlink(self._path(capture_id, ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[dict]:
+        if not os.path.isdir(self.root):
+            return []
+        captures = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".json"):
+                try:
+                    with open(entry.path) as f:
+                        captures.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(captures, key=lambda meta: meta["created_at"], reverse=True)
+
+    def folded_path(self, capture_id: str) -> Optional[str]:
+        # Ids are hex; anything else could escape the directory
+        if not capture_id.isalnum():
+            return None
+        path = self._path(capture_id, "folded")
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_captures)
+
+
+class ProfilingState:
+    """Per-process sampling rate; starts from settings and can be changed by an admin at runtime"""
+
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+
+
+profiling_state = ProfilingState(settings.profiling_sample_rate)
+
+
+def capture_metadata(capture: RequestSampler, scope, status_code: int, started: float, trigger: str) -> dict:
+    route = scope.get("route")
+    return {
+        "id": capture.id,
+        "created_at": datetime.datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", None),
+        "status": status_code,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "samples": capture.samples,
+        "interval_ms": capture.interval * 1000,
+        "trigger": trigger,
+    }
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Tuple
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> Tuple[float, float]:
+    """``"10/60"`` -> (capacity 10, refill 10/60 tokens per second)"""
+    requests, _, seconds = rate.partition("/")
+    capacity = float(requests)
+    return capacity, capacity / float(seconds or 1)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, capacity: float, refill: float, now: float) -> float:
+        """Spend one token; returns 0 on success, else seconds until one is available"""
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * refill)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / refill
+
+
+class RateLimiter:
+    """
+    In-process token buckets keyed by (scope, client). Only the event loop
+    touches it, so no locking. Buckets are kept in LRU order and the least
+    recently seen are dropped past ``max_keys``, which bounds memory when many
+    distinct IPs show up. Limits are per process: with N workers a client can
+    get up to N times the configured rate.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+    def hit(self, key: Hashable, rate: str) -> float:
+        capacity, refill = parse_rate(rate)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(capacity, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(capacity, refill, now)
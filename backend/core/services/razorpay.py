@@ -1,4 +1,43 @@
 import razorpay
+import requests
+from razorpay.errors import BadRequestError, GatewayError, ServerError
+
+from core.config.settings import settings
+from core.utils.resilience import Bulkhead, CircuitBreaker, Dependency, RetryPolicy
+
 client = razorpay.Client(auth=("rzp_test_0DqsVb6cb8KC42", "vF673B83IfEdp4UzNkcpp7Se"))
 
-client.set_app_details({"title" : "ShopKart", "version" : "1.1.0"})
\ No newline at end of file
+client.set_app_details({"title" : "ShopKart", "version" : "1.1.0"})
+
+UNAVAILABLE_DETAIL = "Razorpay cannot process your request right now! Please try again later"
+
+# Passed to every client call; the razorpay SDK has no default timeout
+TIMEOUT = (settings.razorpay_connect_timeout, settings.razorpay_read_timeout)
+
+razorpay_dependency = Dependency(
+    "razorpay",
+    # Reads are idempotent, so timeouts and 5xx are safe to retry
+    retry=RetryPolicy(retry_on={
+        requests.ConnectionError: 3,
+        requests.Timeout: 2,
+        ServerError: 3,
+        GatewayError: 2,
+    }),
+    breaker=CircuitBreaker(
+        failure_threshold=settings.razorpay_failure_threshold,
+        recovery_timeout=settings.razorpay_recovery_timeout,
+    ),
+    bulkhead=Bulkhead(max_concurrent=settings.razorpay_max_concurrent),
+    ignore=(BadRequestError,),
+)
+
+# Creating an order is not idempotent: only retry when the request never reached Razorpay
+CREATE_RETRY = RetryPolicy(retry_on={requests.ConnectTimeout: 3})
+
+
+def create_order(data: dict) -> dict:
+    return razorpay_dependency.call(client.order.create, data=data, timeout=TIMEOUT, retry=CREATE_RETRY)
+
+
+async def fetch_payment(payment_id: str) -> dict:
+    return await razorpay_dependency.acall(client.payment.fetch, payment_id, timeout=TIMEOUT)
@@ -0,0 +1,218 @@
+import datetime
+import logging
+import os
+import tempfile
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from core.config.settings import settings
+from core.models.models import Order, OrderItem, OrderStatus, ProductRecommendation, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+
+def cooccurrence(order_ids: np.ndarray, product_ids: np.ndarray, n_products: int) -> sparse.csr_matrix:
+    """
+    Product x product matrix of how many orders contain both products, from
+    parallel (order_id, product_id) arrays. Built as ``B.T @ B`` over the
+    order x product incidence matrix ``B``; the diagonal is dropped.
+    """
+    _, order_index = np.unique(order_ids, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(order_index), dtype=np.int32), (order_index, product_ids)),
+        shape=(int(order_index.max(initial=-1)) + 1, n_products),
+    )
+    incidence.sum_duplicates()
+    # Two variants of one product in an order still count once
+    incidence.data[:] = 1
+    matrix = (incidence.T @ incidence).tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def top_k(matrix: sparse.csr_matrix, k: int, min_support: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The ``k`` strongest neighbours of every row, as (rows, neighbours, counts)
+    sorted by row, then count descending, then neighbour id. One lexsort over
+    all entries instead of a Python loop per product.
+    """
+    matrix = matrix.tocsr()
+    counts, neighbours = matrix.data, matrix.indices
+    rows = np.repeat(np.arange(matrix.shape[0], dtype=np.int64), np.diff(matrix.indptr))
+    keep = counts >= min_support
+    counts, neighbours, rows = counts[keep], neighbours[keep], rows[keep]
+
+    order = np.lexsort((neighbours, -counts, rows))
+    counts, neighbours, rows = counts[order], neighbours[order], rows[order]
+    # Position of each entry within its row
+    starts = np.searchsorted(rows, rows, side="left")
+    keep = (np.arange(len(rows)) - starts) < k
+    return rows[keep], neighbours[keep], counts[keep]
+
+
+def order_product_pairs(db: Session, after_order_id: int, until_order_id: int,
+                        chunk_orders: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(order_ids, product_ids) arrays for non-cancelled orders in (after, until], in order id windows"""
+    low = after_order_id
+    while low < until_order_id:
+        high = min(low + chunk_orders, until_order_id)
+        rows = db.query(OrderItem.order_id, ProductVariant.product_id)\
+            .join(Order, Order.id == OrderItem.order_id)\
+            .join(ProductVariant, ProductVariant.id == OrderItem.variant_id)\
+            .filter(Order.id > low, Order.id <= high, Order.order_status != OrderStatus.cancelled)\
+            .all()
+        if rows:
+            pairs = np.array(rows, dtype=np.int64)
+            yield pairs[:, 0], pairs[:, 1]
+        low = high
+
+
+def _resize(matrix: sparse.csr_matrix, n: int) -> sparse.csr_matrix:
+    if matrix.shape[0] >= n:
+        return matrix
+    matrix = matrix.tocsr(copy=True)
+    matrix.resize((n, n))
+    return matrix
+
+
+def settled_high_water(db: Session, after_order_id: int, settle_seconds: int) -> int:
+    """
+    Last order id that is safe to fold: ids are taken in order up to the first
+    order younger than ``settle_seconds``, so one whose id was allocated
+    earlier but committed later than its neighbours is not skipped.
+    """
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=settle_seconds)
+    unsettled = db.query(func.min(Order.id)).filter(Order.id > after_order_id, Order.created_at > cutoff).scalar()
+    if unsettled is not None:
+        return max(after_order_id, unsettled - 1)
+    return max(after_order_id, db.query(func.max(Order.id)).scalar() or 0)
+
+
+def load_state(path: str) -> Optional[Tuple[sparse.csr_matrix, int]]:
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as state:
+        matrix = sparse.csr_matrix((state["data"], state["indices"], state["indptr"]), shape=tuple(state["shape"]))
+        return matrix, int(state["watermark"])
+
+
+def _pending_path(path: str) -> str:
+    return path + ".pending.npy"
+
+
+def load_pending(path: str) -> np.ndarray:
+    """Products whose lookup rows a failed run left stale, to be rewritten by the next one"""
+    pending_path = _pending_path(path)
+    if not os.path.exists(pending_path):
+        return np.array([], dtype=np.int64)
+    return np.load(pending_path)
+
+
+def save_state(path: str, matrix: sparse.csr_matrix, watermark: int):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                     shape=np.array(matrix.shape), watermark=np.array(watermark))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_recommendations(db: Session, rows: np.ndarray, neighbours: np.ndarray, products: Optional[np.ndarray]):
+    """
+    Replace the lookup rows of ``products`` (every product when None) with the
+    new neighbour lists. Runs in the caller's transaction.
+    """
+    if products is None:
+        db.execute(delete(ProductRecommendation))
+    else:
+        for start in range(0, len(products), 5000):
+            chunk = products[start:start + 5000].tolist()
+            db.execute(delete(ProductRecommendation).where(ProductRecommendation.product_id.in_(chunk)))
+        wanted = np.isin(rows, products)
+        rows, neighbours = rows[wanted], neighbours[wanted]
+
+    boundaries = np.flatnonzero(np.diff(rows)) + 1
+    now = datetime.datetime.utcnow()
+    batch = []
+    for product_rows, product_neighbours in zip(np.split(rows, boundaries), np.split(neighbours, boundaries)):
+        if not len(product_rows):
+            continue
+        batch.append({
+            "product_id": int(product_rows[0]),
+            "neighbour_ids": ",".join(map(str, product_neighbours.tolist())),
+            "updated_at": now,
+        })
+        if len(batch) >= 5000:
+            db.execute(insert(ProductRecommendation), batch)
+            batch = []
+    if batch:
+        db.execute(insert(ProductRecommendation), batch)
+
+
+def refresh(db: Session, full: bool = False, top: int = None, min_support: int = None, state_path: str = None) -> dict:
+    """
+    Bring the "frequently bought together" table up to date.
+
+    Co-occurrence counts only ever grow with new orders, so the matrix and the
+    last order id folded into it are kept in ``state_path``: an incremental run
+    multiplies only the new orders, adds them on, and rewrites the lookup rows
+    of just the products those orders contain (no other row can have changed).
+    A full run rebuilds from every order; use it after cancellations or
+    deletions, which incremental runs do not subtract.
+
+    Orders are folded only once ``recommendations_settle_seconds`` old. The
+    state is saved before the lookup rows commit, next to the list of products
+    being rewritten; if the commit then fails, the next run rewrites those
+    from the saved matrix rather than counting their orders a second time.
+    """
+    top = top or settings.recommendations_top_k
+    min_support = min_support or settings.recommendations_min_support
+    state_path = state_path or settings.recommendations_state_path
+
+    state = None if full else load_state(state_path)
+    matrix, watermark = state if state else (sparse.csr_matrix((0, 0), dtype=np.int32), 0)
+    high_water = settled_high_water(db, watermark, settings.recommendations_settle_seconds)
+
+    touched = [load_pending(state_path)]
+    for order_ids, product_ids in order_product_pairs(db, watermark, high_water, settings.recommendations_chunk_orders):
+        # Sized from the products actually read, so ones created during the run still fit
+        matrix = _resize(matrix, int(product_ids.max()) + 1)
+        matrix = matrix + cooccurrence(order_ids, product_ids, matrix.shape[0])
+        touched.append(np.unique(product_ids))
+
+    incremental = state is not None
+    products = np.unique(np.concatenate(touched)).astype(np.int64)
+    products = products[products < matrix.shape[0]]
+
+    matrix = matrix.tocsr()
+    pending_path = _pending_path(state_path)
+    os.makedirs(os.path.dirname(pending_path) or ".", exist_ok=True)
+    np.save(pending_path, products if incremental else np.arange(matrix.shape[0], dtype=np.int64))
+    save_state(state_path, matrix, high_water)
+
+    rows, neighbours, _ = top_k(matrix[products] if incremental else matrix, top, min_support)
+    if incremental:
+        # top_k numbered the selected rows 0..n-1; map back to product ids
+        rows = products[rows]
+    write_recommendations(db, rows, neighbours, products if incremental else None)
+    db.commit()
+    os.unlink(pending_path)
+
+    result = {
+        "mode": "incremental" if incremental else "full",
+        "orders_after": watermark,
+        "watermark": high_water,
+        "products_updated": int(len(products)) if incremental else int(len(np.unique(rows))),
+        "links": int(matrix.nnz),
+    }
+    logger.info("Recommendations refreshed: %s", result)
+    return result
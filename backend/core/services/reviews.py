@@ -0,0 +1,54 @@
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.models.models import Order, OrderItem, OrderStatus, ProductRatingSummary, ProductVariant
+
+
+def _summary_changes(old_rating: Optional[int], new_rating: Optional[int]) -> dict:
+    """Column -> delta for replacing ``old_rating`` with ``new_rating`` (None on either side for create/delete)"""
+    changes = {"count": 0, "sum": 0}
+    for rating, sign in ((old_rating, -1), (new_rating, 1)):
+        if rating is None:
+            continue
+        changes["count"] += sign
+        changes["sum"] += sign * rating
+        changes[f"stars_{rating}"] = changes.get(f"stars_{rating}", 0) + sign
+    return {column: delta for column, delta in changes.items() if delta}
+
+
+def apply_rating_change(db: Session, product_id: int, old_rating: Optional[int], new_rating: Optional[int]):
+    """
+    Adjust the product's rating summary in the caller's transaction. The update
+    is relative (``count = count + 1``), so concurrent reviews don't lose writes.
+    """
+    changes = _summary_changes(old_rating, new_rating)
+    if not changes:
+        return
+
+    values = {column: getattr(ProductRatingSummary, column) + delta for column, delta in changes.items()}
+    stmt = update(ProductRatingSummary).where(ProductRatingSummary.product_id == product_id).values(**values)
+    if db.execute(stmt).rowcount:
+        return
+
+    # First review of the product: create the row, unless a concurrent request just did
+    try:
+        with db.begin_nested():
+            db.add(ProductRatingSummary(product_id=product_id, **changes))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def has_purchased(db: Session, user_id: int, product_id: int) -> bool:
+    """Whether the user has a non-cancelled order containing any variant of the product"""
+    return db.query(OrderItem.id)\
+        .join(Order, Order.id == OrderItem.order_id)\
+        .join(ProductVariant, ProductVariant.id == OrderItem.variant_id)\
+        .filter(
+            Order.user_id == user_id,
+            Order.order_status != OrderStatus.cancelled,
+            ProductVariant.product_id == product_id,
+        )\
+        .first() is not None
@@ -0,0 +1,164 @@
+import datetime
+import logging
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config.settings import settings
+from core.database.database import SessionLocal
+from core.database.upsert import upsert_increment
+from core.models.models import (
+    Order, OrderItem, OrderStatus, PaymentStatus, Product, ProductVariant, RollupWatermark, SalesRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "sales"
+DIMENSIONS = ("total", "category", "brand", "payment_status")
+
+
+def _watermark(db: Session) -> int:
+    row = db.get(RollupWatermark, WATERMARK)
+    if row is None:
+        try:
+            with db.begin_nested():
+                db.add(RollupWatermark(name=WATERMARK, last_order_id=0))
+        except IntegrityError:
+            pass
+        return 0
+    return row.last_order_id
+
+
+def aggregate(db: Session, after_id: int, until_id: int) -> Dict[Tuple, list]:
+    """
+    (day, dimension, key) -> [revenue, units, order ids] over orders in (after_id, until_id].
+
+    Cancelled orders are left out. Sales (total, category, brand) count paid
+    orders only; the payment_status breakdown counts every order, so pending
+    and failed payments stay visible without inflating revenue.
+    """
+    lines = db.query(
+        Order.id, Order.created_at, Order.payment_status,
+        Product.category_id, Product.brand, OrderItem.quantity, OrderItem.unit_price,
+    )\
+        .join(OrderItem, OrderItem.order_id == Order.id)\
+        .join(ProductVariant, ProductVariant.id == OrderItem.variant_id)\
+        .join(Product, Product.id == ProductVariant.product_id)\
+        .filter(Order.id > after_id, Order.id <= until_id)\
+        .filter(or_(Order.order_status.is_(None), Order.order_status != OrderStatus.cancelled))\
+        .all()
+
+    totals = defaultdict(lambda: [Decimal("0"), 0, set()])
+    for order_id, created_at, payment_status, category_id, brand, quantity, unit_price in lines:
+        day = created_at.date()
+        revenue = Decimal(str(unit_price or 0)) * (quantity or 0)
+        status = getattr(payment_status, "value", payment_status)
+        keys = [(day, "payment_status", status or "")]
+        if payment_status == PaymentStatus.paid:
+            keys += [(day, "total", ""), (day, "category", str(category_id)), (day, "brand", brand or "")]
+        for key in keys:
+            entry = totals[key]
+            entry[0] += revenue
+            entry[1] += quantity or 0
+            entry[2].add(order_id)
+    return totals
+
+
+def fold_batch(db: Session, batch_orders: int, settle_seconds: int) -> int:
+    """
+    Fold the next batch of settled orders into ``sales_rollups``; returns how
+    many order ids the watermark advanced by.
+
+    The watermark moves with a compare-and-set in the same transaction as the
+    rollup rows, so two processes running this concurrently can't both count
+    a batch: the loser's UPDATE matches nothing and it rolls back. Orders are
+    taken only once ``settle_seconds`` old, so one whose id was allocated
+    earlier but committed later than its neighbours is not skipped.
+    """
+    after_id = _watermark(db)
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=settle_seconds)
+    settled = None
+    pending = db.query(Order.id, Order.created_at)\
+        .filter(Order.id > after_id)\
+        .order_by(Order.id)\
+        .limit(batch_orders)
+    for order_id, created_at in pending:
+        if created_at and created_at > cutoff:
+            break
+        settled = order_id
+    if settled is None:
+        db.rollback()
+        return 0
+
+    claimed = db.execute(
+        update(RollupWatermark)
+        .where(RollupWatermark.name == WATERMARK, RollupWatermark.last_order_id == after_id)
+        .values(last_order_id=settled, updated_at=datetime.datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return 0
+
+    totals = aggregate(db, after_id, settled)
+    upsert_increment(db, SalesRollup, ("day", "dimension", "key"), ("revenue", "units", "orders"), [
+        {"day": day, "dimension": dimension, "key": key, "revenue": revenue, "units": units, "orders": len(orders)}
+        for (day, dimension, key), (revenue, units, orders) in totals.items()
+    ])
+    db.commit()
+    return settled - after_id
+
+
+def catch_up() -> int:
+    """Fold batches until no settled orders are left; returns how many order ids were folded over"""
+    advanced = 0
+    db = SessionLocal()
+    try:
+        while True:
+            step = fold_batch(db, settings.rollup_batch_orders, settings.rollup_settle_seconds)
+            if not step:
+                return advanced
+            advanced += step
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class SalesRollupWorker:
+    """Background thread that folds new orders into the rollups every ``interval`` seconds"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                advanced = catch_up()
+                if advanced:
+                    logger.info("Sales rollups advanced over %d orders", advanced)
+            except Exception:
+                logger.exception("Sales rollup run failed; will retry")
+            self._stopping.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="sales-rollup", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+rollup_worker = SalesRollupWorker(settings.rollup_interval)
@@ -0,0 +1,139 @@
+import datetime
+import logging
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from core.config.settings import settings
+from core.models.models import CourierPartners
+from core.services.pincodes import pincode_index
+
+logger = logging.getLogger(__name__)
+
+COURIERS = [courier.value for courier in CourierPartners]
+ZONES = ["local", "regional", "metro", "national", "special"]
+LOCAL, REGIONAL, METRO, NATIONAL, SPECIAL = range(len(ZONES))
+UNSERVICEABLE = -1
+
+# Rate card, one row per zone and one column per courier (COURIERS order:
+# DTDC, BlueDart, DHL, FedEx, IndiaPost). Cost in INR for the first unit and
+# for each unit after it; NaN marks a lane the courier doesn't serve.
+FIRST_UNIT_COST = np.array([
+    [40, 60, 90, 85, 45],
+    [50, 75, 110, 100, 55],
+    [60, 85, 120, 110, 50],
+    [75, 100, 150, 135, 55],
+    [95, 140, np.nan, 170, 65],
+], dtype=np.float64)
+EXTRA_UNIT_COST = np.array([
+    [10, 15, 25, 20, 10],
+    [12, 18, 30, 25, 12],
+    [14, 20, 32, 28, 12],
+    [18, 25, 40, 35, 14],
+    [25, 35, np.nan, 45, 18],
+], dtype=np.float64)
+TRANSIT_DAYS = np.array([
+    [1, 1, 1, 1, 2],
+    [2, 2, 2, 2, 4],
+    [3, 2, 2, 2, 5],
+    [4, 3, 3, 3, 7],
+    [7, 5, np.nan, 5, 10],
+], dtype=np.float64)
+
+# Three-digit PIN prefixes (sorting districts)
+METRO_PREFIXES = [110, 400, 411, 380, 500, 560, 600, 700]
+# Jammu & Kashmir and Ladakh, the North East, Sikkim, Andaman & Nicobar
+SPECIAL_PREFIXES = list(range(180, 195)) + list(range(780, 800)) + [737, 744]
+
+
+def zone_table(origin_pincode: int) -> np.ndarray:
+    """Zone of every three-digit PIN prefix as seen from the warehouse at ``origin_pincode``"""
+    origin = origin_pincode // 1000
+    prefixes = np.arange(1000)
+    zones = np.full(1000, NATIONAL, dtype=np.int8)
+    if origin in METRO_PREFIXES:
+        zones[np.isin(prefixes, METRO_PREFIXES)] = METRO
+    zones[np.isin(prefixes, SPECIAL_PREFIXES)] = SPECIAL
+    zones[prefixes // 10 == origin // 10] = REGIONAL  # same postal circle
+    zones[origin] = LOCAL
+    zones[:100] = UNSERVICEABLE  # no PIN starts with 0
+    return zones
+
+
+_zones = zone_table(settings.shipping_origin_pincode)
+
+
+def quote_matrix(pincodes: Sequence[int], units) -> dict:
+    """
+    Cost and transit days of every courier for every destination, in one pass.
+
+    ``units`` is one cart size for all destinations or one per destination.
+    Returns arrays of shape (destinations, couriers) plus the zone per
+    destination; unserviceable cells are NaN. Every step is an array
+    operation, so a thousand destinations cost about what one does.
+    """
+    pins = np.asarray(pincodes, dtype=np.int64)
+    units = np.broadcast_to(np.maximum(np.asarray(units, dtype=np.int64), 1), pins.shape)
+
+    known = pincode_index.known(pins)
+    zones = np.where(known, _zones[np.clip(pins // 1000, 0, 999)], UNSERVICEABLE)
+    rows = np.maximum(zones, 0)
+    cost = FIRST_UNIT_COST[rows] + EXTRA_UNIT_COST[rows] * (units - 1)[:, None]
+    days = TRANSIT_DAYS[rows].copy()
+    cost[zones == UNSERVICEABLE] = np.nan
+    days[zones == UNSERVICEABLE] = np.nan
+    return {"zones": zones, "cost": cost, "days": days}
+
+
+def best_courier(cost: np.ndarray, days: np.ndarray, preference: Optional[str] = None) -> np.ndarray:
+    """Column of the preferred courier per row (cheapest, or fastest), -1 where none serves it"""
+    preference = preference or settings.shipping_courier_preference
+    primary, secondary = (days, cost) if preference == "fastest" else (cost, days)
+    # lexsort orders by its last key first; NaN (unserved) sorts last
+    order = np.lexsort((secondary, primary), axis=-1)[..., 0]
+    served = ~np.isnan(np.take_along_axis(cost, order[..., None], axis=-1)[..., 0])
+    return np.where(served, order, -1)
+
+
+def _option(cost: float, days: float, courier: int, today: datetime.date) -> dict:
+    return {
+        "courier": COURIERS[courier],
+        "cost": Decimal(str(cost)).quantize(Decimal("0.01")),
+        "transit_days": int(days),
+        "delivery_estimate": today + datetime.timedelta(days=int(days)),
+    }
+
+
+def quote(pincodes: Sequence[int], units, preference: Optional[str] = None) -> List[dict]:
+    """Per destination: every serving courier, cheapest first, and the recommended one"""
+    matrix = quote_matrix(pincodes, units)
+    cost, days = matrix["cost"], matrix["days"]
+    best = best_courier(cost, days, preference)
+    ranked = np.lexsort((days, cost), axis=-1)
+    today = datetime.datetime.utcnow().date()
+
+    quotes = []
+    for i, pincode in enumerate(pincodes):
+        options = [_option(cost[i, c], days[i, c], c, today) for c in ranked[i] if not np.isnan(cost[i, c])]
+        quotes.append({
+            "zip_code": pincode,
+            "zone": ZONES[matrix["zones"][i]] if matrix["zones"][i] != UNSERVICEABLE else None,
+            "serviceable": bool(options),
+            "recommended": _option(cost[i, best[i]], days[i, best[i]], best[i], today) if best[i] >= 0 else None,
+            "options": options,
+        })
+    return quotes
+
+
+def assign_courier(pincode: Optional[int], units: int):
+    """(courier, transit days) for a placed order, by ``settings.shipping_courier_preference``"""
+    matrix = quote_matrix([pincode or 0], units)
+    cost, days = matrix["cost"], matrix["days"]
+    if np.isnan(cost).all():
+        # The address was accepted at checkout, so it still ships, at national rates
+        logger.warning("No courier serves PIN %s; assigning on the national lane", pincode)
+        cost = (FIRST_UNIT_COST[NATIONAL] + EXTRA_UNIT_COST[NATIONAL] * (max(units, 1) - 1))[None, :]
+        days = TRANSIT_DAYS[NATIONAL][None, :]
+    courier = int(best_courier(cost, days)[0])
+    return COURIERS[courier], int(days[0, courier])
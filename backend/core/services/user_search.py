@@ -0,0 +1,44 @@
+from typing import List, Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from core.database.database import engine
+from core.models.models import User, UserRole
+
+
+def _prefix_range(column, prefix: str):
+    """
+    ``lower(column)`` starts with ``prefix``, as a range the ``ix_users_*_lower``
+    index can seek to (LIKE 'x%' can't use an expression index on SQLite).
+    """
+    prefix = prefix.lower()
+    expression = func.lower(column)
+    if engine.dialect.name == "postgresql":
+        # Must match the index expression, which is compared bytewise
+        expression = expression.collate("C")
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(expression >= prefix, expression < upper)
+
+
+def search_users(db: Session, after: Optional[int], limit: int, email: Optional[str] = None,
+                 name: Optional[str] = None, role: Optional[UserRole] = None) -> dict:
+    """One page of users ordered by id, after the ``after`` cursor; ``next_cursor`` is None on the last page"""
+    filters = []
+    if email:
+        filters.append(_prefix_range(User.email, email))
+    if name:
+        filters.append(_prefix_range(User.name, name))
+    if role:
+        filters.append(User.role == role)
+    if after:
+        filters.append(User.id > after)
+
+    # Only what UserOut needs; password hashes stay in the database
+    users: List = db.query(User.id, User.name, User.email, User.phone, User.role)\
+        .filter(*filters)\
+        .order_by(User.id)\
+        .limit(limit + 1)\
+        .all()
+    next_cursor = users[limit - 1].id if len(users) > limit else None
+    return {"items": users[:limit], "next_cursor": next_cursor}
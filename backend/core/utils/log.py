@@ -0,0 +1,135 @@
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+from typing import Optional
+
+from core.config.settings import settings
+
+# Correlates every log line emitted while serving a request; set by RequestIDMiddleware
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "sample_rate"}
+
+
+def sampled(rate: float) -> dict:
+    """``extra=`` for high-volume events: keep roughly ``rate`` of them, e.g. ``logger.debug(..., extra=sampled(0.01))``"""
+    return {"sample_rate": rate}
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attaches the request id and applies sampling. Installed on the queue handler so
+    it runs in the emitting thread, where the request's context variables are visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is not None and random.random() >= rate:
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RedactTokensFilter(logging.Filter):
+    """Masks ``access_token=`` query values (the order updates stream takes one) in access log lines"""
+
+    PATTERN = re.compile(r"(access_token=)[^&\s]+")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                self.PATTERN.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg for arg in record.args
+            )
+        return True
+
+
+_redact_tokens = RedactTokensFilter()
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the queue is full the record is counted and dropped"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """
+    Route all logging through a bounded in-memory queue drained by a background
+    thread, so request handlers never wait on stdout. Levels come from settings:
+    ``log_level`` for the root logger and ``log_levels`` per logger name.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    if settings.log_format == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.log_level.upper())
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+    # Filters on a logger only see records logged to it directly, as uvicorn does for access lines
+    logging.getLogger("uvicorn.access").addFilter(_redact_tokens)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued on interpreter exit
+    atexit.register(_listener.stop)
+
+
+def restart_logging_after_fork():
+    """
+    Give a forked child its own queue and listener thread. Threads do not survive
+    fork, so a child that inherited the parent's handler would queue records nobody drains.
+    """
+    global _listener
+    _listener = None
+    setup_logging()
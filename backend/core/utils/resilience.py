@@ -0,0 +1,313 @@
+import asyncio
+import bisect
+import inspect
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Type
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the dependency while its circuit breaker is open"""
+
+
+class BulkheadFullError(Exception):
+    """Raised when a dependency already has its maximum number of calls in flight"""
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter and per-exception attempt limits.
+
+    ``retry_on`` maps exception types to the total number of attempts allowed
+    when that exception is raised; the most specific matching type wins.
+    Exceptions that match nothing are raised immediately.
+    """
+
+    def __init__(
+        self,
+        retry_on: Optional[Dict[Type[BaseException], int]] = None,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+    ):
+        self.retry_on = retry_on if retry_on is not None else {Exception: 3}
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def max_attempts_for(self, exc: BaseException) -> int:
+        for klass in type(exc).__mro__:
+            if klass in self.retry_on:
+                return self.retry_on[klass]
+        return 1
+
+    def should_retry(self, exc: BaseException, attempt: int) -> bool:
+        """``attempt`` is 1-based: the number of calls made so far"""
+        return attempt < self.max_attempts_for(exc)
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many callers instead of syncing them up
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+NO_RETRY = RetryPolicy(retry_on={})
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    fail fast for ``recovery_timeout`` seconds. Then a single trial call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def admit(self) -> Optional[bool]:
+        """None if the call is refused, otherwise whether it is the half-open trial"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return None
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def abandon_trial(self):
+        """The trial ended without an outcome (cancelled, say); let the next call try instead"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class Bulkhead:
+    """Caps concurrent calls to a dependency so a slow one cannot take every worker thread"""
+
+    def __init__(self, max_concurrent: int = 10, max_wait: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.max_wait):
+            raise BulkheadFullError()
+        with self._lock:
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        # Fast path without a thread hop; only wait in a thread when the bulkhead is full
+        if not self._slots.acquire(blocking=False):
+            if not await asyncio.to_thread(self._slots.acquire, True, self.max_wait):
+                raise BulkheadFullError()
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class DependencyMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.rejected = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.latency_sum += seconds
+            self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+                "rejected": self.rejected,
+                "latency_avg_ms": round(self.latency_sum / self.calls * 1000, 2) if self.calls else None,
+                "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.latency_buckets)),
+            }
+
+
+class Dependency:
+    """
+    A named external dependency: retry policy, circuit breaker, bulkhead and metrics in one place.
+
+    ``ignore`` lists exceptions that mean the caller did something wrong (a 4xx,
+    say) rather than that the dependency is unhealthy; they are neither retried
+    nor counted against the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retry: RetryPolicy = NO_RETRY,
+        breaker: Optional[CircuitBreaker] = None,
+        bulkhead: Optional[Bulkhead] = None,
+        ignore: Tuple[Type[BaseException], ...] = (),
+    ):
+        self.name = name
+        self.retry = retry
+        self.breaker = breaker or CircuitBreaker()
+        self.bulkhead = bulkhead or Bulkhead()
+        self.ignore = ignore
+        self.metrics = DependencyMetrics()
+        dependencies[name] = self
+
+    def _before_attempt(self) -> bool:
+        """Ask the breaker; returns whether this attempt is its half-open trial"""
+        trial = self.breaker.admit()
+        if trial is None:
+            self.metrics.incr("short_circuited")
+            raise CircuitOpenError(f"{self.name} is unavailable")
+        return trial
+
+    def _after_failure(self, exc: BaseException, started: float, attempt: int, policy: RetryPolicy) -> bool:
+        """Record a failed attempt and return whether to retry it"""
+        if isinstance(exc, self.ignore):
+            self.breaker.record_success()
+            self.metrics.observe(time.perf_counter() - started, ok=True)
+            return False
+        self.breaker.record_failure()
+        self.metrics.observe(time.perf_counter() - started, ok=False)
+        if policy.should_retry(exc, attempt):
+            self.metrics.incr("retries")
+            return True
+        return False
+
+    def call(self, fn: Callable, *args, retry: Optional[RetryPolicy] = None, **kwargs):
+        """Call a blocking function through the breaker, bulkhead and retry policy"""
+        policy = retry or self.retry
+        attempt = 0
+        while True:
+            attempt += 1
+            # Bulkhead first: a rejected call must not have taken the breaker's half-open trial
+            try:
+                self.bulkhead.acquire()
+            except BulkheadFullError:
+                self.metrics.incr("rejected")
+                raise
+            trial = recorded = False
+            try:
+                trial = self._before_attempt()
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as exc:
+                    recorded = True
+                    if not self._after_failure(exc, started, attempt, policy):
+                        raise
+                else:
+                    recorded = True
+                    self.breaker.record_success()
+                    self.metrics.observe(time.perf_counter() - started, ok=True)
+                    return result
+            finally:
+                if trial and not recorded:
+                    self.breaker.abandon_trial()
+                self.bulkhead.release()
+            time.sleep(policy.backoff(attempt))
+
+    async def acall(self, fn: Callable, *args, retry: Optional[RetryPolicy] = None, **kwargs):
+        """
+        Async counterpart of ``call``. Coroutine functions are awaited, blocking
+        functions run in a worker thread, and backoff never blocks the event loop.
+        """
+        policy = retry or self.retry
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self.bulkhead.acquire_async()
+            except BulkheadFullError:
+                self.metrics.incr("rejected")
+                raise
+            trial = recorded = False
+            try:
+                trial = self._before_attempt()
+                started = time.perf_counter()
+                try:
+                    if inspect.iscoroutinefunction(fn):
+                        result = await fn(*args, **kwargs)
+                    else:
+                        result = await asyncio.to_thread(fn, *args, **kwargs)
+                except Exception as exc:
+                    recorded = True
+                    if not self._after_failure(exc, started, attempt, policy):
+                        raise
+                else:
+                    recorded = True
+                    self.breaker.record_success()
+                    self.metrics.observe(time.perf_counter() - started, ok=True)
+                    return result
+            finally:
+                # CancelledError skips both branches above; without this the circuit stays half-open for good
+                if trial and not recorded:
+                    self.breaker.abandon_trial()
+                self.bulkhead.release()
+            await asyncio.sleep(policy.backoff(attempt))
+
+    def snapshot(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "in_flight": self.bulkhead.in_flight,
+            **self.metrics.snapshot(),
+        }
+
+
+# Every Dependency registers itself here so metrics can be reported in one place
+dependencies: Dict[str, Dependency] = {}
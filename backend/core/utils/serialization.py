@@ -0,0 +1,25 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    # Building a TypeAdapter compiles a validator/serializer; do it once per schema
+    return TypeAdapter(schema)
+
+
+def fast_json_response(schema: Any, data: Any, status_code: int = 200) -> Response:
+    """
+    Validate ``data`` (ORM rows welcome) against ``schema`` and serialize it to
+    JSON bytes entirely inside pydantic-core.
+
+    This skips FastAPI's response_model round trip (validate, dump to Python
+    objects, jsonable_encoder, then encode). Keep ``response_model`` on the route
+    for the OpenAPI schema; FastAPI passes a returned Response through untouched.
+    """
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -1,18 +1,31 @@
 import asyncio
+import inspect
 from passlib.context import CryptContext
 
+from core.utils.resilience import RetryPolicy
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 MAX_RETRIES = 3
 
-async def retry(fn, *args, **kwargs):
-    for attempt in range(MAX_RETRIES):
+async def retry(fn, *args, policy: RetryPolicy = None, **kwargs):
+    """
+    Call ``fn`` with exponential backoff and jitter. Coroutine functions are awaited
+    and blocking functions run in a thread. For external services prefer a
+    ``core.utils.resilience.Dependency``, which adds a circuit breaker and metrics.
+    """
+    policy = policy or RetryPolicy(retry_on={Exception: MAX_RETRIES})
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            return fn(*args, **kwargs)
+            if inspect.iscoroutinefunction(fn):
+                return await fn(*args, **kwargs)
+            return await asyncio.to_thread(fn, *args, **kwargs)
         except Exception as e:
-            if attempt == MAX_RETRIES - 1:
-                raise e
-            await asyncio.sleep(1)
+            if not policy.should_retry(e, attempt):
+                raise
+        await asyncio.sleep(policy.backoff(attempt))
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -1,6 +1,24 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import uvicorn
-from core.routers import auth, product_category, product, product_variant, address, payment, order
+from core.config.settings import settings
+from core.middleware.http_cache import HTTPCacheMiddleware
+from core.middleware.load_control import LoadControlMiddleware
+from core.middleware.metrics import MetricsMiddleware
+from core.middleware.profiling import ProfilingMiddleware
+from core.middleware.request_id import RequestIDMiddleware
+from core.middleware.sql_timing import SQLTimingMiddleware
+from core.routers import auth, product_category, product, product_variant, address, payment, order, cart, review, analytics, export, system, monitoring, pincode, shipping
+from core.services.cart import cart_service
+from core.services.invoice_renderer import invoice_renderer
+from core.services.load_shedding import load_monitor
+from core.services.order_stream import order_stream
+from core.services.outbox import outbox_worker
+from core.services.product_views import view_tracker
+from core.services.sales_rollup import rollup_worker
+from core.utils.log import setup_logging
 
 from starlette.middleware.cors import CORSMiddleware
 
@@ -27,8 +45,35 @@ Key features include:
 
 """
 
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Post-order side effects are drained in-process unless a separate worker.py runs them
+    if settings.outbox_worker_enabled:
+        outbox_worker.start()
+    view_tracker.start()
+    cart_service.start()
+    if settings.rollup_worker_enabled:
+        rollup_worker.start()
+    order_stream.start()
+    lag_probe = asyncio.create_task(load_monitor.probe_loop_lag())
+    yield
+    lag_probe.cancel()
+    # Open update streams were already ended as the server began stopping (server.py); this stops the feed reader
+    order_stream.stop()
+    outbox_worker.stop()
+    view_tracker.stop()
+    cart_service.stop()
+    rollup_worker.stop()
+    invoice_renderer.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
+    # orjson encodes the already JSON-ready content FastAPI produces several times faster than json
+    default_response_class=ORJSONResponse,
     description=description,
     title="E-commerce API",
     version="1.0.0",
@@ -56,16 +101,43 @@ app.add_middleware(
     allow_headers=["*"],                # Allow all headers (including Authorization)
 )
 
+app.add_middleware(ProfilingMiddleware)
+# Outside CORS so ETags and Vary are computed over the final response
+app.add_middleware(HTTPCacheMiddleware)
+app.add_middleware(SQLTimingMiddleware)
+# Refuses over-limit and shed requests before they take a thread or a connection
+app.add_middleware(LoadControlMiddleware, router=app.router)
+app.add_middleware(RequestIDMiddleware)
+
+# Outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Probes and scrapes hit these directly, outside the /api prefix
+app.include_router(monitoring.router)
 app.include_router(auth.router, prefix="/api")
 app.include_router(product_category.router, prefix="/api")
 app.include_router(product.router, prefix="/api")
 app.include_router(product_variant.router, prefix="/api")
+app.include_router(review.router, prefix="/api")
 app.include_router(address.router, prefix="/api")
+app.include_router(pincode.router, prefix="/api")
+app.include_router(shipping.router, prefix="/api")
 app.include_router(payment.router, prefix="/api")
 app.include_router(order.router, prefix="/api")
+app.include_router(cart.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(system.router, prefix="/api")
 
 
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if settings.server_mode == "production":
+        from server import serve
+        serve(app)
+    else:
+        from core.database.migrate import migrate
+        migrate()
+        # log_config=None: uvicorn's loggers propagate to the queued root handler instead of writing to stdout
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_config=None)
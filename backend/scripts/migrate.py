@@ -0,0 +1,28 @@
+"""
+Bring an existing database's indexes up to date with the models, folding
+together the duplicate rows a new unique index would reject.
+
+    cd backend
+    python -m scripts.migrate
+
+``python main.py`` runs this before starting the server; run it by hand
+when the app is started some other way (``uvicorn main:app``, worker.py).
+"""
+import json
+import sys
+
+from core.database.migrate import MigrationError, migrate
+from core.utils.log import setup_logging
+
+
+def main():
+    setup_logging()
+    try:
+        created = migrate()
+    except MigrationError:
+        sys.exit(1)
+    print(json.dumps({"indexes_created": created}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Build the offline pincode index behind ``GET /api/pincodes/{pincode}`` and
+address normalization.
+
+Input is one or more post office CSVs in India Post's "All India Pincode
+Directory" layout (data.gov.in publishes it; any file with pincode,
+districtname and statename columns works). Download it once; nothing here
+touches the network.
+
+    cd backend
+    python -m scripts.pincodes all_india_pincode.csv
+
+The index is written atomically to settings.pincode_index_dir; restart the
+API (or let the next worker start) to pick up a rebuilt one.
+"""
+import argparse
+import json
+
+from core.config.settings import settings
+from core.services.pincodes import build_index
+from core.utils.log import setup_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline pincode index from post office CSVs")
+    parser.add_argument("csv", nargs="+", help="post office directory CSV file(s)")
+    parser.add_argument("--output", help="index directory (default: settings.pincode_index_dir)")
+    args = parser.parse_args()
+
+    setup_logging()
+    result = build_index(args.csv, args.output or settings.pincode_index_dir)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+"Frequently bought together" batch job.
+
+Builds the product co-occurrence matrix from order history and writes each
+product's top-k neighbours to ``product_recommendations``, which
+``GET /api/products/{id}`` reads by primary key.
+
+    cd backend
+
+    # fold in orders placed since the last run (full build on the first run)
+    python -m scripts.recommendations
+
+    # rebuild from every order, e.g. nightly, to drop cancelled orders
+    python -m scripts.recommendations --full
+
+Run it from cron or a scheduler; it holds no locks the API waits on beyond
+the short transaction that swaps the lookup rows.
+"""
+import argparse
+import json
+
+from core.database.database import SessionLocal
+from core.services.recommendations import refresh
+from core.utils.log import setup_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild product recommendations from order history")
+    parser.add_argument("--full", action="store_true", help="ignore saved state and rebuild from every order")
+    parser.add_argument("--top-k", type=int, help="neighbours kept per product (default: settings.recommendations_top_k)")
+    parser.add_argument("--min-support", type=int, help="shared orders required (default: settings.recommendations_min_support)")
+    parser.add_argument("--state", help="matrix state file (default: settings.recommendations_state_path)")
+    args = parser.parse_args()
+
+    setup_logging()
+    db = SessionLocal()
+    try:
+        result = refresh(db, full=args.full, top=args.top_k, min_support=args.min_support, state_path=args.state)
+    finally:
+        db.close()
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Deterministic catalog, user and order generator with streaming output.
+
+Replaces the old products.json / variants.json scripts. Rows are generated one
+at a time, so memory stays flat at millions of rows, and the same --seed always
+produces the same data.
+
+    cd backend
+
+    # NDJSON, one file per table
+    python -m scripts.seed ndjson --out seed-data --seed 7 \\
+        --products 1000000 --variants 3000000 --users 200000 --orders 2000000
+
+    # straight into settings.database_url (or --database-url); tables must be empty
+    python -m scripts.seed load --seed 7 --products 1000000 --orders 2000000
+
+    # load files written earlier
+    python -m scripts.seed load --from-dir seed-data
+
+Loading uses COPY on PostgreSQL with psycopg2 and batched multi-row inserts elsewhere.
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import orjson
+
+UNSPLASH_IMAGES = [
+    "https://images.unsplash.com/photo-1620799140408-edc6dcb6d633?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8NHx8YXBwYXJlbHxlbnwwfHwwfHx8MA%3D%3D",
+    "https://images.unsplash.com/photo-1543163521-1bf539c55dd2?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MTl8fGFwcGFyZWx8ZW58MHx8MHx8fDA%3D",
+    "https://plus.unsplash.com/premium_photo-1664392147011-2a720f214e01?q=80&w=2078&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D",
+    "https://images.unsplash.com/photo-1611312449408-fcece27cdbb7?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8NjJ8fGFwcGFyZWx8ZW58MHx8MHx8fDA%3D",
+    "https://images.unsplash.com/photo-1598532163257-ae3c6b2524b6?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8Mnx8YmFnc3xlbnwwfHwwfHx8MA%3D%3D",
+    "https://images.unsplash.com/photo-1516762689617-e1cffcef479d?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MTA0fHxhcHBhcmVsfGVufDB8fDB8fHww",
+    "https://images.unsplash.com/photo-1560769629-975ec94e6a86?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8OTF8fGFwcGFyZWx8ZW58MHx8MHx8fDA%3D"
+]
+
+CATEGORY_NAMES = [
+    "T-Shirts", "Shirts", "Hoodies & Sweatshirts", "Jackets", "Jeans", "Joggers & Track Pants",
+    "Shorts", "Co-ord Sets", "Dresses", "Activewear", "Kids", "Loungewear",
+]
+
+PRODUCT_NAMES = [
+    "Sleek Essential Tee", "City Life Oversized Tee", "Structured Poplin Shirt",
+    "Soft Touch Hoodie", "AirLite Zip Jacket", "Modern Fit Polo", "Weekend Co-ord Set",
+    "Distressed Indigo Denim", "Urban Tapered Joggers", "Breezy Linen Shorts",
+    "Tailored Formal Pants", "Core Gym Tee", "Swift Motion Shorts", "Elite Lounge Set",
+    "Tiny Rebel Tee", "Doodle Days Set", "Adventure Ready Set", "Muted Tone Sweatshirt",
+    "Layered Collar Tee", "Heritage Button-Up", "Raw Seam Crewneck", "Textured Knit Top",
+    "Shadow Wash Jeans", "Box Fit Tank", "Crinkle Cotton Shirt", "Relax Mode Shorts",
+    "Crosswalk Windbreaker", "Clean Stitch Polo", "Studio Fit Track Pants",
+    "Essential Overshirt", "Noir Relax Tee", "Mono Set Hoodie", "SoftFlex Leggings",
+    "Contrast Detail Tee", "Easy Day Co-ord", "Comfy Fit Set", "Trek Shorts",
+    "Grid Pocket Jacket", "Tonal Layer Shirt", "Chic Shift Dress", "Cloud Soft Joggers",
+    "Neon Edge Tee", "Everyday Hoodie", "Mini Motion Tee", "Graffiti Splash Set",
+    "Playground Pro Set", "Metro Chic Top", "Luxe Stretch Shirt", "Slouchy Fit Tee"
+]
+
+DESCRIPTIONS = [
+    "Durable and stylish", "Soft, breathable fabric", "Designed for all-day comfort",
+    "Modern cut, classic feel", "Premium stitching and fit", "Minimalist design",
+    "Great for casual or sport", "Effortless everyday wear", "Street-ready vibes",
+    "Timeless look with comfort"
+]
+
+BRANDS = ["Nike", "Adidas", "Under Armour", "Puma", "Uniqlo", "Champion", "Levi's", "H&M", "Zara"]
+SIZES = ["XS", "S", "M", "L", "XL"]
+COLORS = ["Black", "White", "Navy", "Olive", "Grey", "Beige", "Maroon"]
+CITIES = [
+    ("Mumbai", "Maharashtra", 400001), ("Delhi", "Delhi", 110001), ("Bengaluru", "Karnataka", 560001),
+    ("Chennai", "Tamil Nadu", 600001), ("Kolkata", "West Bengal", 700001), ("Hyderabad", "Telangana", 500001),
+    ("Pune", "Maharashtra", 411001), ("Jaipur", "Rajasthan", 302001), ("Lucknow", "Uttar Pradesh", 226001),
+]
+COURIERS = ["DTDC", "BlueDart", "DHL", "FedEx", "IndiaPost"]
+SEED_PASSWORD = "seed-password"
+BCRYPT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+SHIPPING_CHARGE = 20.0
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(seed: int, stream: int, n: int) -> float:
+    """
+    Deterministic uniform float in [0, 1) for (seed, stream, n), via splitmix64.
+
+    Used for values another table needs (a variant's price on an order line),
+    so tables can be generated independently without holding each other in memory.
+    """
+    x = (seed * 0x9E3779B97F4A7C15 + stream * 0xBF58476D1CE4E5B9 + n) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    x ^= x >> 31
+    return (x >> 11) / float(1 << 53)
+
+
+# Foreign key order
+TABLES = [
+    "product_categories", "products", "product_variants", "users", "user_addresses",
+    "orders", "order_items", "payments", "shipments",
+]
+
+Stream = Iterator[Tuple[str, dict]]
+
+
+class Generator:
+    """
+    Row generators for the seeded tables. Each yields (table, row) pairs, parents
+    before children, and has its own RNG stream so changing one count does not
+    reshuffle the other tables.
+    """
+
+    def __init__(self, args):
+        self.seed = args.seed
+        self.categories = args.categories
+        self.products = args.products
+        self.variants = args.variants if args.variants is not None else args.products * 3
+        self.users = args.users
+        self.orders = args.orders
+        # Orders are spread over the year before this date; fixed so output is reproducible
+        self.until = datetime.datetime(2025, 1, 1)
+
+    def _rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    def product_price(self, product_id: int) -> float:
+        return round(399.0 + _mix(self.seed, 1, product_id) * 7600.0, 2)
+
+    def variant_product(self, variant_id: int) -> int:
+        # Round-robin, so every product gets variants // products (+1) of them
+        return (variant_id - 1) % self.products + 1
+
+    def variant_price(self, variant_id: int) -> float:
+        base = self.product_price(self.variant_product(variant_id))
+        return round(max(99.0, base + (_mix(self.seed, 2, variant_id) - 0.5) * 400.0), 2)
+
+    def catalog(self) -> Stream:
+        for i in range(1, self.categories + 1):
+            base = CATEGORY_NAMES[(i - 1) % len(CATEGORY_NAMES)]
+            name = base if i <= len(CATEGORY_NAMES) else f"{base} {i}"
+            yield "product_categories", {"id": i, "name": name, "parent_id": None}
+
+        rng = self._rng("products")
+        for i in range(1, self.products + 1):
+            yield "products", {
+                "id": i,
+                "name": rng.choice(PRODUCT_NAMES),
+                "description": rng.choice(DESCRIPTIONS),
+                "brand": rng.choice(BRANDS),
+                "price": self.product_price(i),
+                "category_id": rng.randint(1, self.categories),
+                "image_url": rng.choice(UNSPLASH_IMAGES),
+            }
+
+        rng = self._rng("product_variants")
+        for i in range(1, self.variants + 1):
+            yield "product_variants", {
+                "id": i,
+                "product_id": self.variant_product(i),
+                "sku": f"SK-{i:09d}",
+                "size": rng.choice(SIZES),
+                "color": rng.choice(COLORS),
+                "stock": rng.randint(0, 50),
+                "price": self.variant_price(i),
+            }
+
+    def people(self) -> Stream:
+        import bcrypt
+
+        rng = self._rng("users")
+        # bcrypt is deliberately slow, so every seeded user shares one hash. The salt
+        # comes from the seed to keep output reproducible; the last character of a
+        # bcrypt salt only carries two bits, hence its shorter alphabet.
+        salt = "".join(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + rng.choice(".Oeu")
+        password = bcrypt.hashpw(SEED_PASSWORD.encode(), f"$2b$12${salt}".encode()).decode()
+        joined_from = self.until - datetime.timedelta(days=730)
+        for i in range(1, self.users + 1):
+            created = joined_from + datetime.timedelta(seconds=rng.randint(0, 730 * 86400))
+            yield "users", {
+                "id": i,
+                "name": f"Seed User {i}",
+                "email": f"user{i}@seed.shopkart.test",
+                "password": password,
+                "phone": f"9{rng.randint(100000000, 999999999)}",
+                "role": "admin" if i == 1 else "user",
+                "created_at": created,
+                "updated_at": created,
+            }
+            # One address per user, with the same id, so orders can point at it without a lookup
+            city, state, zip_code = rng.choice(CITIES)
+            yield "user_addresses", {
+                "id": i, "user_id": i, "address_line1": f"{rng.randint(1, 999)} Seed Street",
+                "city": city, "state": state, "zip_code": zip_code + rng.randint(0, 98), "alias": "Home",
+            }
+
+    def sales(self) -> Stream:
+        rng = self._rng("orders")
+        span = 365 * 86400
+        item_id = 0
+        for oid in range(1, self.orders + 1):
+            uid = rng.randint(1, self.users)
+            created = self.until - datetime.timedelta(seconds=rng.randint(0, span))
+            items = []
+            for _ in range(rng.randint(1, 4)):
+                # Squaring skews demand towards low ids: a few best sellers and a long tail
+                vid = int(self.variants * rng.random() ** 2) + 1
+                item_id += 1
+                items.append({
+                    "id": item_id, "order_id": oid, "variant_id": vid,
+                    "quantity": rng.randint(1, 3), "unit_price": self.variant_price(vid),
+                })
+            total = round(sum(it["unit_price"] * it["quantity"] for it in items) + SHIPPING_CHARGE, 2)
+            if rng.random() < 0.03:
+                status, payment_status = "cancelled", "failed"
+            else:
+                old = (self.until - created).days > 10
+                status = "delivered" if old else rng.choice(["pending", "processing", "shipped"])
+                payment_status = "paid"
+
+            yield "orders", {
+                "id": oid, "user_id": uid, "shipping_address_id": uid, "total_amount": total,
+                "order_status": status, "payment_status": payment_status, "created_at": created,
+            }
+            for item in items:
+                yield "order_items", item
+            yield "payments", {
+                "id": oid, "order_id": oid, "payment_method": rng.choice(["upi", "card", "cod"]),
+                "status": "captured" if payment_status == "paid" else "failed", "paid_at": created,
+                "description": "", "amount": total, "currency": "INR", "transaction_id": oid,
+            }
+            yield "shipments", {
+                "id": oid, "order_id": oid, "courier_name": rng.choice(COURIERS),
+                "tracking_number": str(1000000000 + oid), "shipped_at": created,
+                "delivery_estimate": created + datetime.timedelta(days=rng.randint(3, 7)),
+                "status": "delivered" if status == "delivered" else "pending",
+            }
+
+    def streams(self) -> List[Callable[[], Stream]]:
+        return [self.catalog, self.people, self.sales]
+
+
+def _report(counts: Counter, started: float):
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f"{table:20s} {count:>12,} rows", file=sys.stderr)
+    total = sum(counts.values())
+    print(f"{'':20s} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)",
+          file=sys.stderr)
+
+
+def write_ndjson(generator: Generator, out_dir: str):
+    os.makedirs(out_dir, exist_ok=True)
+    counts = Counter()
+    started = time.perf_counter()
+    files = {}
+    try:
+        for stream in generator.streams():
+            for table, row in stream():
+                f = files.get(table)
+                if f is None:
+                    f = files[table] = open(os.path.join(out_dir, f"{table}.ndjson"), "wb", buffering=1 << 20)
+                f.write(orjson.dumps(row))
+                f.write(b"\n")
+                counts[table] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    _report(counts, started)
+
+
+def read_ndjson(from_dir: str, tables) -> Stream:
+    from sqlalchemy import DateTime
+
+    for name in TABLES:
+        path = os.path.join(from_dir, f"{name}.ndjson")
+        if not os.path.exists(path):
+            continue
+        # orjson writes datetimes as ISO strings; SQLite's DateTime type wants datetime objects back
+        datetime_columns = [c.name for c in tables[name].columns if isinstance(c.type, DateTime)]
+        with open(path, "rb") as f:
+            for line in f:
+                row = orjson.loads(line)
+                for column in datetime_columns:
+                    if row.get(column) is not None:
+                        row[column] = datetime.datetime.fromisoformat(row[column])
+                yield name, row
+
+
+class BulkWriter:
+    """
+    Buffers rows per table and writes them in batches: COPY ... FROM STDIN on
+    PostgreSQL with psycopg2, multi-row INSERTs (executemany) elsewhere. A flush
+    writes every buffer in first-seen order, which is parent-before-child, so
+    foreign keys hold at every batch boundary.
+    """
+
+    def __init__(self, engine, tables, batch_size: int):
+        self.engine = engine
+        self.tables = tables
+        self.batch_size = batch_size
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+        self.buffers: Dict[str, List[dict]] = {}
+        self.counts = Counter()
+        self._raw = None
+        self._conn = None
+
+    def __enter__(self):
+        if self.use_copy:
+            self._raw = self.engine.raw_connection()
+        else:
+            self._conn = self.engine.connect()
+            self._conn.begin()
+        return self
+
+    def add(self, table: str, row: dict):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for name, rows in self.buffers.items():
+            if not rows:
+                continue
+            if self.use_copy:
+                self._copy(self.tables[name], rows)
+            else:
+                self._conn.execute(self.tables[name].insert(), rows)
+            self.counts[name] += len(rows)
+            rows.clear()
+
+    def _copy(self, table, rows: List[dict]):
+        columns = [c.name for c in table.columns]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if row.get(c) is None else row[c] for c in columns])
+        buffer.seek(0)
+        self._raw.cursor().copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.use_copy:
+            try:
+                if exc_type is None:
+                    self.flush()
+                    cursor = self._raw.cursor()
+                    # Explicit ids leave the serial sequences behind
+                    for name in self.counts:
+                        cursor.execute(
+                            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE(MAX(id), 1)) FROM {name}"
+                        )
+                    self._raw.commit()
+                else:
+                    self._raw.rollback()
+            finally:
+                self._raw.close()
+        else:
+            try:
+                if exc_type is None:
+                    self.flush()
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+            finally:
+                self._conn.close()
+
+
+def load(generator: Generator, from_dir: str, batch_size: int):
+    from sqlalchemy import func, select
+
+    from core.database.database import Base, engine
+    import core.models.models  # noqa: F401 (registers the tables and creates them)
+
+    tables = Base.metadata.tables
+    with engine.connect() as conn:
+        occupied = [name for name in TABLES if conn.execute(select(func.count()).select_from(tables[name])).scalar()]
+    if occupied:
+        sys.exit(f"Refusing to seed: tables already have rows: {', '.join(occupied)}")
+
+    started = time.perf_counter()
+    streams = [lambda: read_ndjson(from_dir, tables)] if from_dir else generator.streams()
+    with BulkWriter(engine, tables, batch_size) as writer:
+        for stream in streams:
+            for table, row in stream():
+                writer.add(table, row)
+            writer.flush()
+    _report(writer.counts, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShopKart seed data generator and bulk loader")
+    parser.add_argument("command", choices=["ndjson", "load"])
+    parser.add_argument("--seed", type=int, default=42, help="same seed, same data")
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--variants", type=int, help="total variants (default: 3 per product)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--out", default="seed-data", help="ndjson: output directory")
+    parser.add_argument("--from-dir", help="load: read NDJSON written by the ndjson command instead of generating")
+    parser.add_argument("--database-url", help="load: target database (default: settings.database_url)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        # Settings are read at import time, so this has to run before importing the app
+        os.environ["DATABASE_URL"] = args.database_url
+
+    generator = Generator(args)
+    if args.command == "ndjson":
+        write_ndjson(generator, args.out)
+    else:
+        load(generator, args.from_dir, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
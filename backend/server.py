@@ -0,0 +1,122 @@
+import math
+import multiprocessing
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from uvicorn import Server
+from uvicorn_worker import UvicornWorker
+
+from core.config.settings import settings
+
+# Time a worker gets after draining connections for the lifespan shutdown (final flushes, thread joins)
+LIFESPAN_SHUTDOWN_SECONDS = 20
+
+
+class ShopKartServer(Server):
+    async def shutdown(self, sockets=None):
+        from core.services.order_stream import order_stream
+
+        # Runs once the worker decides to stop (SIGTERM, SIGQUIT, max_requests), before the drain.
+        # Update streams never finish by themselves, so left open they would hold the drain for
+        # the whole graceful timeout and the lifespan shutdown would never get to run.
+        order_stream.close_streams()
+        await super().shutdown(sockets)
+
+
+class ShopKartWorker(UvicornWorker):
+    # uvloop + httptools instead of "auto", so a missing extra fails loudly at boot
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_graceful_shutdown": settings.server_graceful_timeout,
+    }
+
+    async def _serve(self):
+        # UvicornWorker._serve, with our server class
+        self.config.app = self.wsgi
+        server = ShopKartServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def available_cores() -> int:
+    """CPUs this process may actually use: affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = multiprocessing.cpu_count()
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+def post_fork(server, worker):
+    from core.database.database import engine
+    from core.utils.log import restart_logging_after_fork
+
+    # Pooled connections opened by the preloaded app belong to the master; don't share sockets
+    engine.dispose(close=False)
+    restart_logging_after_fork()
+
+
+class ProductionServer(BaseApplication):
+    """
+    Gunicorn master supervising uvicorn workers.
+
+    The app is imported once in the master (``preload_app``) and forked, so workers
+    boot fast and share read-only pages. On SIGTERM the master stops accepting
+    connections and each worker finishes its in-flight requests, up to
+    ``server_graceful_timeout``, before running the lifespan shutdown; open order
+    update streams are ended first, as they never finish. Workers are
+    recycled after ``server_max_requests`` (plus jitter, so they don't restart
+    together) to bound memory growth.
+    """
+
+    def __init__(self, app):
+        self.application = app
+        super().__init__()
+
+    def load_config(self):
+        from core.services.invoice_renderer import invoice_renderer
+
+        workers = settings.server_workers or available_cores()
+        # Runs in the master before forking, so every web worker inherits the sizing
+        invoice_renderer.size_for_server(workers, available_cores())
+        options = {
+            "bind": f"{settings.server_host}:{settings.server_port}",
+            "workers": workers,
+            "worker_class": ShopKartWorker,
+            "preload_app": True,
+            "backlog": settings.server_backlog,
+            "keepalive": settings.server_keepalive,
+            "timeout": settings.server_timeout,
+            # Above uvicorn's drain timeout, so the master doesn't kill a worker mid lifespan shutdown
+            "graceful_timeout": settings.server_graceful_timeout + LIFESPAN_SHUTDOWN_SECONDS,
+            # uvicorn takes the client address from X-Forwarded-For only when the peer is one of these
+            "forwarded_allow_ips": ",".join(settings.trusted_proxies),
+            "max_requests": settings.server_max_requests,
+            "max_requests_jitter": settings.server_max_requests_jitter,
+            "post_fork": post_fork,
+        }
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def serve(app):
+    from core.database.migrate import migrate
+
+    # Once, in the master before forking, rather than in every worker
+    migrate()
+    ProductionServer(app).run()
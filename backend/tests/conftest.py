@@ -0,0 +1,133 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite database with the
+background workers off; settings are read at import time, so the
+environment is set up before anything from ``core`` is imported.
+
+    cd backend
+    python -m pytest -q
+"""
+import itertools
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORKDIR = tempfile.mkdtemp(prefix="shopkart-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ["INVOICE_DIR"] = os.path.join(WORKDIR, "invoices")
+os.environ["INVOICE_RENDER_BACKEND"] = "inline"
+os.environ["PINCODE_INDEX_DIR"] = os.path.join(WORKDIR, "pincodes")
+os.environ["RECOMMENDATIONS_STATE_PATH"] = os.path.join(WORKDIR, "recommendations.npz")
+for flag in ("OUTBOX_WORKER_ENABLED", "ROLLUP_WORKER_ENABLED", "RATE_LIMIT_ENABLED", "LOAD_SHEDDING_ENABLED"):
+    os.environ[flag] = "false"
+
+from sqlalchemy import event  # noqa: E402
+
+from core.database.database import SessionLocal, engine  # noqa: E402
+from core.models.models import (  # noqa: E402
+    Order, OrderItem, OrderStatus, Payment, PaymentStatus, Product, ProductCategory, ProductVariant, User,
+    UserAddress,
+)
+from core.services.auth import create_access_token  # noqa: E402
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    return main.app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def count_statements():
+    """Collects every SQL statement sent to the database inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def make_user(db, role: str = "user") -> User:
+    n = next(_ids)
+    user = User(name=f"Test User {n}", email=f"user{n}@example.com", phone=f"90000{n:05d}",
+                password="x", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": user.email})}
+
+
+def make_address(db, user: User, zip_code: int = 560001, line1: str = None) -> UserAddress:
+    address = UserAddress(user_id=user.id, address_line1=line1 or f"{next(_ids)} MG Road", city="Bengaluru",
+                          state="Karnataka", zip_code=zip_code, alias="Home")
+    db.add(address)
+    db.commit()
+    return address
+
+
+def make_variants(db, count: int, stock: int = 100):
+    n = next(_ids)
+    category = ProductCategory(name=f"Category {n}")
+    db.add(category)
+    db.flush()
+    variants = []
+    for i in range(count):
+        product = Product(name=f"Product {n}-{i}", brand="Acme", price=Decimal("100.00"), category_id=category.id)
+        db.add(product)
+        db.flush()
+        variant = ProductVariant(product_id=product.id, sku=f"SKU-{n}-{i}", size="M", color="Blue",
+                                 stock=stock, price=Decimal("100.00"))
+        db.add(variant)
+        variants.append(variant)
+    db.commit()
+    return variants
+
+
+def make_order(db, user: User, items: int = 1, status: OrderStatus = OrderStatus.pending,
+               payment_status: PaymentStatus = PaymentStatus.paid) -> Order:
+    address = make_address(db, user)
+    variants = make_variants(db, items)
+    order = Order(user_id=user.id, shipping_address_id=address.id, total_amount=Decimal(100 * items),
+                  order_status=status, payment_status=payment_status)
+    db.add(order)
+    db.flush()
+    for variant in variants:
+        db.add(OrderItem(order_id=order.id, variant_id=variant.id, quantity=1, unit_price=Decimal("100.00")))
+    db.add(Payment(order_id=order.id, payment_method="card", status="captured", amount=Decimal(100 * items),
+                   currency="INR", transaction_id=next(_ids)))
+    db.commit()
+    return order
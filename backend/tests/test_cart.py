@@ -0,0 +1,142 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from core.database.database import SessionLocal
+from core.models.models import Cart, CartItem
+from core.services import cart as cart_module
+from core.services.cart import CartService, cart_service
+from tests.conftest import count_statements, make_user, make_variants
+
+
+def _quantities(response):
+    assert response.status_code == 200, response.text
+    return {line["variant_id"]: line["quantity"] for line in response.json()["lines"]}
+
+
+def _stored(db, **owner):
+    return {(i.variant_id, i.quantity) for i in db.query(CartItem).join(Cart, Cart.id == CartItem.cart_id).filter_by(**owner)}
+
+
+def test_guest_cart_edits_are_read_back_then_flushed(client, db):
+    first, second = make_variants(db, 2)
+    headers = {"X-Cart-Session": "guest-write-behind"}
+
+    client.post("/api/cart/items", json={"variant_id": first.id, "quantity": 1}, headers=headers)
+    client.post("/api/cart/items", json={"variant_id": first.id, "quantity": 2}, headers=headers)
+    client.post("/api/cart/items", json={"variant_id": second.id, "quantity": 1}, headers=headers)
+    assert _quantities(client.put(f"/api/cart/items/{second.id}", json={"quantity": 4}, headers=headers)) \
+        == {first.id: 3, second.id: 4}
+    assert _quantities(client.delete(f"/api/cart/items/{second.id}", headers=headers)) == {first.id: 3}
+    assert client.delete(f"/api/cart/items/{second.id}", headers=headers).status_code == 404
+
+    # Only in memory until the flush
+    assert _stored(db, session_id="guest-write-behind") == set()
+    cart_service.flush()
+    assert _stored(db, session_id="guest-write-behind") == {(first.id, 3)}
+    assert _quantities(client.get("/api/cart", headers=headers)) == {first.id: 3}
+
+
+def test_hydrating_is_one_statement(db):
+    first, second = make_variants(db, 2)
+    key = ("session", "guest-hydrate")
+    service = CartService()
+    service.add(db, key, first.id, 1)
+    service.flush()
+    service.add(db, key, second.id, 2)
+
+    with count_statements() as statements:
+        cart = service.hydrate(db, key)
+    assert len(statements) == 1
+    assert [(line["variant_id"], line["quantity"]) for line in cart["lines"]] == [(first.id, 1), (second.id, 2)]
+
+
+def test_edits_through_different_workers_all_land(db):
+    user = make_user(db)
+    first, second = make_variants(db, 2)
+    key = ("user", user.id)
+    workers = [CartService(), CartService()]
+    sessions = [SessionLocal(), SessionLocal()]
+    try:
+        workers[0].add(sessions[0], key, first.id, 1)
+        workers[1].add(sessions[1], key, first.id, 2)
+        workers[1].add(sessions[1], key, second.id, 1)
+        workers[0].flush()
+        workers[1].flush()
+        workers[0].update(sessions[0], key, second.id, 5)
+        workers[0].flush()
+
+        assert workers[0].lines(sessions[0], key) == workers[1].lines(sessions[1], key) == {first.id: 3, second.id: 5}
+    finally:
+        for session in sessions:
+            session.close()
+    assert db.query(Cart).filter(Cart.user_id == user.id).count() == 1
+
+
+def test_limits_hold_across_workers(db, monkeypatch):
+    monkeypatch.setattr(cart_module.settings, "cart_max_quantity", 5)
+    user = make_user(db)
+    capped, scarce = make_variants(db, 2)
+    scarce.stock = 3
+    db.commit()
+    key = ("user", user.id)
+    workers = [CartService(), CartService()]
+
+    with pytest.raises(HTTPException) as over:
+        workers[0].add(db, key, capped.id, 6)
+    assert over.value.status_code == 400
+    # Each worker alone stays within the limits; together they don't until the flush trims them
+    for worker in workers:
+        worker.add(db, key, capped.id, 4)
+        worker.add(db, key, scarce.id, 2)
+    for worker in workers:
+        worker.flush()
+
+    assert workers[0].lines(db, key) == {capped.id: 5, scarce.id: 3}
+
+
+def test_failed_flush_keeps_the_changes(db, monkeypatch):
+    (variant,) = make_variants(db, 1)
+    key = ("session", "guest-retry")
+    service = CartService()
+    service.add(db, key, variant.id, 2)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(cart_module, "upsert_increment", broken)
+    with pytest.raises(RuntimeError):
+        service.flush()
+    service.add(db, key, variant.id, 1)
+    assert service.lines(db, key) == {variant.id: 3}
+
+    monkeypatch.undo()
+    service.flush()
+    assert _stored(db, session_id="guest-retry") == {(variant.id, 3)}
+
+
+def test_merge_guest_adds_up_capped_and_drops_guest_cart(db, monkeypatch):
+    monkeypatch.setattr(cart_module.settings, "cart_max_quantity", 5)
+    user = make_user(db)
+    first, second = make_variants(db, 2)
+    service = CartService()
+    service.add(db, ("user", user.id), first.id, 4)
+    service.add(db, ("session", "guest-merge"), first.id, 3)
+    service.flush()
+    service.add(db, ("session", "guest-merge"), second.id, 2)
+
+    service.merge_guest(db, "guest-merge", user.id)
+    assert service.lines(db, ("session", "guest-merge")) == {}
+    service.flush()
+
+    assert service.lines(db, ("user", user.id)) == {first.id: 5, second.id: 2}
+    assert service.lines(db, ("session", "guest-merge")) == {}
+    assert db.query(Cart).filter(Cart.session_id == "guest-merge").count() == 0
+
+
+def test_one_cart_per_user(db):
+    user = make_user(db)
+    db.add_all([Cart(user_id=user.id), Cart(user_id=user.id)])
+    with pytest.raises(IntegrityError):
+        db.flush()
+    db.rollback()
@@ -0,0 +1,34 @@
+import pytest
+
+from core.middleware.load_control import LoadControlMiddleware
+
+
+@pytest.fixture
+def middleware(app):
+    return LoadControlMiddleware(app=None, router=app.router)
+
+
+def _scope(client="127.0.0.1", forwarded=None, method="GET", path="/api/products"):
+    headers = [(b"x-forwarded-for", value.encode()) for value in ([forwarded] if forwarded else [])]
+    return {"type": "http", "method": method, "path": path, "headers": headers, "client": (client, 40000)}
+
+
+def test_anonymous_clients_behind_trusted_proxy_get_their_own_buckets(middleware):
+    assert middleware._client(_scope(forwarded="203.0.113.7")) == ("ip", "203.0.113.7")
+    assert middleware._client(_scope(forwarded="203.0.113.8")) == ("ip", "203.0.113.8")
+    # A client can prepend anything; only the hop our proxy appended counts
+    assert middleware._client(_scope(forwarded="10.9.9.9, 203.0.113.7")) == ("ip", "203.0.113.7")
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(middleware):
+    assert middleware._client(_scope(client="198.51.100.4", forwarded="203.0.113.7")) == ("ip", "198.51.100.4")
+
+
+def test_route_template_is_resolved_once_per_path(middleware, monkeypatch):
+    scope = _scope(path="/api/orders/42")
+    template = middleware._route_template(scope)
+    assert template == "/api/orders/{order_id}"
+
+    monkeypatch.setattr(middleware.router, "routes", [])
+    assert middleware._route_template(scope) == template
+    assert middleware._route_template(_scope(method="DELETE", path="/api/orders/42")) is None
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+
+from core.database.database import engine
+from core.database.migrate import migrate
+from core.models.models import Cart, CartItem, ProductRatingSummary, ProductReview
+from core.services.reviews import apply_rating_change
+from tests.conftest import make_user, make_variants
+
+
+def test_duplicates_are_folded_before_unique_indexes_are_created(db):
+    # A database from before the unique indexes, with the duplicates they now reject
+    with engine.begin() as conn:
+        for name in ("ux_carts_user_id", "ux_cart_items_cart_id_variant_id", "ux_product_reviews_product_id_user_id"):
+            conn.execute(text(f"DROP INDEX {name}"))
+    user = make_user(db)
+    variant = make_variants(db, 1)[0]
+    carts = [Cart(user_id=user.id), Cart(user_id=user.id)]
+    db.add_all(carts)
+    db.flush()
+    db.add_all([CartItem(cart_id=cart.id, variant_id=variant.id, quantity=3) for cart in carts])
+    for rating in (2, 5):
+        db.add(ProductReview(product_id=variant.product_id, user_id=user.id, rating=rating))
+        apply_rating_change(db, variant.product_id, None, rating)
+    db.commit()
+
+    assert migrate() == 3
+    assert migrate() == 0
+
+    db.expire_all()
+    cart = db.query(Cart).filter(Cart.user_id == user.id).one()
+    assert [(i.variant_id, i.quantity) for i in db.query(CartItem).filter(CartItem.cart_id == cart.id)] == [(variant.id, 6)]
+    assert [r.rating for r in db.query(ProductReview).filter(ProductReview.user_id == user.id)] == [5]
+    summary = db.get(ProductRatingSummary, variant.product_id)
+    assert (summary.count, summary.sum, summary.stars_2, summary.stars_5) == (1, 5, 0, 1)
@@ -0,0 +1,35 @@
+from core.database.database import SessionLocal
+from core.models.models import Shipment
+from core.services import order_events
+from tests.conftest import make_order, make_user
+
+
+def test_assign_shipment_is_idempotent(db):
+    order = make_order(db, make_user(db))
+    for _ in range(2):
+        order_events.assign_shipment(db, {"order_id": order.id})
+        db.commit()
+
+    assert db.query(Shipment).filter(Shipment.order_id == order.id).count() == 1
+
+
+def test_concurrent_assign_shipment_keeps_one_shipment(db, monkeypatch):
+    order = make_order(db, make_user(db))
+    assign_courier = order_events.assign_courier
+
+    def racing_delivery(zip_code, units):
+        # Another worker claims the same event and commits between our check and our insert
+        other = SessionLocal()
+        try:
+            monkeypatch.setattr(order_events, "assign_courier", assign_courier)
+            order_events.assign_shipment(other, {"order_id": order.id})
+            other.commit()
+        finally:
+            other.close()
+        return assign_courier(zip_code, units)
+
+    monkeypatch.setattr(order_events, "assign_courier", racing_delivery)
+    order_events.assign_shipment(db, {"order_id": order.id})
+    db.commit()
+
+    assert db.query(Shipment).filter(Shipment.order_id == order.id).count() == 1
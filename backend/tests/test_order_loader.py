@@ -0,0 +1,46 @@
+from tests.conftest import auth_headers, count_statements, make_order, make_user
+
+
+def _statements(client, url, headers):
+    with count_statements() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def test_order_detail_query_count_does_not_grow_with_items(client, db):
+    user = make_user(db)
+    headers = auth_headers(user)
+    small, large = make_order(db, user, items=1), make_order(db, user, items=25)
+
+    counts = [_statements(client, f"/api/orders/{order.id}", headers) for order in (small, large)]
+
+    assert counts[0] == counts[1]
+    assert len(client.get(f"/api/orders/{large.id}", headers=headers).json()["items"]) == 25
+
+
+def test_invoice_query_count_does_not_grow_with_items(client, db):
+    user = make_user(db)
+    headers = auth_headers(user)
+    small, large = make_order(db, user, items=1), make_order(db, user, items=25)
+
+    # First download renders and stores the PDF, the second is served from the store
+    for _ in range(2):
+        counts = [_statements(client, f"/api/orders/{order.id}/invoice", headers) for order in (small, large)]
+        assert counts[0] == counts[1]
+
+
+def test_invoice_export_query_count_does_not_grow_with_items(db):
+    from core.models.models import Order
+    from core.services.invoice_export import stream_invoice_zip
+
+    user = make_user(db)
+    orders = [make_order(db, user, items=n) for n in (1, 25)]
+
+    counts = []
+    for order in orders:
+        with count_statements() as statements:
+            archive = b"".join(stream_invoice_zip([Order.id == order.id]))
+        assert archive
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
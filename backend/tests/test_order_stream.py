@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+import logging
+
+import pytest
+from fastapi import HTTPException
+
+from core.models.models import OrderStatus, OrderStatusEvent, Shipment
+from core.routers.order import STREAM_SCOPE, stream_user
+from core.services.auth import create_scoped_token
+from core.services import order_stream as order_stream_module
+from core.services.order_stream import CLOSE, OrderStream
+from core.utils.log import RedactTokensFilter
+from tests.conftest import auth_headers, make_order, make_user
+
+
+def _events(db, order_id):
+    return [(e.kind, e.status) for e in db.query(OrderStatusEvent).filter(OrderStatusEvent.order_id == order_id)
+            .order_by(OrderStatusEvent.id)]
+
+
+def _add_event(db, user_id, order_id, event_id=None, status="shipped"):
+    db.add(OrderStatusEvent(id=event_id, user_id=user_id, order_id=order_id, kind="order", status=status))
+    db.commit()
+
+
+def test_status_changes_are_recorded_in_the_same_flush(db):
+    order = make_order(db, make_user(db))
+    order.total_amount = 999  # not a status change
+    db.commit()
+    order.order_status = OrderStatus.shipped
+    db.add(Shipment(order_id=order.id, courier_name="DTDC", tracking_number="1234567890", status="in_transit",
+                    delivery_estimate=datetime.datetime(2030, 1, 2)))
+    db.commit()
+
+    events = _events(db, order.id)
+    assert events[0] == ("order", "pending")
+    assert sorted(events[1:]) == [("order", "shipped"), ("shipment", "in_transit")]
+    shipment_event = db.query(OrderStatusEvent).filter_by(order_id=order.id, kind="shipment").one()
+    assert shipment_event.user_id == order.user_id
+    assert order_stream_module._event(shipment_event)["courier_name"] == "DTDC"
+
+
+def test_rolled_back_changes_leave_no_events(db):
+    order = make_order(db, make_user(db))
+    order.order_status = OrderStatus.cancelled
+    db.flush()
+    db.rollback()
+
+    assert _events(db, order.id) == [("order", "pending")]
+
+
+def test_ids_committed_late_are_backfilled(db, monkeypatch):
+    order = make_order(db, make_user(db))
+    stream = OrderStream(poll_interval=1)
+    assert stream._read(db) == []
+    base = stream._last_id
+
+    # base + 1 is allocated but not yet visible when base + 2 is read
+    _add_event(db, order.user_id, order.id, base + 2)
+    assert [e["id"] for e in stream._read(db)] == [base + 2]
+    assert set(stream._gaps) == {base + 1}
+
+    _add_event(db, order.user_id, order.id, base + 1)
+    assert [e["id"] for e in stream._read(db)] == [base + 1]
+    assert not stream._gaps
+
+    # A gap that never fills is given up after GAP_WAIT_SECONDS
+    _add_event(db, order.user_id, order.id, base + 4)
+    stream._read(db)
+    now = order_stream_module.time.monotonic()
+    monkeypatch.setattr(order_stream_module.time, "monotonic", lambda: now + order_stream_module.GAP_WAIT_SECONDS + 1)
+    stream._read(db)
+    assert not stream._gaps
+
+
+def test_last_event_id_replay_is_not_delivered_twice(db):
+    order = make_order(db, make_user(db))
+    first = db.query(OrderStatusEvent).filter_by(order_id=order.id).one()
+    _add_event(db, order.user_id, order.id, status="processing")
+    missed = db.query(OrderStatusEvent).filter_by(order_id=order.id, status="processing").one()
+    stream = OrderStream(poll_interval=1)
+
+    async def scenario():
+        frames = stream.stream(order.user_id, last_event_id=first.id)
+        received = [await anext(frames), await anext(frames)]
+        # This process's feed reader is behind: it delivers the replayed event again, then a new one
+        _add_event(db, order.user_id, order.id, status="shipped")
+        stream._last_id = missed.id - 1
+        stream._fan_out(stream._read(db))
+        received.append(await anext(frames))
+        stream._deliver(next(iter(stream._subscribers[order.user_id])), CLOSE)
+        received.extend([frame async for frame in frames])
+        return received
+
+    retry, replayed, live = asyncio.run(scenario())
+    assert retry.startswith("retry:")
+    assert replayed.startswith(f"id: {missed.id}\n")
+    assert live.startswith(f"id: {missed.id + 1}\n") and '"status":"shipped"' in live
+    assert stream.connections == 0
+
+
+def test_query_string_only_takes_a_short_lived_stream_token(client, db):
+    user = make_user(db)
+    login = auth_headers(user)
+    response = client.post("/api/orders/events/token", headers=login)
+    assert response.status_code == 200, response.text
+    token = response.json()["access_token"]
+
+    assert stream_user(token=None, access_token=token) == user.id
+    # The login token is not accepted in the URL, and the stream token works nowhere else
+    with pytest.raises(HTTPException) as refused:
+        stream_user(token=None, access_token=login["Authorization"].split()[1])
+    assert refused.value.status_code == 401
+    assert client.get("/api/orders", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    expired = create_scoped_token(user, STREAM_SCOPE, datetime.timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        stream_user(token=None, access_token=expired)
+
+
+def test_access_log_redacts_tokens():
+    record = logging.LogRecord("uvicorn.access", logging.INFO, "", 0, '%s - "%s %s HTTP/%s" %d',
+                               ("10.0.0.1:5000", "GET", "/api/orders/events?access_token=abc.def&x=1", "1.1", 200), None)
+    RedactTokensFilter().filter(record)
+    assert record.getMessage() == '10.0.0.1:5000 - "GET /api/orders/events?access_token=[redacted]&x=1 HTTP/1.1" 200'
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from core.routers import address as address_router, pincode as pincode_router
+from core.services import pincodes
+from core.services.pincodes import PincodeIndex, address_fingerprint, build_index, canonical_state
+from tests.conftest import auth_headers, make_user
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    csv_path = tmp_path / "offices.csv"
+    csv_path.write_text(
+        "OfficeName,Pincode,DistrictName,StateName\n"
+        "M.G.Road S.O,560001,BANGALORE,KARNATAKA\n"
+        "Vidhana Soudha S.O,560001,Bangalore,Karnataka\n"
+        "Connaught Place S.O,110001,New Delhi,NCT OF DELHI\n"
+        "Bad row,5600,Nowhere,Karnataka\n"
+    )
+    build_index([str(csv_path)], str(tmp_path / "index"))
+    index = PincodeIndex(str(tmp_path / "index"))
+    monkeypatch.setattr(pincode_router, "pincode_index", index)
+    monkeypatch.setattr(address_router, "pincode_index", index)
+    return index
+
+
+def test_lookup_and_miss(index):
+    assert index.lookup(560001) == {"pincode": "560001", "city": "Bangalore", "district": "Bangalore", "state": "Karnataka"}
+    assert index.lookup(110001)["state"] == "Delhi"
+    assert index.lookup(560002) is None
+    assert index.lookup(5600) is None
+    assert index.known(np.array([560001, 560002, 110001, -1, 10 ** 7])).tolist() == [True, False, True, False, False]
+
+
+def test_pincode_endpoint(client, index):
+    assert client.get("/api/pincodes/560001").json()["city"] == "Bangalore"
+    assert client.get("/api/pincodes/999999").status_code == 404
+
+
+def test_no_index_misses_every_lookup(tmp_path):
+    index = PincodeIndex(str(tmp_path / "missing"))
+    assert not index.available
+    assert index.lookup(560001) is None
+
+
+def test_fingerprint_ignores_spelling_of_the_same_address():
+    same = ["12, M.G. Rd.", "12 mg road", "12  MG   ROAD", "12, Mg Road"]
+    assert len({address_fingerprint(line, 560001) for line in same}) == 1
+    assert address_fingerprint("12 MG Road", 560001) != address_fingerprint("12 MG Road", 560002)
+    assert address_fingerprint("12 MG Road", 560001) != address_fingerprint("14 MG Road", 560001)
+    assert canonical_state("tamilnadu") == "Tamil Nadu" and canonical_state("Orissa") == "Odisha"
+
+
+def test_duplicate_address_is_rejected(client, db, index):
+    headers = auth_headers(make_user(db))
+    address = {"address_line1": "12, M.G. Rd.", "city": "Bengaluru", "state": "KA", "zip_code": 560001}
+
+    created = client.post("/api/account/addresses", json=address, headers=headers)
+    assert created.status_code == 200, created.text
+    assert created.json()["state"] == "Karnataka"
+
+    duplicate = client.post("/api/account/addresses", json={**address, "address_line1": "12 mg road"}, headers=headers)
+    assert duplicate.status_code == 400
+    other_pin = client.post("/api/account/addresses", json={**address, "zip_code": 110001}, headers=headers)
+    assert other_pin.status_code == 200
+
+
+def test_concurrent_first_lookups_wait_for_the_load(index, monkeypatch):
+    started = threading.Event()
+    load = pincodes.np.load
+
+    def slow_load(*args, **kwargs):
+        started.set()
+        threading.Event().wait(0.2)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(pincodes.np, "load", slow_load)
+    with ThreadPoolExecutor(8) as pool:
+        first = pool.submit(index.lookup, 560001)
+        started.wait(5)
+        others = [pool.submit(index.known, np.array([560001, 560002])) for _ in range(7)]
+        assert first.result()["state"] == "Karnataka"
+        assert all(f.result().tolist() == [True, False] for f in others)
@@ -0,0 +1,86 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from core.models.models import Order, OrderItem, OrderStatus, PaymentStatus, ProductRecommendation
+from core.services import recommendations
+from tests.conftest import make_address, make_user, make_variants
+
+
+def _order(db, user, variants, age_seconds=3600) -> Order:
+    order = Order(user_id=user.id, shipping_address_id=make_address(db, user).id, total_amount=Decimal("100.00"),
+                  order_status=OrderStatus.pending, payment_status=PaymentStatus.paid,
+                  created_at=datetime.datetime.utcnow() - datetime.timedelta(seconds=age_seconds))
+    db.add(order)
+    db.flush()
+    db.add_all(OrderItem(order_id=order.id, variant_id=v.id, quantity=1, unit_price=Decimal("50.00")) for v in variants)
+    db.commit()
+    return order
+
+
+def _neighbours(db, product_id):
+    row = db.get(ProductRecommendation, product_id)
+    db.expire_all()
+    return row.neighbour_ids.split(",") if row else []
+
+
+@pytest.fixture
+def state_path(db, tmp_path):
+    # Orders other tests just placed would hold every run back behind the settle window
+    db.query(Order).update({Order.created_at: datetime.datetime.utcnow() - datetime.timedelta(hours=1)})
+    db.commit()
+    return str(tmp_path / "cooccurrence.npz")
+
+
+def test_orders_inside_the_settle_window_wait_for_the_next_run(db, state_path):
+    user = make_user(db)
+    a, b = make_variants(db, 2)
+    settled = _order(db, user, [a, b])
+    recommendations.refresh(db, state_path=state_path)
+
+    fresh = _order(db, user, [a, b], age_seconds=0)
+    result = recommendations.refresh(db, state_path=state_path)
+
+    assert settled.id <= result["watermark"] < fresh.id
+    matrix, _ = recommendations.load_state(state_path)
+    assert matrix[a.product_id, b.product_id] == 1
+
+
+def test_matrix_grows_to_products_created_after_the_last_run(db, state_path):
+    user = make_user(db)
+    _order(db, user, make_variants(db, 2))
+    recommendations.refresh(db, state_path=state_path)
+    size = recommendations.load_state(state_path)[0].shape[0]
+
+    a, b = make_variants(db, 2)
+    _order(db, user, [a, b])
+    recommendations.refresh(db, state_path=state_path)
+
+    matrix, _ = recommendations.load_state(state_path)
+    assert matrix.shape[0] > size and matrix[a.product_id, b.product_id] == 1
+    assert _neighbours(db, a.product_id) == [str(b.product_id)]
+
+
+def test_failed_commit_is_redone_without_double_counting(db, state_path, monkeypatch):
+    user = make_user(db)
+    recommendations.refresh(db, state_path=state_path)
+    a, b = make_variants(db, 2)
+    _order(db, user, [a, b])
+
+    def fail():
+        raise RuntimeError("connection lost")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(db, "commit", fail)
+        with pytest.raises(RuntimeError):
+            recommendations.refresh(db, state_path=state_path)
+    db.rollback()
+    assert _neighbours(db, a.product_id) == []
+
+    recommendations.refresh(db, state_path=state_path)
+
+    matrix, _ = recommendations.load_state(state_path)
+    assert matrix[a.product_id, b.product_id] == 1
+    assert _neighbours(db, a.product_id) == [str(b.product_id)]
+    assert not recommendations.load_pending(state_path).size
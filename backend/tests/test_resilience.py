@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from core.utils.resilience import Bulkhead, BulkheadFullError, CircuitBreaker, Dependency
+
+
+def _half_open(name: str, bulkhead: Bulkhead = None) -> Dependency:
+    dependency = Dependency(f"test-{name}", breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0), bulkhead=bulkhead)
+    dependency.breaker.record_failure()
+    return dependency
+
+
+def test_full_bulkhead_does_not_take_the_half_open_trial():
+    dependency = _half_open("bulkhead", Bulkhead(max_concurrent=1, max_wait=0))
+    dependency.bulkhead.acquire()
+    with pytest.raises(BulkheadFullError):
+        dependency.call(lambda: "ok")
+    dependency.bulkhead.release()
+
+    assert dependency.call(lambda: "ok") == "ok"
+    assert dependency.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_lets_the_next_call_try():
+    dependency = _half_open("cancelled")
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        trial = asyncio.create_task(dependency.acall(hang))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        async def ok():
+            return "ok"
+
+        return await dependency.acall(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert dependency.breaker.state == CircuitBreaker.CLOSED
+    assert dependency.bulkhead.in_flight == 0
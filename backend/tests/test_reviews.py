@@ -0,0 +1,40 @@
+from core.database.database import SessionLocal
+from core.models.models import ProductRatingSummary, ProductReview
+from core.routers import review as review_router
+from tests.conftest import auth_headers, make_user, make_variants
+
+
+def test_second_review_of_a_product_is_rejected(client, db):
+    user = make_user(db)
+    product_id = make_variants(db, 1)[0].product_id
+    url = f"/api/products/{product_id}/reviews"
+
+    assert client.post(url, json={"rating": 5}, headers=auth_headers(user)).status_code == 201
+    response = client.post(url, json={"rating": 1}, headers=auth_headers(user))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "You have already reviewed this product"
+
+
+def test_racing_duplicate_review_is_a_400_not_a_500(client, db, monkeypatch):
+    user = make_user(db)
+    product_id = make_variants(db, 1)[0].product_id
+    has_purchased = review_router.has_purchased
+
+    def racing_submission(session, user_id, product_id):
+        # The same review, submitted twice, commits from another request after our duplicate check
+        other = SessionLocal()
+        try:
+            other.add(ProductReview(product_id=product_id, user_id=user_id, rating=4))
+            other.commit()
+        finally:
+            other.close()
+        return has_purchased(session, user_id, product_id)
+
+    monkeypatch.setattr(review_router, "has_purchased", racing_submission)
+    response = client.post(f"/api/products/{product_id}/reviews", json={"rating": 4}, headers=auth_headers(user))
+
+    assert response.status_code == 400
+    assert db.query(ProductReview).filter(ProductReview.product_id == product_id).count() == 1
+    # The rejected review was never counted
+    assert db.get(ProductRatingSummary, product_id) is None
@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+from core.models.models import OrderStatus, PaymentStatus
+from core.services.sales_rollup import aggregate
+from tests.conftest import make_order, make_user
+
+
+def test_only_paid_uncancelled_orders_count_as_sales(db):
+    user = make_user(db)
+    paid = make_order(db, user, items=2)
+    failed = make_order(db, user, payment_status=PaymentStatus.failed)
+    pending = make_order(db, user, payment_status=PaymentStatus.pending)
+    cancelled = make_order(db, user, status=OrderStatus.cancelled)
+
+    totals = aggregate(db, paid.id - 1, cancelled.id)
+    day = paid.created_at.date()
+
+    revenue, units, orders = totals[(day, "total", "")]
+    assert (revenue, units, orders) == (Decimal("200.00"), 2, {paid.id})
+    assert sum(units for (_, dimension, _), (_, units, _) in totals.items() if dimension == "brand") == 2
+    assert totals[(day, "payment_status", "failed")][2] == {failed.id}
+    assert totals[(day, "payment_status", "pending")][2] == {pending.id}
+    assert totals[(day, "payment_status", "paid")][2] == {paid.id}
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import httpx
+import uvicorn
+
+from core.models.models import Cart, CartItem, ProductViewCount
+from core.services.product_views import view_tracker
+from server import ShopKartServer
+from tests.conftest import auth_headers, make_user, make_variants
+
+
+def test_stopping_server_ends_open_streams_and_still_runs_lifespan_shutdown(app, db):
+    user = make_user(db)
+    headers = auth_headers(user)
+    variant = make_variants(db, 1)[0]
+    product_id = variant.product_id
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, loop="asyncio", http="h11", lifespan="on",
+                            log_level="warning", timeout_graceful_shutdown=30)
+    server = ShopKartServer(config)
+
+    async def scenario():
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=10) as http:
+            async with http.stream("GET", "/api/orders/events", headers=headers) as response:
+                lines = response.aiter_lines()
+                assert (await anext(lines)).startswith("retry:")
+                # Buffered in memory until the flush thread runs, or the lifespan shutdown does
+                view_tracker.record(product_id)
+                added = await http.post("/api/cart/items", json={"variant_id": variant.id, "quantity": 2}, headers=headers)
+                assert added.status_code == 200
+                started = time.monotonic()
+                server.should_exit = True
+                async for _ in lines:
+                    pass
+        await asyncio.wait_for(serving, 10)
+        return time.monotonic() - started
+
+    # Well inside timeout_graceful_shutdown: the stream was ended, not waited out
+    assert asyncio.run(scenario()) < 5
+    views = db.query(ProductViewCount.views).filter(ProductViewCount.product_id == product_id).scalar()
+    assert views == 1
+    cart = db.query(CartItem.quantity).join(Cart, Cart.id == CartItem.cart_id).filter(Cart.user_id == user.id).all()
+    assert [quantity for quantity, in cart] == [2]
@@ -0,0 +1,70 @@
+import numpy as np
+
+from core.services import shipping
+from core.services.pincodes import PincodeIndex, build_index
+from core.services.shipping import LOCAL, METRO, NATIONAL, REGIONAL, SPECIAL, UNSERVICEABLE
+
+# Seen from the default warehouse at 560001 (Bengaluru)
+PINS = [560034, 562106, 110001, 302001, 190001, 12345]
+
+
+def test_quote_matrix_zones_and_costs():
+    matrix = shipping.quote_matrix(PINS, [1, 1, 1, 3, 1, 1])
+
+    assert matrix["zones"].tolist() == [LOCAL, REGIONAL, METRO, NATIONAL, SPECIAL, UNSERVICEABLE]
+    assert matrix["cost"].shape == (len(PINS), len(shipping.COURIERS))
+    # Three units on the national lane: first unit plus two extra
+    assert matrix["cost"][3].tolist() == (shipping.FIRST_UNIT_COST[NATIONAL] + 2 * shipping.EXTRA_UNIT_COST[NATIONAL]).tolist()
+    assert np.isnan(matrix["cost"][4, shipping.COURIERS.index("DHL")])
+    assert np.isnan(matrix["cost"][5]).all() and np.isnan(matrix["days"][5]).all()
+
+
+def test_best_courier_by_preference():
+    matrix = shipping.quote_matrix(PINS, 1)
+    cheapest = shipping.best_courier(matrix["cost"], matrix["days"], "cheapest")
+    fastest = shipping.best_courier(matrix["cost"], matrix["days"], "fastest")
+
+    couriers = lambda picks: [shipping.COURIERS[c] if c >= 0 else None for c in picks]
+    assert couriers(cheapest) == ["DTDC", "DTDC", "IndiaPost", "IndiaPost", "IndiaPost", None]
+    # Ties on days go to the cheaper courier; DHL doesn't serve the special zone
+    assert couriers(fastest) == ["DTDC", "DTDC", "BlueDart", "BlueDart", "BlueDart", None]
+
+
+def test_quote_lists_serving_couriers_cheapest_first():
+    special, unserviceable = shipping.quote([190001, 12345], 1)
+
+    assert special["zone"] == "special" and special["serviceable"]
+    assert [o["courier"] for o in special["options"]] == ["IndiaPost", "DTDC", "BlueDart", "FedEx"]
+    assert special["recommended"]["courier"] == "IndiaPost"
+    assert unserviceable == {"zip_code": 12345, "zone": None, "serviceable": False, "recommended": None, "options": []}
+
+
+def test_pins_missing_from_the_index_are_unserviceable(tmp_path, monkeypatch):
+    csv_path = tmp_path / "offices.csv"
+    csv_path.write_text("pincode,district,state\n560034,Bangalore,Karnataka\n")
+    build_index([str(csv_path)], str(tmp_path))
+    monkeypatch.setattr(shipping, "pincode_index", PincodeIndex(str(tmp_path)))
+
+    assert shipping.quote_matrix([560034, 560099], 1)["zones"].tolist() == [LOCAL, UNSERVICEABLE]
+
+
+def test_assign_courier_falls_back_to_the_national_lane(monkeypatch):
+    monkeypatch.setattr(shipping.settings, "shipping_courier_preference", "cheapest")
+    assert shipping.assign_courier(560034, 1) == ("DTDC", 1)
+    national = int(shipping.TRANSIT_DAYS[NATIONAL, shipping.COURIERS.index("IndiaPost")])
+    assert shipping.assign_courier(12345, 2) == ("IndiaPost", national)
+    assert shipping.assign_courier(None, 1) == ("IndiaPost", national)
+
+
+def test_quote_endpoint(client):
+    response = client.get("/api/shipping/quote", params={"zip_code": [560034, 110001], "units": 2})
+
+    assert response.status_code == 200
+    assert [row["zone"] for row in response.json()] == ["local", "metro"]
+
+
+def test_out_of_range_pins_are_rejected(client):
+    for pin in (10 ** 19, -1, 1000000):
+        assert client.get("/api/shipping/quote", params={"zip_code": [560034, pin]}).status_code == 422
+        assert client.get("/api/cart/shipping", params={"zip_code": pin},
+                          headers={"X-Cart-Session": "guest-quote"}).status_code == 422
@@ -0,0 +1,11 @@
+from core.services import order_events  # noqa: F401 (registers the outbox handlers)
+from core.services import order_stream  # noqa: F401 (records status changes for the live order stream)
+from core.services.outbox import outbox_worker
+from core.utils.log import setup_logging
+
+
+# Standalone outbox worker, for running side effects outside the web process.
+# Set OUTBOX_WORKER_ENABLED=false on the API when using it.
+if __name__ == "__main__":
+    setup_logging()
+    outbox_worker.run()